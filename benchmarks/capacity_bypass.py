@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Compare up-peak throughput and wasted stops with and without full-car hall-call bypass.
+
+Run from the repository root with::
+
+    python -m benchmarks.capacity_bypass
+"""
+import logging
+
+from pyelevator import Elevator
+from pyelevator.traffic import run_traffic
+from pyelevator.traffic import up_peak_traffic
+
+# +: Number of floors in the simulated building.
+NUMBER_OF_FLOORS: int = 20
+
+# +: Rated capacity of the car, in passengers.
+CAPACITY: int = 12
+
+# +: Passenger arrivals per simulated hour for each run.
+ARRIVAL_RATES: list[int] = [200, 400, 600]
+
+# +: Fraction of interfloor trips mixed into the up-peak.
+INTERFLOOR: float = 0.15
+
+# +: Seed shared by both runs so they see identical traffic.
+SEED: int = 2023
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    print(
+        f"{'arrivals/h':>10}  {'bypass':>6}  {'delivered/h':>11}  "
+        f"{'stops':>5}  {'wasted':>6}  {'mean wait':>9}  {'max wait':>8}",
+    )
+    for arrivals in ARRIVAL_RATES:
+        for bypass in (False, True):
+            elevator = Elevator(
+                NUMBER_OF_FLOORS,
+                capacity=CAPACITY,
+                full_car_bypass=bypass,
+                enable_sleep=False,
+            )
+            passengers = up_peak_traffic(
+                NUMBER_OF_FLOORS,
+                arrivals,
+                duration=3600,
+                seed=SEED,
+                interfloor=INTERFLOOR,
+            )
+            report = run_traffic(elevator, passengers)
+            print(
+                f"{arrivals:>10}  {str(bypass):>6}  {report.throughput_per_hour:>11.1f}  "
+                f"{report.stops_made:>5}  {report.wasted_stops:>6}  "
+                f"{report.mean_wait:>9.1f}  {report.max_wait:>8}",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Compare destination dispatch with conventional up/down hall buttons on the same
+seeded up-peak traffic, reporting the round-trip time and stops per trip measured by
+:py:class:`pyelevator.traffic.TripRecorder`.
+
+Run from the repository root with::
+
+    python -m benchmarks.destination_dispatch
+"""
+import copy
+import logging
+
+from pyelevator import Elevator
+from pyelevator.destination_dispatch import DestinationDispatchElevator
+from pyelevator.traffic import run_traffic
+from pyelevator.traffic import TripRecorder
+from pyelevator.traffic import up_peak_traffic
+
+# +: Number of floors in the simulated building.
+NUMBER_OF_FLOORS: int = 16
+
+# +: Rated capacity of the car, in passengers.
+CAPACITY: int = 12
+
+# +: Arrival window, in simulated seconds.
+DURATION: int = 3600
+
+# +: Passengers per hour to test, from light traffic to beyond saturation.
+ARRIVAL_RATES: list[int] = [300, 600, 1000]
+
+# +: Fractions of interfloor trips to test.
+INTERFLOOR_MIXES: list[float] = [0.0, 0.15]
+
+# +: Seed shared by every car so they see identical traffic.
+SEED: int = 2023
+
+# +: The cars to compare, as (label, class, extra keyword arguments).
+CARS: list[tuple[str, type, dict]] = [
+    ("hall buttons", Elevator, {}),
+    ("destination", DestinationDispatchElevator, {}),
+    ("destination, spread 1", DestinationDispatchElevator, {"group_spread": 1}),
+]
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    print(
+        f"{'interfloor':>10}  {'rate':>5}  {'car':<22}  {'trips':>5}  {'stops/trip':>10}  "
+        f"{'RTT':>6}  {'mean wait':>9}  {'finish':>6}",
+    )
+    for interfloor in INTERFLOOR_MIXES:
+        for rate in ARRIVAL_RATES:
+            trace = up_peak_traffic(
+                NUMBER_OF_FLOORS,
+                rate * DURATION // 3600,
+                duration=DURATION,
+                seed=SEED,
+                interfloor=interfloor,
+            )
+            for label, car_class, options in CARS:
+                elevator = car_class(
+                    NUMBER_OF_FLOORS,
+                    capacity=CAPACITY,
+                    enable_sleep=False,
+                    **options,
+                )
+                recorder = TripRecorder(elevator)
+                report = run_traffic(elevator, copy.deepcopy(trace))
+                print(
+                    f"{interfloor:>10.0%}  {rate:>5}  {label:<22}  {len(recorder.trips):>5}  "
+                    f"{recorder.mean_stops_per_trip:>10.2f}  "
+                    f"{recorder.mean_round_trip_time:>6.1f}  {report.mean_wait:>9.1f}  "
+                    f"{report.elapsed_time:>6}",
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the handling capacity of a double-deck car with single-deck cars on the same
+seeded, saturated up-peak traffic.
+
+Handling capacity is the number of passengers carried per five minutes while the
+lobby queue never empties. Passengers a double-deck car lets walk between the two
+levels of a stop are left out, so only trips the car actually carried count.
+
+Run from the repository root with::
+
+    python -m benchmarks.double_deck
+"""
+import copy
+import logging
+
+from pyelevator import Elevator
+from pyelevator.double_deck import DoubleDeckElevator
+from pyelevator.traffic import run_traffic
+from pyelevator.traffic import up_peak_traffic
+
+# +: Number of floors in the simulated building.
+NUMBER_OF_FLOORS: int = 20
+
+# +: Simulated seconds of saturated traffic to run.
+RUN_TIME: int = 3600
+
+# +: Passengers offered during the run; far more than any car can carry.
+OFFERED: int = 2000
+
+# +: Fractions of interfloor trips to test.
+INTERFLOOR_MIXES: list[float] = [0.0, 0.15]
+
+# +: Seed shared by every car so they see identical traffic.
+SEED: int = 2023
+
+# +: The cars to compare, as (label, class, capacity per cab).
+CARS: list[tuple[str, type, int]] = [
+    ("single deck, 12", Elevator, 12),
+    ("single deck, 24", Elevator, 24),
+    ("double deck, 2 x 12", DoubleDeckElevator, 12),
+]
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    print(
+        f"{'interfloor':>10}  {'car':<20}  {'HC5':>6}  {'stops':>5}  "
+        f"{'per stop':>8}  {'mean wait':>9}",
+    )
+    for interfloor in INTERFLOOR_MIXES:
+        trace = up_peak_traffic(
+            NUMBER_OF_FLOORS,
+            OFFERED,
+            duration=RUN_TIME,
+            seed=SEED,
+            interfloor=interfloor,
+        )
+        for label, car_class, capacity in CARS:
+            elevator = car_class(NUMBER_OF_FLOORS, capacity=capacity, enable_sleep=False)
+            report = run_traffic(elevator, copy.deepcopy(trace), time_limit=RUN_TIME)
+            carried = [
+                p
+                for p in report.passengers
+                if p.alight_time is not None and p.alight_time != p.board_time
+            ]
+            handling_capacity = len(carried) * 300 / report.elapsed_time
+            print(
+                f"{interfloor:>10.0%}  {label:<20}  {handling_capacity:>6.1f}  "
+                f"{report.stops_made:>5}  {len(carried) / report.stops_made:>8.2f}  "
+                f"{report.mean_wait:>9.1f}",
+            )
+
+
+if __name__ == "__main__":
+    main()
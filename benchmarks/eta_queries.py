@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Measure ETA query throughput, one floor at a time and in batches for all floors.
+
+Run from the repository root with::
+
+    python -m benchmarks.eta_queries
+"""
+import logging
+import time
+from random import Random
+
+from pyelevator import Direction
+from pyelevator import Elevator
+
+# +: Number of floors in the simulated building.
+NUMBER_OF_FLOORS: int = 100
+
+# +: Number of single-floor queries to time.
+QUERIES: int = 1_000_000
+
+# +: Seed for choosing pending calls and query floors.
+SEED: int = 11
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    rng = Random(SEED)
+    elevator = Elevator(
+        NUMBER_OF_FLOORS,
+        current_floor=40,
+        direction=Direction.UP,
+        enable_sleep=False,
+    )
+    elevator.press_car(*rng.sample(range(1, NUMBER_OF_FLOORS + 1), 10))
+    elevator.press_up(*rng.sample(range(1, NUMBER_OF_FLOORS), 10))
+    elevator.press_down(*rng.sample(range(2, NUMBER_OF_FLOORS + 1), 10))
+
+    directions = (None, Direction.UP, Direction.DOWN)
+    queries = [
+        (rng.randint(1, NUMBER_OF_FLOORS), directions[i % 3]) for i in range(QUERIES)
+    ]
+    eta = elevator.eta
+    started = time.perf_counter()
+    for floor_num, direction in queries:
+        eta(floor_num, direction)
+    single = QUERIES / (time.perf_counter() - started)
+
+    batches = QUERIES // NUMBER_OF_FLOORS
+    started = time.perf_counter()
+    for i in range(batches):
+        elevator.eta_all(directions[i % 3])
+    batch = batches * NUMBER_OF_FLOORS / (time.perf_counter() - started)
+
+    print(f"single-floor eta():   {single:>12,.0f} queries/s")
+    print(f"eta_all() per floor:  {batch:>12,.0f} queries/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Measure how fast Elevator.run() streams events to a consumer that filters them lazily.
+
+Run from the repository root with::
+
+    python -m benchmarks.event_stream
+"""
+import logging
+import time
+
+from pyelevator import Elevator
+from pyelevator.events import Stopped
+from pyelevator.traffic import up_peak_traffic
+
+# +: Number of floors in the simulated building.
+NUMBER_OF_FLOORS: int = 30
+
+# +: Passengers fed to the car; each one produces a handful of events.
+PASSENGERS: int = 50_000
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    elevator = Elevator(NUMBER_OF_FLOORS, capacity=12, enable_sleep=False)
+    for passenger in up_peak_traffic(
+        NUMBER_OF_FLOORS,
+        PASSENGERS,
+        duration=1,
+        seed=1,
+        interfloor=0.3,
+    ):
+        elevator.add_passenger(passenger)
+
+    events = 0
+    stops = 0
+    started = time.perf_counter()
+    for event in elevator.run(0):
+        events += 1
+        if type(event) is Stopped:
+            stops += 1
+    elapsed = time.perf_counter() - started
+    print(
+        f"{events} events ({stops} stops) in {elapsed:.2f}s: "
+        f"{events / elapsed:,.0f} events/s",
+    )
+
+
+if __name__ == "__main__":
+    main()
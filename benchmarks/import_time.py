@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Measure how long ``import pyelevator`` takes in a fresh interpreter, using
+``python -X importtime``, and fail if it exceeds the startup budget or pulls in
+modules that only the command line tools and optional extras need.
+
+Bytecode is cached in a temporary directory and warmed before measuring, so the
+numbers reflect a deployed install rather than a first-ever import.
+
+Run from the repository root with::
+
+    python -m benchmarks.import_time
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# +: Fresh interpreters to measure; the median is compared with the budget.
+RUNS: int = 15
+
+# +: Budget for the cumulative import time of the package, in milliseconds.
+IMPORT_BUDGET_MS: float = 40.0
+
+# +: Modules the core package must not import.
+FORBIDDEN_MODULES: tuple[str, ...] = (
+    "asyncio",
+    "click",
+    "multiprocessing",
+    "numpy",
+    "pyelevator.cli",
+    "pyelevator.shared_state",
+    "pyelevator.solver",
+)
+
+# +: How many of the slowest imports to list.
+SLOWEST: int = 8
+
+_PROBE = (
+    "import sys, pyelevator; "
+    "print(','.join(m for m in %r if m in sys.modules))" % (FORBIDDEN_MODULES,)
+)
+
+
+def measure(cache_dir: str) -> tuple[dict[str, int], list[str]]:
+    """
+    Import the package once in a fresh interpreter.
+
+    Returns:
+        tuple - the cumulative import time of each module in microseconds, and the
+            forbidden modules that were loaded.
+    """
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-X", f"pycache_prefix={cache_dir}", "-c", _PROBE],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    cumulative = dict()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        if total.strip().isdigit():
+            cumulative[name.strip()] = int(total)
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return cumulative, loaded
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        measure(cache_dir)
+        runs = [measure(cache_dir) for _ in range(RUNS)]
+
+    totals = [cumulative["pyelevator"] / 1000 for cumulative, _ in runs]
+    median = statistics.median(totals)
+    print(
+        f"import pyelevator: median {median:.1f} ms, min {min(totals):.1f} ms, "
+        f"max {max(totals):.1f} ms over {RUNS} runs (budget {IMPORT_BUDGET_MS:.1f} ms)",
+    )
+
+    cumulative, loaded = runs[totals.index(median)]
+    print("slowest imports (cumulative):")
+    for name, total in sorted(cumulative.items(), key=lambda item: -item[1])[
+        1 : SLOWEST + 1
+    ]:
+        print(f"    {name:<28} {total / 1000:6.1f} ms")
+
+    failures = list()
+    if median > IMPORT_BUDGET_MS:
+        failures.append(f"import time {median:.1f} ms is over budget")
+    if loaded:
+        failures.append(f"core import loaded {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Measure what journaling costs the controller, and how long recovery takes.
+
+The same seeded traffic is run with and without a :py:class:`StateJournal` taking
+fsynced checkpoints in the background, interleaving the runs and comparing the
+fastest of each so that noise from the rest of the machine cancels out. Recovery
+is timed from a journal whose tail is one record short of compaction, the most
+that :py:func:`restore` ever has to replay.
+
+Run from the repository root with::
+
+    python -m benchmarks.journal_overhead
+"""
+import copy
+import gc
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from pyelevator import Elevator
+from pyelevator.journal import COMPACT_EVERY
+from pyelevator.journal import read_state
+from pyelevator.journal import restore
+from pyelevator.journal import StateJournal
+from pyelevator.traffic import run_traffic
+from pyelevator.traffic import up_peak_traffic
+
+# +: Number of floors in the simulated building.
+NUMBER_OF_FLOORS: int = 20
+
+# +: Passengers in the traffic run.
+PASSENGERS: int = 5000
+
+# +: Interleaved runs of each configuration; the fastest is compared.
+REPEATS: int = 15
+
+# +: Largest slowdown journaling may add to the traffic run.
+OVERHEAD_BUDGET: float = 0.05
+
+# +: Largest time a worst-case restore may take, in milliseconds.
+RESTORE_BUDGET_MS: float = 50.0
+
+
+def timed_run(trace: list, path: str, journaled: bool) -> tuple[float, int]:
+    """
+    Run the traffic once, optionally journaled.
+
+    Returns:
+        tuple - the wall-clock seconds taken, and the checkpoints the journal took.
+    """
+    elevator = Elevator(NUMBER_OF_FLOORS, capacity=12, enable_sleep=False)
+    passengers = copy.deepcopy(trace)
+    journal = StateJournal(elevator, path) if journaled else None
+    gc.collect()
+    started = time.perf_counter()
+    run_traffic(elevator, passengers)
+    elapsed = time.perf_counter() - started
+    if journal is None:
+        return elapsed, 0
+    journal.close()
+    return elapsed, journal.checkpoints
+
+
+def worst_case_journal(path: str) -> int:
+    """
+    Write a journal whose tail is one record short of compaction.
+
+    Returns:
+        int - the number of records in the tail.
+    """
+    elevator = Elevator(NUMBER_OF_FLOORS, enable_sleep=False)
+    with StateJournal(elevator, path, sync_interval=None, fsync=False) as journal:
+        written = 0
+        floor_num = 1
+        while written < COMPACT_EVERY - 1:
+            if elevator.car_buttons[floor_num]:
+                elevator.clear_car(floor_num)
+            else:
+                elevator.press_car(floor_num)
+            written += journal.sync()
+            floor_num = floor_num % NUMBER_OF_FLOORS + 1
+    return written
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    trace = up_peak_traffic(
+        NUMBER_OF_FLOORS,
+        PASSENGERS,
+        duration=PASSENGERS * 2,
+        seed=2023,
+        interfloor=0.3,
+    )
+
+    failures = list()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "elevator.journal")
+        plain, journaled = list(), list()
+        checkpoints = 0
+        for _ in range(REPEATS):
+            plain.append(timed_run(trace, path, False)[0])
+            elapsed, taken = timed_run(trace, path, True)
+            journaled.append(elapsed)
+            checkpoints += taken
+
+        overhead = min(journaled) / min(plain) - 1
+        print(
+            f"traffic run: {min(plain) * 1000:.1f} ms plain, "
+            f"{min(journaled) * 1000:.1f} ms journaled ({overhead:+.1%}, "
+            f"budget {OVERHEAD_BUDGET:.0%}); {checkpoints / REPEATS:.1f} checkpoints per run",
+        )
+        if overhead > OVERHEAD_BUDGET:
+            failures.append(f"journaling overhead {overhead:.1%} is over budget")
+
+        tail = worst_case_journal(path)
+        size = os.path.getsize(path)
+        timings = list()
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            restore(Elevator(NUMBER_OF_FLOORS, enable_sleep=False), path)
+            timings.append((time.perf_counter() - started) * 1000)
+        replayed = read_state(path, NUMBER_OF_FLOORS).replayed
+        print(
+            f"restore: {min(timings):.1f} ms to replay {replayed} of {tail} records "
+            f"({size / 1024:.0f} KiB, budget {RESTORE_BUDGET_MS:.0f} ms)",
+        )
+        if min(timings) > RESTORE_BUDGET_MS:
+            failures.append(f"restore took {min(timings):.1f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Compare online dispatch policies against the offline solver on the same traces and
+report the optimality gap of each.
+
+The gap is bracketed: "vs best" uses the solver's best schedule (so the true gap is
+at least this large), and "vs bound" uses its proven lower bound (so the true gap is
+at most this large). The two agree whenever the solver finished its search. The
+solver proves no total-wait bound for long traces, so that gap is shown as n/a.
+
+Run from the repository root with::
+
+    python -m benchmarks.optimality_gap
+"""
+import copy
+import logging
+import time
+
+from pyelevator import Elevator
+from pyelevator.solver import Objective
+from pyelevator.solver import optimality_gap
+from pyelevator.solver import schedule_cost
+from pyelevator.solver import solve
+from pyelevator.traffic import run_traffic
+from pyelevator.traffic import up_peak_traffic
+
+# +: Number of floors in the simulated building.
+NUMBER_OF_FLOORS: int = 12
+
+# +: Rated capacity of the car, in passengers.
+CAPACITY: int = 8
+
+# +: Trace sizes to solve, with the node budget for each.
+TRACES: list[tuple[int, int]] = [(10, 500_000), (2000, 300_000)]
+
+# +: The online policies to compare, as Elevator keyword arguments.
+POLICIES: dict[str, dict] = {
+    "sweep": dict(),
+    "sweep, no bypass": dict(full_car_bypass=False),
+    "wait_target=240": dict(wait_target=240),
+}
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    for passengers, node_limit in TRACES:
+        trace = up_peak_traffic(
+            NUMBER_OF_FLOORS,
+            passengers,
+            duration=passengers * 8,
+            seed=4,
+            interfloor=0.3,
+        )
+        for objective in Objective:
+            started = time.perf_counter()
+            solution = solve(
+                trace,
+                objective=objective,
+                capacity=CAPACITY,
+                node_limit=node_limit,
+            )
+            elapsed = time.perf_counter() - started
+            print(
+                f"{passengers} passengers, {objective.name}: best={solution.cost} "
+                f"bound={solution.lower_bound} optimal={solution.optimal} "
+                f"({solution.nodes} nodes, {elapsed:.1f}s)",
+            )
+            for name, options in POLICIES.items():
+                online = copy.deepcopy(trace)
+                run_traffic(
+                    Elevator(
+                        NUMBER_OF_FLOORS,
+                        capacity=CAPACITY,
+                        enable_sleep=False,
+                        **options,
+                    ),
+                    online,
+                )
+                cost = schedule_cost(online, objective)
+                vs_best = max(0.0, (cost - solution.cost) / cost) if cost else 0.0
+                gap = optimality_gap(cost, solution)
+                vs_bound = "   n/a" if gap is None else f"{gap:6.1%}"
+                print(
+                    f"    {name:<18} cost={cost:>7}  gap vs best={vs_best:6.1%}  "
+                    f"gap vs bound={vs_bound}",
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Measure the publishing overhead on the controller and the update latency seen by a
+monitor process polling the shared state block.
+
+Run from the repository root with::
+
+    python -m benchmarks.shared_state_latency
+"""
+import logging
+import multiprocessing
+import time
+
+from pyelevator import Elevator
+from pyelevator.shared_state import SharedStatePublisher
+from pyelevator.shared_state import SharedStateReader
+from pyelevator.traffic import up_peak_traffic
+
+# +: Number of floors in the simulated building.
+NUMBER_OF_FLOORS: int = 30
+
+# +: Passengers fed to the car for each measurement.
+PASSENGERS: int = 5000
+
+
+def loaded_elevator() -> Elevator:
+    elevator = Elevator(NUMBER_OF_FLOORS, capacity=12, enable_sleep=False)
+    for passenger in up_peak_traffic(NUMBER_OF_FLOORS, PASSENGERS, duration=1, seed=1):
+        elevator.add_passenger(passenger)
+    return elevator
+
+
+def drain(elevator: Elevator, stamp=None) -> int:
+    steps = 0
+    while elevator.simulation_can_move():
+        elevator.simulation_move_one_step()
+        if stamp is not None:
+            stamp.value = time.perf_counter_ns()
+        steps += 1
+    return steps
+
+
+def monitor(name, stamp, done, latencies) -> None:
+    with SharedStateReader(name) as reader:
+        last = reader.sequence
+        samples = list()
+        while not done.value:
+            sequence = reader.sequence
+            if sequence != last and not sequence & 1:
+                reader.read()
+                samples.append(time.perf_counter_ns() - stamp.value)
+                last = sequence
+    latencies.put(sorted(samples))
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+
+    elevator = loaded_elevator()
+    started = time.perf_counter()
+    steps = drain(elevator)
+    baseline = (time.perf_counter() - started) / steps
+
+    elevator = loaded_elevator()
+    with SharedStatePublisher(elevator) as publisher:
+        started = time.perf_counter()
+        drain(elevator)
+        published = (time.perf_counter() - started) / steps
+
+    elevator = loaded_elevator()
+    stamp = multiprocessing.Value("q", 0, lock=False)
+    done = multiprocessing.Value("b", 0, lock=False)
+    latencies = multiprocessing.Queue()
+    with SharedStatePublisher(elevator) as publisher:
+        reader = multiprocessing.Process(
+            target=monitor,
+            args=(publisher.name, stamp, done, latencies),
+        )
+        reader.start()
+        time.sleep(0.5)
+        drain(elevator, stamp)
+        done.value = 1
+        samples = latencies.get()
+        reader.join()
+
+    print(f"step cost without publisher: {baseline * 1e6:8.1f} us")
+    print(f"step cost with publisher:    {published * 1e6:8.1f} us")
+    if samples:
+        p50 = samples[len(samples) // 2] / 1000
+        p99 = samples[int(len(samples) * 0.99)] / 1000
+        print(f"monitor update latency: p50={p50:.1f} us p99={p99:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
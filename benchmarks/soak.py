@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Soak an Elevator under continuous traffic, reporting allocations per step and memory
+growth over time, and fail if steady-state memory grows or a step allocates more than
+its budget.
+
+Run from the repository root with::
+
+    python -m benchmarks.soak [STEPS]
+
+The default is a few minutes' run; pass e.g. 300000000 for a long soak.
+"""
+import logging
+import sys
+
+from pyelevator import Elevator
+from pyelevator.soak import soak
+from pyelevator.soak import SoakSample
+
+# +: Number of floors in the simulated building.
+NUMBER_OF_FLOORS: int = 20
+
+# +: Default number of simulation steps to run.
+STEPS: int = 2_000_000
+
+# +: Number of samples to take over the run.
+SAMPLES: int = 40
+
+# +: Budget for the bytes allocated within a single step.
+STEP_BYTES_BUDGET: float = 400.0
+
+
+def print_sample(sample: SoakSample) -> None:
+    print(
+        f"{sample.steps:>12,}  {sample.wall_time:>8.1f}  {sample.traced_bytes / 1024:>10.1f}  "
+        f"{sample.rss_bytes / 2**20:>8.1f}  {sample.step_bytes:>10.1f}",
+    )
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else STEPS
+    for stream in (False, True):
+        print(f"{'streaming events' if stream else 'plain loop'}:")
+        print(
+            f"{'steps':>12}  {'wall s':>8}  {'traced KiB':>10}  {'RSS MiB':>8}  "
+            f"{'bytes/step':>10}",
+        )
+        report = soak(
+            Elevator(NUMBER_OF_FLOORS, capacity=12, enable_sleep=False),
+            steps,
+            sample_every=max(1, steps // SAMPLES),
+            seed=2023,
+            stream=stream,
+            on_sample=print_sample,
+        )
+        print(
+            f"delivered {report.delivered:,} passengers; steady-state growth: traced "
+            f"{report.traced_growth} B, RSS {report.rss_growth} B, "
+            f"{report.blocks_per_step:+.6f} blocks/step; {report.step_bytes:.1f} B/step",
+        )
+
+        failures = list()
+        if report.is_growing():
+            failures.append("steady-state memory grew")
+        if report.step_bytes > STEP_BYTES_BUDGET:
+            failures.append(f"{report.step_bytes:.1f} bytes per step is over budget")
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
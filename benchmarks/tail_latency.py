@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Compare wait-time tails of the plain sweep against age-aware scheduling with several
+``wait_target`` settings, on adversarial and up-peak workloads, with and without a
+capacity limit.
+
+Run from the repository root with::
+
+    python -m benchmarks.tail_latency
+"""
+import logging
+
+from pyelevator import Elevator
+from pyelevator.traffic import run_traffic
+from pyelevator.traffic import skewed_traffic
+from pyelevator.traffic import up_peak_traffic
+
+# +: Number of floors in the simulated building.
+NUMBER_OF_FLOORS: int = 30
+
+# +: Rated capacity of the car, in passengers, for the capped workloads.
+CAPACITY: int = 10
+
+# +: The wait_target settings to compare; None is the plain sweep.
+WAIT_TARGETS: list = [None, 600, 450, 300, 250, 150]
+
+# +: Seed shared by every run so they see identical traffic.
+SEED: int = 3
+
+
+def workloads():
+    yield "skewed", None, lambda: skewed_traffic(
+        NUMBER_OF_FLOORS,
+        500,
+        duration=3600,
+        seed=SEED,
+    )
+    yield "skewed", CAPACITY, lambda: skewed_traffic(
+        NUMBER_OF_FLOORS,
+        500,
+        duration=3600,
+        seed=SEED,
+    )
+    yield "up-peak", CAPACITY, lambda: up_peak_traffic(
+        NUMBER_OF_FLOORS,
+        250,
+        duration=3600,
+        seed=SEED,
+        interfloor=0.3,
+    )
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    print(
+        f"{'workload':<8}  {'capacity':>8}  {'target':>8}  {'mean':>6}  {'p50':>5}  "
+        f"{'p99':>5}  {'max':>5}",
+    )
+    for name, capacity, make_passengers in workloads():
+        for wait_target in WAIT_TARGETS:
+            elevator = Elevator(
+                NUMBER_OF_FLOORS,
+                capacity=capacity,
+                enable_sleep=False,
+                wait_target=wait_target,
+            )
+            report = run_traffic(elevator, make_passengers())
+            print(
+                f"{name:<8}  {str(capacity):>8}  {str(wait_target):>8}  "
+                f"{report.mean_wait:>6.1f}  "
+                f"{report.wait_percentile(50):>5}  {report.wait_percentile(99):>5}  "
+                f"{report.max_wait:>5}",
+            )
+
+
+if __name__ == "__main__":
+    main()
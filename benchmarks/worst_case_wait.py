@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Exhaustively explore the controller's state space for small buildings and report
+guaranteed worst-case waits, in controller steps, plus any starvation or livelock
+counterexamples. Someone pressing a button on the idle car's floor every step can
+starve the controller, so the table bounds waits for users who never do that, and
+the starvation it causes is shown after it.
+
+Run from the repository root with::
+
+    python -m benchmarks.worst_case_wait
+"""
+import logging
+import os
+import time
+from typing import Optional
+
+from pyelevator.explorer import explore
+
+# +: Buildings to explore, as (number of floors, most buttons lit at once).
+CONFIGURATIONS: list[tuple[int, Optional[int]]] = [
+    (3, None),
+    (4, None),
+    (5, None),
+    (8, 2),
+    (12, 2),
+    (12, 3),
+]
+
+# +: Worker processes for frontier partitioning.
+WORKERS: int = min(4, os.cpu_count() or 1)
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    print("without door holding:")
+    print(
+        f"{'floors':>6}  {'pending':>7}  {'states':>9}  {'transitions':>11}  "
+        f"{'worst wait':>10}  {'livelock':>8}  {'seconds':>7}",
+    )
+    for floors, max_pending in CONFIGURATIONS:
+        started = time.perf_counter()
+        report = explore(
+            floors,
+            max_pending=max_pending,
+            door_holding=False,
+            workers=WORKERS,
+        )
+        elapsed = time.perf_counter() - started
+        worst = "unbounded" if report.max_wait is None else f"{report.max_wait} steps"
+        print(
+            f"{floors:>6}  {str(max_pending or 'any'):>7}  {report.states:>9,}  "
+            f"{report.transitions:>11,}  {worst:>10}  "
+            f"{'found' if report.livelock else 'none':>8}  {elapsed:>7.1f}",
+        )
+
+    print()
+    print("with door holding allowed on 3 floors:")
+    report = explore(3)
+    counterexample = report.starvation
+    if counterexample is None:
+        print("    no starvation found")
+        return
+    call_type, floor_num = counterexample.call
+    print(f"    {call_type.name} call on floor {floor_num} can starve:")
+    for state in counterexample.prefix:
+        print(f"        {state}")
+    print("    then forever:")
+    for state in counterexample.cycle:
+        print(f"        {state}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Simulate zoned supertall buildings with sky lobbies and report per-zone and end-to-end
+journey times, along with the wall-clock cost of each run.
+
+Run from the repository root with::
+
+    python -m benchmarks.zoned_building
+"""
+import logging
+import time
+
+from pyelevator.building import Building
+from pyelevator.traffic import up_peak_traffic
+
+# +: Building heights to simulate.
+BUILDING_HEIGHTS: list[int] = [200, 350, 500]
+
+# +: Floors per zone, including the zone's lobby.
+ZONE_SIZE: int = 50
+
+# +: Journeys simulated in each building.
+JOURNEYS: int = 2000
+
+# +: Seed for the workload generator.
+SEED: int = 2023
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    for floors in BUILDING_HEIGHTS:
+        building = Building.zoned(
+            floors,
+            zone_size=ZONE_SIZE,
+            cars_per_zone=4,
+            shuttles_per_zone=2,
+            capacity=16,
+            shuttle_capacity=40,
+        )
+        journeys = up_peak_traffic(
+            floors,
+            JOURNEYS,
+            duration=3600,
+            seed=SEED,
+            interfloor=0.3,
+        )
+        started = time.perf_counter()
+        report = building.run(journeys)
+        wall_time = time.perf_counter() - started
+
+        print(
+            f"{floors} floors, {len(building.zones)} zones: "
+            f"{report.car_steps} car steps in {wall_time:.2f}s wall time",
+        )
+        print(
+            f"    end-to-end journey p50={report.journey_percentile(50)}s "
+            f"p99={report.journey_percentile(99)}s max={report.journey_percentile(100)}s",
+        )
+        for name, legs, mean_wait, max_wait, mean_leg in report.zone_summary():
+            print(
+                f"    {name:<16} legs={legs:>5}  mean wait={mean_wait:>7.1f}s  "
+                f"max wait={max_wait:>5}s  mean leg={mean_leg:>7.1f}s",
+            )
+
+
+if __name__ == "__main__":
+    main()
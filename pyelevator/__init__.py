@@ -5,7 +5,9 @@ __author__ = """Tammy Cravit"""
 __email__ = "tammy@tammymakesthings.com"
 __version__ = "0.1.0"
 
+from .call import CallType
 from .direction import Direction
 from .elevator import Elevator
+from .passenger import Passenger
 
-__all__ = ["Direction", "Elevator"]
+__all__ = ["CallType", "Direction", "Elevator", "Passenger"]
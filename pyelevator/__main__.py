@@ -1,9 +1,5 @@
 # -*- coding: utf-8 -*-
 """Console script for pyelevator."""
-import sys
-
-import click
-
 from pyelevator.cli import simulation as run_simulation
 
 if __name__ == "__main__":
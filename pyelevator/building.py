@@ -0,0 +1,456 @@
+# -*- coding: utf-8 -*-
+"""
+Elevator Exercise in Python
+Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
+"""
+import heapq
+import itertools
+import math
+from bisect import bisect_right
+from typing import Iterable
+from typing import Optional
+
+from .elevator import Elevator
+from .elevator import FLOOR_TRAVEL_TIME
+from .passenger import Passenger
+
+# +: Simulated seconds per floor for an express shuttle running non-stop.
+EXPRESS_FLOOR_TRAVEL_TIME: int = 1
+
+# +: The ground lobby, where every express shuttle starts.
+GROUND_LOBBY: int = 1
+
+# +: The most floors one zone can span, since each local car serves at most 100.
+MAX_ZONE_SIZE: int = 100
+
+
+class Bank:
+    """
+    A group of Elevator cars serving the same list of building floors.
+
+    A local bank serves a contiguous range of floors in a zone. An express bank
+    serves just the ground lobby and one sky lobby.
+    """
+
+    name: str
+    stops: list[int]
+    cars: list[Elevator]
+    leg_waits: list[int]
+    leg_times: list[int]
+
+    def __init__(
+        self,
+        name: str,
+        stops: Iterable[int],
+        *,
+        cars: int = 1,
+        capacity: Optional[int] = None,
+        floor_travel_time: int = FLOOR_TRAVEL_TIME,
+    ):
+        """
+        Create a new Bank.
+
+        Args:
+            name (str) - a label for the bank, used in reports.
+            stops (Iterable[int]) - the building floors the bank serves, in ascending order.
+            cars (int, keyword only) - the number of cars in the bank. Defaults to 1.
+            capacity (int, keyword only) - the rated capacity of each car.
+            floor_travel_time (int, keyword only) - the simulated seconds for a car to
+                travel between two adjacent served floors.
+
+        Raises:
+            ValueError - raised if the bank has no cars, or if the stops are not in
+                ascending order.
+        """
+        self.name = name
+        self.stops = list(stops)
+        if cars < 1:
+            raise ValueError("a bank needs at least one car", cars)
+        if self.stops != sorted(set(self.stops)):
+            raise ValueError("bank stops must be ascending and unique", self.stops)
+
+        self.cars = [
+            Elevator(
+                len(self.stops),
+                capacity=capacity,
+                enable_sleep=False,
+                floor_travel_time=floor_travel_time,
+            )
+            for _ in range(cars)
+        ]
+        self.leg_waits = list()
+        self.leg_times = list()
+
+    def local_floor(self, building_floor: int) -> int:
+        """
+        Translate a building floor into the floor number used by this bank's cars.
+
+        Raises:
+            ValueError - raised if the bank does not serve the floor.
+        """
+        index = bisect_right(self.stops, building_floor) - 1
+        if index < 0 or self.stops[index] != building_floor:
+            raise ValueError("floor is not served by this bank", building_floor)
+        return index + 1
+
+    def choose_car(self, local_origin: int) -> Elevator:
+        """
+        Pick the car that should answer a call from a local floor: the nearest car,
+        with loaded cars penalised.
+        """
+        return min(self.cars, key=lambda car: abs(car.floor - local_origin) + car.load)
+
+
+class Zone:
+    """
+    A contiguous range of floors served by one local bank. The lowest floor of the
+    range is the zone's lobby, which is either the ground lobby or a sky lobby reached
+    by express shuttle.
+    """
+
+    low: int
+    high: int
+    local: Bank
+    shuttle: Optional[Bank]
+
+    def __init__(self, local: Bank, shuttle: Optional[Bank] = None):
+        """
+        Create a new Zone.
+
+        Args:
+            local (Bank) - the local bank serving the zone's floors.
+            shuttle (Bank) - the express bank linking the ground lobby to this zone's
+                sky lobby, or None for the ground zone.
+        """
+        self.local = local
+        self.shuttle = shuttle
+        self.low = local.stops[0]
+        self.high = local.stops[-1]
+
+    @property
+    def lobby(self) -> int:
+        """
+        Get the lobby floor of the zone.
+        """
+        return self.low
+
+
+class _Trip:
+    """
+    Book-keeping for one journey being routed through the building.
+    """
+
+    __slots__ = ("journey", "route", "leg")
+
+    def __init__(self, journey: Passenger, route: list[tuple[Bank, int, int]]):
+        self.journey = journey
+        self.route = route
+        self.leg = 0
+
+
+class BuildingReport:
+    """
+    Per-zone and end-to-end statistics for a Building run.
+    """
+
+    journeys: list[Passenger]
+    banks: list[Bank]
+    elapsed_time: int
+    car_steps: int
+
+    def __init__(
+        self,
+        journeys: list[Passenger],
+        banks: list[Bank],
+        elapsed_time: int,
+        car_steps: int,
+    ):
+        self.journeys = journeys
+        self.banks = banks
+        self.elapsed_time = elapsed_time
+        self.car_steps = car_steps
+
+    @property
+    def journey_times(self) -> list[int]:
+        """
+        Get the sorted end-to-end journey times of every delivered passenger.
+        """
+        return sorted(
+            j.journey_time for j in self.journeys if j.journey_time is not None
+        )
+
+    def journey_percentile(self, percentile: float) -> int:
+        """
+        Get a nearest-rank percentile of the end-to-end journey times.
+        """
+        times = self.journey_times
+        if not times:
+            return 0
+        return times[max(1, math.ceil(percentile / 100 * len(times))) - 1]
+
+    def zone_summary(self) -> list[tuple[str, int, float, int, float]]:
+        """
+        Summarise every bank as ``(name, legs, mean wait, max wait, mean leg time)``.
+        """
+        summary = list()
+        for bank in self.banks:
+            legs = len(bank.leg_times)
+            summary.append(
+                (
+                    bank.name,
+                    legs,
+                    sum(bank.leg_waits) / legs if legs else 0.0,
+                    max(bank.leg_waits, default=0),
+                    sum(bank.leg_times) / legs if legs else 0.0,
+                ),
+            )
+        return summary
+
+
+class Building:
+    """
+    A high-rise building split into zones, each with a local bank and, above the
+    ground zone, an express shuttle to its sky lobby.
+
+    Journeys between zones are split into legs at the lobbies. The simulation is
+    event driven: only cars with pending calls are stepped, so its cost depends on
+    the number of active cars and calls rather than on the height of the building.
+    """
+
+    zones: list[Zone]
+    _zone_lows: list[int]
+
+    def __init__(self, zones: Iterable[Zone]):
+        """
+        Create a new Building.
+
+        Args:
+            zones (Iterable[Zone]) - the zones, from the bottom of the building up.
+
+        Raises:
+            ValueError - raised if the zones overlap or leave gaps, if the first zone
+                does not start at the ground lobby, or if a sky zone has no shuttle.
+        """
+        self.zones = list(zones)
+        if not self.zones or self.zones[0].low != GROUND_LOBBY:
+            raise ValueError("the first zone must start at the ground lobby")
+        for below, above in zip(self.zones, self.zones[1:]):
+            if above.low != below.high + 1:
+                raise ValueError("zones must be contiguous", above.low)
+            if above.shuttle is None:
+                raise ValueError("sky zones need an express shuttle", above.low)
+        self._zone_lows = [zone.low for zone in self.zones]
+
+    @classmethod
+    def zoned(
+        cls,
+        number_of_floors: int,
+        *,
+        zone_size: int,
+        cars_per_zone: int = 2,
+        shuttles_per_zone: int = 1,
+        capacity: Optional[int] = None,
+        shuttle_capacity: Optional[int] = None,
+    ) -> "Building":
+        """
+        Build a Building of equally sized zones.
+
+        A car needs at least two floors, so if the floors left over for the top zone
+        come to just one, it is merged into the zone below. If that zone is already
+        :py:const:`MAX_ZONE_SIZE` floors high, it gives up its top floor instead, and
+        the top zone spans two floors.
+
+        Args:
+            number_of_floors (int) - the height of the building.
+            zone_size (int, keyword only) - the number of floors per zone, from 2 to
+                :py:const:`MAX_ZONE_SIZE`.
+            cars_per_zone (int, keyword only) - local cars in each zone's bank.
+            shuttles_per_zone (int, keyword only) - express cars serving each sky lobby.
+            capacity (int, keyword only) - the capacity of each local car.
+            shuttle_capacity (int, keyword only) - the capacity of each shuttle car.
+
+        Returns:
+            Building - the newly created Building.
+
+        Raises:
+            ValueError - raised if the zone size is out of range, or if the building has
+                fewer than two floors.
+        """
+        if not (2 <= zone_size <= MAX_ZONE_SIZE):
+            raise ValueError("invalid zone size", zone_size)
+        if number_of_floors < 2:
+            raise ValueError("invalid number of floors", number_of_floors)
+
+        bounds = [
+            (low, min(low + zone_size - 1, number_of_floors))
+            for low in range(GROUND_LOBBY, number_of_floors + 1, zone_size)
+        ]
+        if bounds[-1][0] == bounds[-1][1]:
+            top = bounds.pop()[1]
+            low, high = bounds.pop()
+            if top - low < MAX_ZONE_SIZE:
+                bounds.append((low, top))
+            else:
+                bounds += [(low, high - 1), (top - 1, top)]
+
+        zones = list()
+        for low, high in bounds:
+            local = Bank(
+                f"local {low}-{high}",
+                range(low, high + 1),
+                cars=cars_per_zone,
+                capacity=capacity,
+            )
+            shuttle = None
+            if low != GROUND_LOBBY:
+                shuttle = Bank(
+                    f"express {GROUND_LOBBY}-{low}",
+                    [GROUND_LOBBY, low],
+                    cars=shuttles_per_zone,
+                    capacity=shuttle_capacity,
+                    floor_travel_time=(low - GROUND_LOBBY) * EXPRESS_FLOOR_TRAVEL_TIME,
+                )
+            zones.append(Zone(local, shuttle))
+        return cls(zones)
+
+    @property
+    def number_of_floors(self) -> int:
+        """
+        Get the height of the building.
+        """
+        return self.zones[-1].high
+
+    @property
+    def banks(self) -> list[Bank]:
+        """
+        Get every bank in the building, local banks and shuttles alike.
+        """
+        banks = list()
+        for zone in self.zones:
+            banks.append(zone.local)
+            if zone.shuttle is not None:
+                banks.append(zone.shuttle)
+        return banks
+
+    def zone_for_floor(self, floor_num: int) -> Zone:
+        """
+        Find the zone serving a building floor.
+
+        Raises:
+            ValueError - raised if the floor is outside the building.
+        """
+        if not (GROUND_LOBBY <= floor_num <= self.number_of_floors):
+            raise ValueError("invalid floor number", floor_num)
+        return self.zones[bisect_right(self._zone_lows, floor_num) - 1]
+
+    def route(self, origin: int, destination: int) -> list[tuple[Bank, int, int]]:
+        """
+        Split a journey into legs of ``(bank, from floor, to floor)``.
+
+        Journeys inside a zone take the local bank. Journeys between zones ride the
+        local bank to the lobby, the express shuttles through the ground lobby, and
+        the local bank of the destination zone from its lobby.
+        """
+        origin_zone = self.zone_for_floor(origin)
+        destination_zone = self.zone_for_floor(destination)
+        if origin_zone is destination_zone:
+            return [(origin_zone.local, origin, destination)]
+
+        legs = list()
+        if origin != origin_zone.lobby:
+            legs.append((origin_zone.local, origin, origin_zone.lobby))
+        if origin_zone.shuttle is not None:
+            legs.append((origin_zone.shuttle, origin_zone.lobby, GROUND_LOBBY))
+        if destination_zone.shuttle is not None:
+            legs.append((destination_zone.shuttle, GROUND_LOBBY, destination_zone.lobby))
+        if destination != destination_zone.lobby:
+            legs.append((destination_zone.local, destination_zone.lobby, destination))
+        return legs
+
+    def run(self, journeys: Iterable[Passenger]) -> BuildingReport:
+        """
+        Simulate a set of journeys given in building floors until all are delivered.
+
+        Each journey's ``board_time`` and ``alight_time`` are filled in from its first
+        and last legs.
+
+        Args:
+            journeys (Iterable[Passenger]) - the journeys to simulate.
+
+        Returns:
+            BuildingReport - the per-zone and end-to-end statistics.
+        """
+        journeys = list(journeys)
+        sequence = itertools.count()
+        events: list[tuple[int, int, object]] = list()
+        for journey in journeys:
+            trip = _Trip(journey, self.route(journey.origin, journey.destination))
+            heapq.heappush(events, (journey.arrival_time, next(sequence), trip))
+
+        active: set[int] = set()
+        in_flight: dict[int, list[tuple[Passenger, _Trip]]] = dict()
+        car_steps = 0
+        now = 0
+
+        while events:
+            now, _, item = heapq.heappop(events)
+
+            if isinstance(item, _Trip):
+                bank, origin, destination = item.route[item.leg]
+                local_origin = bank.local_floor(origin)
+                car = bank.choose_car(local_origin)
+                leg = Passenger(
+                    local_origin,
+                    bank.local_floor(destination),
+                    arrival_time=now,
+                )
+                if id(car) not in active:
+                    car.elapsed_time = max(car.elapsed_time, now)
+                    active.add(id(car))
+                    heapq.heappush(events, (car.elapsed_time, next(sequence), car))
+                car.add_passenger(leg)
+                in_flight.setdefault(id(car), list()).append((leg, item))
+                continue
+
+            car = item
+            delivered_before = car.passengers_delivered
+            car.simulation_move_one_step()
+            car_steps += 1
+            if car.passengers_delivered != delivered_before:
+                self._finish_legs(car, in_flight, events, sequence)
+
+            if car.simulation_can_move():
+                heapq.heappush(events, (car.elapsed_time, next(sequence), car))
+            else:
+                active.discard(id(car))
+
+        return BuildingReport(journeys, self.banks, now, car_steps)
+
+    def _finish_legs(
+        self,
+        car: Elevator,
+        in_flight: dict[int, list[tuple[Passenger, _Trip]]],
+        events: list,
+        sequence: itertools.count,
+    ) -> None:
+        """
+        Record the legs a car has just delivered, and release the next leg of each
+        journey at the transfer floor.
+        """
+        still_riding = list()
+        for leg, trip in in_flight[id(car)]:
+            if leg.alight_time is None:
+                still_riding.append((leg, trip))
+                continue
+
+            bank = trip.route[trip.leg][0]
+            bank.leg_waits.append(leg.wait_time)
+            bank.leg_times.append(leg.journey_time)
+            if trip.leg == 0:
+                trip.journey.board_time = leg.board_time
+            trip.leg += 1
+            if trip.leg == len(trip.route):
+                trip.journey.alight_time = leg.alight_time
+            else:
+                heapq.heappush(events, (leg.alight_time, next(sequence), trip))
+        in_flight[id(car)] = still_riding
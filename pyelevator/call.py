@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Elevator Exercise in Python
+Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
+"""
+from enum import auto
+from enum import IntEnum
+from typing import NamedTuple
+
+
+class CallType(IntEnum):
+    """
+    Defines which button registered a call.
+    """
+
+    UP = auto()
+    DOWN = auto()
+    CAR = auto()
+
+
+class PendingCall(NamedTuple):
+    """
+    A call waiting to be served, with the simulated time it was registered.
+    """
+
+    registered_at: int
+    call_type: CallType
+    floor: int
@@ -1,14 +1,11 @@
 # -*- coding: utf-8 -*-
 """Console script for pyelevator."""
-import functools
 import logging
-import sys
 from typing import List
 from typing import Optional
 
 import click
 
-from .direction import Direction
 from .elevator import Elevator
 
 # +: A type alias for the selected button lists.
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Elevator Exercise in Python
+Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
+
+Destination dispatch: passengers enter their destination at a hall kiosk instead of
+pressing an up or down button, so the controller knows where everyone is going
+before they board. Waiting passengers are grouped by origin, direction and nearby
+destination, and the car carries one trip's worth of groups at a time, which keeps
+the number of stops per trip down.
+"""
+import heapq
+from typing import Optional
+
+from .direction import Direction
+from .elevator import Elevator
+from .passenger import Passenger
+from .stop_index import StopIndex
+
+# +: Default furthest a destination may be from its group's first destination, in floors.
+# Nearby groups are still carried together when a trip is assembled, so exact grouping
+# does best on up-peak traffic.
+GROUP_SPREAD: int = 0
+
+
+class _Group:
+    """
+    Passengers with the same origin and direction bound for nearby floors. The
+    ``anchor`` is the first passenger's destination, which every other destination
+    in the group is within the spread of.
+    """
+
+    __slots__ = ("origin", "direction", "anchor", "passengers", "committed")
+
+    def __init__(self, origin: int, direction: Direction, anchor: int):
+        self.origin = origin
+        self.direction = direction
+        self.anchor = anchor
+        self.passengers: list[Passenger] = list()
+        self.committed = False
+
+
+class DestinationDispatchElevator(Elevator):
+    """
+    An Elevator whose calls arrive as ``(origin, destination)`` pairs from a hall
+    kiosk rather than from up and down buttons.
+
+    :py:meth:`add_passenger` places each new passenger in a group in O(log n): the
+    open groups for each origin and direction are indexed by anchor floor in a
+    :py:class:`StopIndex`, so the nearest anchor on either side of the destination is
+    found with two rank queries. A group closes once it would fill the car.
+
+    Whenever the car has nothing left to do, the oldest waiting group is committed as
+    the next trip, together with the open groups from the same origin and direction
+    whose anchors lie closest to it, for as long as the car has room. Only then are
+    the hall call and the boarding queue set up, so the car stops once at the origin
+    and then only at the floors the trip's groups are bound for.
+    """
+
+    _group_spread: int
+    _open_groups: dict[tuple[int, Direction], StopIndex]
+    _open_at: dict[tuple[int, Direction, int], _Group]
+    _group_heap: list[tuple[int, int, _Group]]
+    _group_sequence: int
+    _uncommitted: int
+
+    trips_dispatched: int
+
+    def __init__(
+        self,
+        number_of_floors: int,
+        *,
+        group_spread: int = GROUP_SPREAD,
+        **kwargs,
+    ):
+        """
+        Create a new DestinationDispatchElevator instance.
+
+        Args:
+            number_of_floors (int) - The number of floors in the building.
+            group_spread (int, keyword only) - How many floors a destination may be
+                from its group's first destination. 0 groups only identical
+                destinations. Defaults to :py:const:`GROUP_SPREAD`.
+
+        Other keyword arguments are passed on to :py:class:`Elevator`.
+
+        Raises:
+            ValueError - Raised for any reason :py:class:`Elevator` would, or if the
+            group spread is negative.
+        """
+        if group_spread < 0:
+            raise ValueError("invalid group spread", group_spread)
+
+        super().__init__(number_of_floors, **kwargs)
+        self._group_spread = group_spread
+        self._open_groups = dict()
+        self._open_at = dict()
+        self._group_heap = list()
+        self._group_sequence = 0
+        self._uncommitted = 0
+        self.trips_dispatched = 0
+
+    @property
+    def waiting_at_kiosk(self) -> int:
+        """
+        Get the number of passengers who have entered a destination but have not yet
+        been assigned to a trip.
+        """
+        return self._uncommitted
+
+    def add_passenger(self, passenger: Passenger) -> None:
+        """
+        Register a destination entered at the kiosk on the passenger's origin floor,
+        and place the passenger in a group. No hall button is pressed until the group
+        is committed to a trip.
+
+        Args:
+            passenger (Passenger) - the passenger to register.
+
+        Raises:
+            ValueError - raised if the origin or destination floor is invalid.
+        """
+        for floor_num in (passenger.origin, passenger.destination):
+            if not (1 <= floor_num <= self.number_of_floors):
+                raise ValueError("invalid floor number", floor_num)
+
+        origin = self._boarding_floor(passenger)
+        direction = passenger.direction
+        group = self._nearest_open_group(origin, direction, passenger.destination)
+        if group is None:
+            group = self._open_group(origin, direction, passenger.destination)
+            heapq.heappush(
+                self._group_heap,
+                (passenger.arrival_time, self._group_sequence, group),
+            )
+            self._group_sequence += 1
+
+        group.passengers.append(passenger)
+        self._uncommitted += 1
+        if self._capacity is not None and len(group.passengers) >= self._capacity:
+            self._close_group(group)
+
+    def _open_group(self, origin: int, direction: Direction, anchor: int) -> _Group:
+        key = (origin, direction)
+        index = self._open_groups.get(key)
+        if index is None:
+            index = self._open_groups[key] = StopIndex(self.number_of_floors)
+        group = _Group(origin, direction, anchor)
+        index.add(anchor)
+        self._open_at[(origin, direction, anchor)] = group
+        return group
+
+    def _close_group(self, group: _Group) -> None:
+        key = (group.origin, group.direction, group.anchor)
+        if self._open_at.get(key) is group:
+            del self._open_at[key]
+            self._open_groups[(group.origin, group.direction)].remove(group.anchor)
+
+    def _neighbours(
+        self,
+        index: StopIndex,
+        floor_num: int,
+    ) -> tuple[Optional[int], Optional[int]]:
+        """
+        Get the nearest indexed anchors at or below, and above, ``floor_num``.
+        """
+        rank = index.count(1, floor_num)
+        below = index.nth(rank) if rank else None
+        above = index.nth(rank + 1) if rank < index.total else None
+        return below, above
+
+    def _nearest_open_group(
+        self,
+        origin: int,
+        direction: Direction,
+        destination: int,
+    ) -> Optional[_Group]:
+        """
+        Find the open group whose anchor is nearest ``destination`` and within the
+        spread, preferring the lower anchor on a tie.
+        """
+        index = self._open_groups.get((origin, direction))
+        if index is None or index.total == 0:
+            return None
+        best = None
+        for anchor in self._neighbours(index, destination):
+            if anchor is None or abs(anchor - destination) > self._group_spread:
+                continue
+            if best is None or abs(anchor - destination) < abs(best - destination):
+                best = anchor
+        return None if best is None else self._open_at[(origin, direction, best)]
+
+    def _next_seed(self) -> Optional[_Group]:
+        heap = self._group_heap
+        while heap and heap[0][2].committed:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def _commit_next_trip(self) -> bool:
+        """
+        Commit the oldest waiting group, and its nearest neighbours from the same
+        origin and direction that fit in the car, as the next trip.
+
+        Returns:
+            bool - True if a trip was committed, False if nobody is waiting.
+        """
+        seed = self._next_seed()
+        if seed is None:
+            return False
+
+        trip = [seed]
+        room = None if self._capacity is None else self._capacity - self._load
+        if room is not None:
+            room -= len(seed.passengers)
+        index = self._open_groups.get((seed.origin, seed.direction))
+        if index is not None and (room is None or room > 0):
+            # Walk outwards from the seed's anchor, taking the nearer neighbour each
+            # time, while there is room. Ranks are stable because nothing is removed
+            # from the index until the walk is over.
+            rank = index.count(1, seed.anchor)
+            seed_key = (seed.origin, seed.direction, seed.anchor)
+            seed_is_open = self._open_at.get(seed_key) is seed
+            lower = rank - 1 if seed_is_open else rank
+            upper = rank + 1
+            while (room is None or room > 0) and (lower >= 1 or upper <= index.total):
+                below = index.nth(lower) if lower >= 1 else None
+                above = index.nth(upper) if upper <= index.total else None
+                if above is None or (
+                    below is not None and seed.anchor - below <= above - seed.anchor
+                ):
+                    anchor, lower = below, lower - 1
+                else:
+                    anchor, upper = above, upper + 1
+                group = self._open_at[(seed.origin, seed.direction, anchor)]
+                if room is None or len(group.passengers) <= room:
+                    trip.append(group)
+                    if room is not None:
+                        room -= len(group.passengers)
+
+        queue = (
+            self._waiting_up[seed.origin]
+            if seed.direction == Direction.UP
+            else self._waiting_down[seed.origin]
+        )
+        for group in trip:
+            self._close_group(group)
+            group.committed = True
+            queue.extend(group.passengers)
+            self._uncommitted -= len(group.passengers)
+        if seed.direction == Direction.UP:
+            self.press_up(seed.origin)
+        else:
+            self.press_down(seed.origin)
+        self.trips_dispatched += 1
+        return True
+
+    def simulation_move_one_step(self) -> None:
+        """
+        Run one iteration of the simulation, committing the next trip first if the
+        car has nothing left to do.
+        """
+        if self._pending_call_count == 0:
+            self._commit_next_trip()
+        super().simulation_move_one_step()
+
+    def simulation_can_move(self) -> bool:
+        """
+        Determine if the simulation can move at all: either a call is pending or a
+        group is waiting to be dispatched.
+        """
+        return self._pending_call_count > 0 or self._uncommitted > 0
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+Elevator Exercise in Python
+Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
+
+A double-deck car: two cabs fixed one floor apart that stop at a pair of adjacent
+floors at once. The lower deck serves the odd floors and the upper deck the even
+floors, so the car only ever stops with its lower deck on an odd floor.
+"""
+from typing import Optional
+
+from .direction import Direction
+from .elevator import Elevator
+from .passenger import Passenger
+
+# +: The lower deck, which serves the odd floors.
+LOWER_DECK: int = 0
+
+# +: The upper deck, which serves the even floors.
+UPPER_DECK: int = 1
+
+
+class DoubleDeckElevator(Elevator):
+    """
+    A double-deck Elevator serving odd/even floor pairs in a single stop.
+
+    :py:attr:`floor` is the floor of the lower deck, and the upper deck is always one
+    floor above it. Each deck has its own car buttons: because the decks serve floors
+    of opposite parity, the car button for an odd floor is on the lower deck's panel
+    and the car button for an even floor is on the upper deck's panel.
+
+    A passenger rides the deck serving the floor they board on, and leaves the car at
+    the stop serving their destination; if that floor belongs to the other deck they
+    alight on the adjacent floor and take the stairs. At the two-level lobby formed by
+    the ground floor and the floor above, passengers instead walk to the level whose
+    deck serves their destination, which splits lobby loading between the decks.
+    Passengers whose origin and destination share a stop never call the car.
+    """
+
+    _deck_load: list[int]
+    _lobby: int
+
+    _floor_step = 2
+
+    def __init__(
+        self,
+        number_of_floors: int,
+        *,
+        current_floor: int = 1,
+        direction: Direction = Direction.STOPPED,
+        capacity: Optional[int] = None,
+        lobby: int = 1,
+        **kwargs,
+    ):
+        """
+        Create a new DoubleDeckElevator instance.
+
+        Args:
+            number_of_floors (int) - The number of floors in the building. Must be even
+                so that every floor belongs to exactly one stop.
+            current_floor (int, keyword only) - The floor the lower deck starts on. Must
+                be odd. Defaults to 1.
+            direction (Direction, keyword only) - The initial direction.
+            capacity (int, keyword only) - The rated capacity of each deck, in
+                passengers. Defaults to None, meaning the decks are never full.
+            lobby (int, keyword only) - The lower level of the two-level lobby. Must be
+                odd. Defaults to 1.
+
+        Other keyword arguments are passed on to :py:class:`Elevator`.
+
+        Raises:
+            ValueError - Raised for any reason :py:class:`Elevator` would, or if the
+            number of floors is odd, or if the starting floor or lobby is not a lower
+            deck floor.
+        """
+        if number_of_floors % 2:
+            raise ValueError("double-deck cars need an even number of floors", number_of_floors)
+        if current_floor % 2 == 0:
+            raise ValueError("the lower deck must start on an odd floor", current_floor)
+        if lobby % 2 == 0 or not 1 <= lobby < number_of_floors:
+            raise ValueError("invalid lobby floor", lobby)
+
+        super().__init__(
+            number_of_floors,
+            current_floor=current_floor,
+            direction=direction,
+            capacity=capacity,
+            **kwargs,
+        )
+        self._deck_load = [0, 0]
+        self._lobby = lobby
+
+    @staticmethod
+    def deck_for_floor(floor_num: int) -> int:
+        """
+        Get the deck that serves a floor.
+
+        Args:
+            floor_num (int) - the floor number.
+
+        Returns:
+            int - :py:const:`LOWER_DECK` for odd floors, :py:const:`UPPER_DECK` for even.
+        """
+        return UPPER_DECK if floor_num % 2 == 0 else LOWER_DECK
+
+    @staticmethod
+    def stop_for_floor(floor_num: int) -> int:
+        """
+        Get the stop position (the lower deck's floor) at which a floor is served.
+
+        Args:
+            floor_num (int) - the floor number.
+
+        Returns:
+            int - the odd floor the lower deck is on when the car serves ``floor_num``.
+        """
+        return floor_num - 1 if floor_num % 2 == 0 else floor_num
+
+    def deck_load(self, deck: int) -> int:
+        """
+        Get the number of passengers riding in one deck.
+
+        Args:
+            deck (int) - :py:const:`LOWER_DECK` or :py:const:`UPPER_DECK`.
+
+        Returns:
+            int - the deck's load.
+        """
+        return self._deck_load[deck]
+
+    def deck_car_buttons(self, deck: int) -> list[int]:
+        """
+        Get the floors whose car buttons are lit on one deck's panel.
+
+        Args:
+            deck (int) - :py:const:`LOWER_DECK` or :py:const:`UPPER_DECK`.
+
+        Returns:
+            list[int] - the lit floors, in ascending order.
+        """
+        return [
+            floor_num
+            for floor_num in range(1 + deck, self.number_of_floors + 1, 2)
+            if self.car_buttons[floor_num]
+        ]
+
+    @property
+    def is_full(self) -> bool:
+        """
+        Check whether both decks are at capacity.
+
+        Returns:
+            bool - True if neither deck can take another passenger.
+        """
+        if self._capacity is None:
+            return False
+        return min(self._deck_load) >= self._capacity
+
+    def _deck_is_full(self, floor_num: int) -> bool:
+        if self._capacity is None:
+            return False
+        return self._deck_load[self.deck_for_floor(floor_num)] >= self._capacity
+
+    def _no_room_at(self, floor_num: int) -> bool:
+        return self._deck_is_full(floor_num)
+
+    def add_passenger(self, passenger: Passenger) -> None:
+        """
+        Register a passenger waiting for the car. See :py:meth:`Elevator.add_passenger`.
+
+        A passenger whose origin and destination are served by the same stop walks
+        between the two floors, and is recorded as delivered on arrival.
+        """
+        origin, destination = passenger.origin, passenger.destination
+        if (
+            1 <= origin <= self.number_of_floors
+            and 1 <= destination <= self.number_of_floors
+            and self.stop_for_floor(self._boarding_floor(passenger))
+            == self.stop_for_floor(destination)
+        ):
+            passenger.board_time = passenger.arrival_time
+            passenger.alight_time = passenger.arrival_time
+            self.passengers_delivered += 1
+            return
+        super().add_passenger(passenger)
+
+    def _boarding_floor(self, passenger: Passenger) -> int:
+        if self.stop_for_floor(passenger.origin) != self._lobby:
+            return passenger.origin
+        return self._lobby + self.deck_for_floor(passenger.destination)
+
+    def _alight_floor(self, passenger: Passenger, floor_num: int) -> int:
+        return self.stop_for_floor(passenger.destination) + self.deck_for_floor(floor_num)
+
+    def _room_at(self, floor_num: int) -> Optional[int]:
+        if self._capacity is None:
+            return None
+        return max(0, self._capacity - self._deck_load[self.deck_for_floor(floor_num)])
+
+    def _stop_floors(self, floor_num: int) -> tuple[int, ...]:
+        stop = self.stop_for_floor(floor_num)
+        return (stop, stop + 1)
+
+    def _alight_passengers(self, floor_num: int) -> int:
+        alighted = super()._alight_passengers(floor_num)
+        self._deck_load[self.deck_for_floor(floor_num)] -= alighted
+        return alighted
+
+    def _board_passengers(self, floor_num: int, moving_direction: Direction) -> int:
+        boarded = super()._board_passengers(floor_num, moving_direction)
+        self._deck_load[self.deck_for_floor(floor_num)] += boarded
+        return boarded
+
+    def _floor_needs_stop(self, floor_num: int) -> bool:
+        if self.car_buttons[floor_num]:
+            return True
+        if self._full_car_bypass and self._deck_is_full(floor_num):
+            return False
+        match self.direction:
+            case Direction.STOPPED:
+                return self.up_buttons[floor_num] or self.down_buttons[floor_num]
+            case Direction.UP:
+                return self.up_buttons[floor_num]
+            case Direction.DOWN:
+                return self.down_buttons[floor_num]
+            case _:
+                return False
+
+    def stop_needed_on_floor(self, floor_num: int) -> bool:
+        """
+        Determine whether the car needs to stop at the stop serving a floor.
+
+        The deck-aware equivalent of :py:meth:`Elevator.stop_needed_on_floor`: a stop is
+        needed if either floor of the pair needs one, and with ``full_car_bypass`` a
+        full deck ignores hall calls on its own floor while the other deck still
+        answers them.
+
+        Args:
+            floor_num (int) - either floor of the pair to check.
+
+        Returns:
+            bool - True if the car needs to stop there, False otherwise.
+
+        Raises:
+            ValueError - raised if the floor number specified is invalid.
+        """
+        if not (1 <= floor_num <= self.number_of_floors):
+            raise ValueError("invalid floor number", floor_num)
+        return any(self._floor_needs_stop(served) for served in self._stop_floors(floor_num))
+
+    def call_pending_on_floor(self, floor_num: int) -> bool:
+        """
+        Determine whether a call the car will answer is pending on a floor, ignoring the
+        direction of travel. A full deck's hall calls are skipped with bypass enabled.
+
+        Args:
+            floor_num (int) - the floor number to check.
+
+        Returns:
+            bool - True if the floor has a pending call, False otherwise.
+        """
+        if self.car_buttons[floor_num]:
+            return True
+        if self._full_car_bypass and self._deck_is_full(floor_num):
+            return False
+        return self.up_buttons[floor_num] or self.down_buttons[floor_num]
+
+    def _stop_pending(self, stop: int) -> bool:
+        return self.call_pending_on_floor(stop) or self.call_pending_on_floor(stop + 1)
+
+    def has_stops_above_current_floor(self) -> bool:
+        """
+        Check whether any stop above the current one is needed, without allocating.
+
+        Returns:
+            bool - True if either floor of a higher stop has a pending call.
+        """
+        stop = self._current_floor + 2
+        while stop < self._number_of_floors:
+            if self._stop_pending(stop):
+                return True
+            stop += 2
+        return False
+
+    def has_stops_below_current_floor(self) -> bool:
+        """
+        Check whether any stop below the current one is needed, without allocating.
+
+        Returns:
+            bool - True if either floor of a lower stop has a pending call.
+        """
+        stop = self._current_floor - 2
+        while stop >= 1:
+            if self._stop_pending(stop):
+                return True
+            stop -= 2
+        return False
+
+    def stops_needed_above_current_floor(self) -> list[int]:
+        """
+        Get the stops above the current one with a pending call on either floor.
+
+        Returns:
+            list[int] - the lower deck floor of each such stop.
+        """
+        return [
+            stop
+            for stop in range(self.floor + 2, self.number_of_floors, 2)
+            if self._stop_pending(stop)
+        ]
+
+    def stops_needed_below_current_floor(self) -> list[int]:
+        """
+        Get the stops below the current one with a pending call on either floor.
+
+        Returns:
+            list[int] - the lower deck floor of each such stop.
+        """
+        return [stop for stop in range(1, self.floor, 2) if self._stop_pending(stop)]
+
+    def on_top_floor(self) -> bool:
+        """
+        Check if the upper deck is on the top floor.
+
+        Returns:
+            bool - True if the car is at its highest stop, False otherwise.
+        """
+        return self.floor == self.number_of_floors - 1
@@ -3,15 +3,39 @@
 Elevator Exercise in Python
 Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
 """
+import heapq
 import logging
-
-logging.basicConfig(level=logging.DEBUG)
-
-from enum import IntEnum, auto
-from random import randint
+from collections import deque
 from time import sleep
+from typing import AsyncIterator
+from typing import Callable
+from typing import Iterator
+from typing import Optional
 
+from .call import CallType
+from .call import PendingCall
 from .direction import Direction
+from .events import CallRegistered
+from .events import CallServed
+from .events import DirectionChanged
+from .events import Doors
+from .events import Event
+from .events import Idle
+from .events import Moved
+from .events import Stopped
+from .passenger import Passenger
+from .stop_index import StopIndex
+
+logger = logging.getLogger(__name__)
+
+# +: Simulated seconds for the car to travel between two adjacent floors.
+FLOOR_TRAVEL_TIME: int = 2
+
+# +: Simulated seconds to open and close the doors at a stop.
+DOOR_CYCLE_TIME: int = 4
+
+# +: Simulated seconds for a single passenger to board or alight.
+PASSENGER_TRANSFER_TIME: int = 1
 
 
 class Elevator:
@@ -28,12 +52,48 @@ class Elevator:
     _car_buttons: list[bool]
     _idle_count: int = 0
 
+    # +: Floors the car travels between adjacent stop positions.
+    _floor_step: int = 1
+
+    _capacity: Optional[int]
+    _load: int
+    _full_car_bypass: bool
+    _enable_sleep: bool
+    _floor_travel_time: int
+    _elapsed_time: int
+    _last_stop: Optional[tuple[int, Direction]]
+    _wait_target: Optional[int]
+
+    _up_calls: list[Optional[PendingCall]]
+    _down_calls: list[Optional[PendingCall]]
+    _car_calls: list[Optional[PendingCall]]
+    _call_heap: list[PendingCall]
+    _pending_call_count: int
+    _stop_index: StopIndex
+    _sweep_indexes: tuple[StopIndex, StopIndex, StopIndex, StopIndex]
+    _indexes_for_call: dict[CallType, tuple[StopIndex, ...]]
+    _sweep_counts: tuple[Callable[[int, int], int], ...]
+    _listeners: list[Callable[[Event], None]]
+
+    _waiting_up: list[deque[Passenger]]
+    _waiting_down: list[deque[Passenger]]
+    _riders: list[list[Passenger]]
+
+    stops_made: int
+    wasted_stops: int
+    passengers_delivered: int
+
     def __init__(
         self,
         number_of_floors: int,
         *,
         current_floor: int = 1,
         direction: Direction = Direction.STOPPED,
+        capacity: Optional[int] = None,
+        full_car_bypass: bool = True,
+        enable_sleep: bool = True,
+        floor_travel_time: int = FLOOR_TRAVEL_TIME,
+        wait_target: Optional[int] = None,
     ):
         """
         Create a new Elevator instance.
@@ -44,13 +104,29 @@ class Elevator:
                 on. Defaults to 1 if not specified.
             direction (Direction, keyword only) - The initial direction for the Elevator.
                 Defaults to Direction.STOPPED if not specified.
+            capacity (int, keyword only) - The rated capacity of the car in passengers.
+                Defaults to None, meaning the car is never full.
+            full_car_bypass (bool, keyword only) - Whether a full car skips hall calls and
+                serves only car calls. Defaults to True.
+            enable_sleep (bool, keyword only) - Whether stops call :py:func:`time.sleep` to
+                pace the simulation in real time. Defaults to True.
+            floor_travel_time (int, keyword only) - Simulated seconds to travel between
+                two adjacent served floors. Defaults to :py:const:`FLOOR_TRAVEL_TIME`.
+            wait_target (int, keyword only) - Enables age-aware scheduling: when the
+                oldest pending call would wait longer than this many simulated seconds
+                on the current sweep, the car turns round early for it, as long as that
+                gets there in time and shortens the longest projected wait. Below
+                saturation, a target of at least one round trip bounds every wait;
+                when the car or a floor is overloaded, nothing can, and the car falls
+                back to the plain sweep. Defaults to None, which keeps the plain sweep.
 
         Returns:
             The newly created Elevator instance.
 
         Raises:
             ValueError - Raised if the number of floors is less than 2, or greater than 100,
-            if the current floor is out of range, or if the initial direction is invalid.
+            if the current floor is out of range, if the initial direction is invalid, or if
+            the capacity is less than 1, or if the wait target is negative.
         """
         if number_of_floors < 2 or number_of_floors > 100:
             raise ValueError("invalid number of floors", number_of_floors)
@@ -58,6 +134,10 @@ class Elevator:
             raise ValueError("invalid direction", direction)
         if not 1 <= current_floor <= number_of_floors:
             raise ValueError("invalid initial floor", current_floor)
+        if capacity is not None and capacity < 1:
+            raise ValueError("invalid capacity", capacity)
+        if wait_target is not None and wait_target < 0:
+            raise ValueError("invalid wait target", wait_target)
 
         self._current_direction = direction
         self._current_floor = current_floor
@@ -69,6 +149,42 @@ class Elevator:
 
         self._idle_count = 0
 
+        self._capacity = capacity
+        self._load = 0
+        self._full_car_bypass = full_car_bypass
+        self._enable_sleep = enable_sleep
+        self._floor_travel_time = floor_travel_time
+        self._elapsed_time = 0
+        self._last_stop = None
+        self._wait_target = wait_target
+
+        self._up_calls = [None for _ in range(number_of_floors + 1)]
+        self._down_calls = [None for _ in range(number_of_floors + 1)]
+        self._car_calls = [None for _ in range(number_of_floors + 1)]
+        self._call_heap = list()
+        self._pending_call_count = 0
+        self._stop_index = StopIndex(number_of_floors)
+        # Floors a car sweeping up or down stops at (a car call or a hall call its
+        # way), and floors with an up or down hall call alone, for arrival estimates.
+        up_stops, down_stops, up_calls, down_calls = self._sweep_indexes = tuple(
+            StopIndex(number_of_floors) for _ in range(4)
+        )
+        self._indexes_for_call = {
+            CallType.UP: (self._stop_index, up_stops, up_calls),
+            CallType.DOWN: (self._stop_index, down_stops, down_calls),
+            CallType.CAR: (self._stop_index, up_stops, down_stops),
+        }
+        self._sweep_counts = tuple(index.count for index in self._sweep_indexes)
+        self._listeners = list()
+
+        self._waiting_up = [deque() for _ in range(number_of_floors + 1)]
+        self._waiting_down = [deque() for _ in range(number_of_floors + 1)]
+        self._riders = [[] for _ in range(number_of_floors + 1)]
+
+        self.stops_made = 0
+        self.wasted_stops = 0
+        self.passengers_delivered = 0
+
     @property
     def idle_counter(self) -> int:
         """
@@ -99,6 +215,61 @@ class Elevator:
         """
         return self._number_of_floors
 
+    @property
+    def capacity(self) -> Optional[int]:
+        """
+        Get the rated capacity of the Elevator car.
+
+        Returns:
+            Optional[int] - the capacity in passengers, or None if the car is unlimited.
+        """
+        return self._capacity
+
+    @property
+    def load(self) -> int:
+        """
+        Get the number of passengers currently riding in the Elevator car.
+
+        Returns:
+            int - the current load of the car.
+        """
+        return self._load
+
+    @property
+    def is_full(self) -> bool:
+        """
+        Check whether the Elevator car has reached its rated capacity.
+
+        Returns:
+            bool - True if the car cannot take any more passengers, False otherwise.
+        """
+        return self._capacity is not None and self._load >= self._capacity
+
+    @property
+    def elapsed_time(self) -> int:
+        """
+        Get the simulated time since the Elevator was created.
+
+        Returns:
+            int - the elapsed simulated time, in seconds.
+        """
+        return self._elapsed_time
+
+    @elapsed_time.setter
+    def elapsed_time(self, new_time: int) -> None:
+        """
+        Advance the simulated clock, e.g. while the Elevator waits for new calls.
+
+        Args:
+            new_time (int) - the new simulated time, in seconds.
+
+        Raises:
+            ValueError - raised if the new time is earlier than the current time.
+        """
+        if new_time < self._elapsed_time:
+            raise ValueError("simulated time cannot run backwards", new_time)
+        self._elapsed_time = new_time
+
     @property
     def floor(self) -> int:
         """
@@ -130,10 +301,15 @@ class Elevator:
         Args:
             new_direction (Direction) - The new direction for the Elevator.
         """
-        if new_direction != self.direction:
-            logging.info("elevator direction is now %s", str(new_direction))
+        old_direction = self.direction
+        if new_direction != old_direction:
             self._current_direction = new_direction
             self.idle_counter = 0
+            logger.info("elevator direction is now %s", str(new_direction))
+            if self._listeners:
+                self._emit(
+                    DirectionChanged(self._elapsed_time, old_direction, new_direction),
+                )
 
     @floor.setter
     def floor(self, new_floor: int) -> None:
@@ -155,9 +331,12 @@ class Elevator:
 
         old_floor = self.floor
         if old_floor != new_floor:
-            logging.info("moving from floor %d to floor %d", old_floor, new_floor)
+            logger.info("moving from floor %d to floor %d", old_floor, new_floor)
             self._current_floor = new_floor
+            self._last_stop = None
             self.idle_counter = 0
+            if self._listeners:
+                self._emit(Moved(self._elapsed_time, old_floor, new_floor))
 
     @property
     def up_buttons(self) -> list[bool]:
@@ -197,8 +376,8 @@ class Elevator:
             floors (list[int]) - The list of floors to press.
         """
         for floor_num in floors:
-            logging.info("pressing the UP button for floor %d", floor_num)
-            self.up_buttons[floor_num] = True
+            logger.info("pressing the UP button for floor %d", floor_num)
+            self._register_call(CallType.UP, floor_num)
 
     def press_down(self, *floors) -> None:
         """
@@ -208,8 +387,8 @@ class Elevator:
             floors (list[int]) - the list of floors to press.
         """
         for floor_num in floors:
-            logging.info("pressing the DOWN button for floor %d", floor_num)
-            self.down_buttons[floor_num] = True
+            logger.info("pressing the DOWN button for floor %d", floor_num)
+            self._register_call(CallType.DOWN, floor_num)
 
     def press_car(self, *floors) -> None:
         """
@@ -219,8 +398,8 @@ class Elevator:
             floors (list[int]) - the list of floors to press.
         """
         for floor_num in floors:
-            logging.info("pressing the CAR button for floor %d", floor_num)
-            self.car_buttons[floor_num] = True
+            logger.info("pressing the CAR button for floor %d", floor_num)
+            self._register_call(CallType.CAR, floor_num)
 
     def clear_up(self, *floors) -> None:
         """
@@ -230,8 +409,8 @@ class Elevator:
             floors (list[int]) - the list of floors to clear.
         """
         for floor_num in floors:
-            logging.info("clearing the UP button for floor %d", floor_num)
-            self.up_buttons[floor_num] = False
+            logger.info("clearing the UP button for floor %d", floor_num)
+            self._cancel_call(CallType.UP, floor_num)
 
     def clear_down(self, *floors) -> None:
         """
@@ -241,8 +420,8 @@ class Elevator:
             floors (list[int]) - the list of floors to clear.
         """
         for floor_num in floors:
-            logging.info("clearing the DOWN button for floor %d", floor_num)
-            self.down_buttons[floor_num] = False
+            logger.info("clearing the DOWN button for floor %d", floor_num)
+            self._cancel_call(CallType.DOWN, floor_num)
 
     def clear_car(self, *floors) -> None:
         """
@@ -252,8 +431,8 @@ class Elevator:
             floors (list[int]) - the list of floors to clear.
         """
         for floor_num in floors:
-            logging.info("clearing the CAR button for floor %d", floor_num)
-            self.car_buttons[floor_num] = False
+            logger.info("clearing the CAR button for floor %d", floor_num)
+            self._cancel_call(CallType.CAR, floor_num)
 
     def clear_all(self, *floors) -> None:
         """
@@ -262,9 +441,419 @@ class Elevator:
         Args:
             floors (list[int]) - the list of floors to clear.
         """
-        self.clear_up(floors)
-        self.clear_down(floors)
-        self.clear_car(floors)
+        self.clear_up(*floors)
+        self.clear_down(*floors)
+        self.clear_car(*floors)
+
+    def _call_bank(
+        self,
+        call_type: CallType,
+    ) -> tuple[list[bool], list[Optional[PendingCall]]]:
+        """
+        Get the buttons and pending calls for one type of call.
+        """
+        match call_type:
+            case CallType.UP:
+                return self._up_buttons, self._up_calls
+            case CallType.DOWN:
+                return self._down_buttons, self._down_calls
+            case _:
+                return self._car_buttons, self._car_calls
+
+    def _register_call(
+        self,
+        call_type: CallType,
+        floor_num: int,
+        registered_at: Optional[int] = None,
+    ) -> None:
+        """
+        Light a button and timestamp the call. Pressing a button that is already lit
+        keeps the original timestamp.
+
+        Args:
+            call_type (CallType) - which button was pressed.
+            floor_num (int) - the floor the button is for.
+            registered_at (int) - the registration time; defaults to the current time.
+        """
+        buttons, calls = self._call_bank(call_type)
+        if buttons[floor_num]:
+            return
+
+        if registered_at is None:
+            registered_at = self._elapsed_time
+        call = PendingCall(registered_at, call_type, floor_num)
+        buttons[floor_num] = True
+        calls[floor_num] = call
+        self._pending_call_count += 1
+        for index in self._indexes_for_call[call_type]:
+            index.add(floor_num)
+        heapq.heappush(self._call_heap, call)
+        if self._listeners:
+            self._emit(CallRegistered(self._elapsed_time, call_type, floor_num))
+        if len(self._call_heap) > 2 * self._pending_call_count + 16:
+            self._compact_call_heap()
+
+    def _cancel_call(self, call_type: CallType, floor_num: int) -> None:
+        """
+        Clear a button and its timestamp. The heap entry is dropped lazily.
+        """
+        buttons, calls = self._call_bank(call_type)
+        if buttons[floor_num]:
+            self._pending_call_count -= 1
+            for index in self._indexes_for_call[call_type]:
+                index.remove(floor_num)
+            call = calls[floor_num]
+            if self._listeners and call is not None:
+                self._emit(
+                    CallServed(
+                        self._elapsed_time,
+                        call_type,
+                        floor_num,
+                        call.registered_at,
+                    ),
+                )
+        buttons[floor_num] = False
+        calls[floor_num] = None
+
+    def _call_is_live(self, call: PendingCall) -> bool:
+        """
+        Check whether a heap entry still describes a pending call.
+        """
+        buttons, calls = self._call_bank(call.call_type)
+        return buttons[call.floor] and calls[call.floor] is call
+
+    def _compact_call_heap(self) -> None:
+        """
+        Drop stale entries so the heap stays proportional to the pending calls.
+        """
+        self._call_heap = [c for c in self._call_heap if self._call_is_live(c)]
+        heapq.heapify(self._call_heap)
+
+    def call_registered_at(self, call_type: CallType, floor_num: int) -> Optional[int]:
+        """
+        Get the time a pending call was registered.
+
+        Args:
+            call_type (CallType) - which button to check.
+            floor_num (int) - the floor number to check.
+
+        Returns:
+            Optional[int] - the registration time in simulated seconds, or None if the
+                call is not pending.
+        """
+        buttons, calls = self._call_bank(call_type)
+        call = calls[floor_num]
+        return call.registered_at if buttons[floor_num] and call is not None else None
+
+    def oldest_pending_call(self) -> Optional[PendingCall]:
+        """
+        Get the pending call that has been waiting longest, in amortised O(log n).
+
+        Returns:
+            Optional[PendingCall] - the oldest pending call, or None if there are none.
+        """
+        heap = self._call_heap
+        while heap and not self._call_is_live(heap[0]):
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def eta(self, floor_num: int, direction: Optional[Direction] = None) -> int:
+        """
+        Estimate when the car will next reach a floor, following its current sweep.
+
+        The estimate follows the scheduler: the car keeps sweeping in its current
+        direction until the last pending stop, turns round, and pays
+        :py:const:`DOOR_CYCLE_TIME` at every floor it will actually stop at on the
+        way, which is a car call or a hall call in its direction of travel. It is
+        answered in O(log n) from per-direction indexes of pending stops.
+
+        Args:
+            floor_num (int) - the floor to estimate for.
+            direction (Direction) - the direction the car should be travelling when it
+                arrives, as for a hall call; None accepts either direction.
+
+        Returns:
+            int - the estimated simulated seconds until the car arrives.
+
+        Raises:
+            ValueError - raised if the floor number is invalid.
+        """
+        if not (1 <= floor_num <= self.number_of_floors):
+            raise ValueError("invalid floor number", floor_num)
+        return self._eta_heading(floor_num, direction, self._current_direction)
+
+    def _eta_heading(
+        self,
+        floor_num: int,
+        direction: Optional[Direction],
+        heading: Direction,
+    ) -> int:
+        """
+        Estimate like :py:meth:`eta`, as if the car were moving in ``heading`` now.
+        """
+        top = self._stop_index.highest()
+        bottom = self._stop_index.lowest()
+        plan = self._plan_sweep(top, bottom, self._sweep_counts, heading)
+        return self._estimate_arrival(floor_num, direction, top, bottom, plan)
+
+    def eta_all(self, direction: Optional[Direction] = None) -> list[int]:
+        """
+        Estimate arrival times for every floor at once, in O(n).
+
+        Args:
+            direction (Direction) - the direction the car should be travelling when it
+                arrives; None accepts either direction.
+
+        Returns:
+            list[int] - the estimates, indexed by floor number (index 0 is unused).
+        """
+        size = self._number_of_floors
+
+        def counter(prefix: list[int]) -> Callable[[int, int], int]:
+            def count(low: int, high: int) -> int:
+                if low < 1:
+                    low = 1
+                if high > size:
+                    high = size
+                return prefix[high] - prefix[low - 1] if high >= low else 0
+
+            return count
+
+        counts = tuple(counter(index.prefix_counts()) for index in self._sweep_indexes)
+        top = self._stop_index.highest()
+        bottom = self._stop_index.lowest()
+        plan = self._plan_sweep(top, bottom, counts, self._current_direction)
+        return [0] + [
+            self._estimate_arrival(floor_num, direction, top, bottom, plan)
+            for floor_num in range(1, size + 1)
+        ]
+
+    def _plan_sweep(
+        self,
+        top: int,
+        bottom: int,
+        counts: tuple[Callable[[int, int], int], ...],
+        heading: Direction,
+    ) -> tuple[Direction, Direction, int, tuple[Callable[[int, int], int], ...]]:
+        """
+        Work out how the car leaves its own floor, for :py:meth:`_estimate_arrival`.
+
+        ``counts`` are range counts over the floors an upward sweep stops at, the
+        floors a downward sweep stops at, and the floors with an up or down hall call.
+        The car's own floor is assumed served in its direction of travel. A stopped
+        car is modelled the way the scheduler moves it: it serves its own floor first,
+        preferring an up call, then keeps going that way or, if it has no direction
+        yet, goes up if anything is pending above and otherwise down.
+
+        Returns:
+            tuple - ``heading``, the direction the car sweeps in, the stops it makes
+            on its own floor, and ``counts`` with the calls served there taken out.
+        """
+        here = self._current_floor
+        moving = heading
+        up_pressed = self._up_buttons[here]
+        down_pressed = self._down_buttons[here]
+        car_pressed = self._car_buttons[here]
+        above = top > here
+        below = 0 < bottom < here
+
+        stops = 0
+        if heading == Direction.STOPPED:
+            if up_pressed or down_pressed or car_pressed:
+                stops = 1
+            if up_pressed:
+                heading = Direction.UP if above or not below else Direction.DOWN
+                if down_pressed and not above:
+                    # Turning round on the same floor opens the doors again.
+                    stops += 1
+                    down_pressed = False
+            elif down_pressed:
+                heading = Direction.DOWN if below or not above else Direction.UP
+                down_pressed = False
+            elif above:
+                heading = Direction.UP
+            elif below:
+                heading = Direction.DOWN
+            car_pressed = False
+        elif self._last_stop != (here, heading):
+            # A car that has just turned round still has to serve its own floor.
+            if heading == Direction.UP and (up_pressed or car_pressed):
+                stops = 1
+            elif heading == Direction.DOWN and (down_pressed or car_pressed):
+                stops = 1
+        if heading == Direction.UP:
+            up_pressed = car_pressed = False
+        elif heading == Direction.DOWN:
+            down_pressed = car_pressed = False
+
+        # What each index should count for the car's own floor, in place of what it
+        # holds: calls already served there are no longer stops.
+        held = (
+            self._up_buttons[here] or self._car_buttons[here],
+            self._down_buttons[here] or self._car_buttons[here],
+            self._up_buttons[here],
+            self._down_buttons[here],
+        )
+        wanted = (up_pressed or car_pressed, down_pressed or car_pressed, up_pressed, down_pressed)
+        if held == wanted:
+            return moving, heading, stops, counts
+
+        def corrected(count: Callable[[int, int], int], fix: int) -> Callable[[int, int], int]:
+            return lambda low, high: count(low, high) - (fix if low <= here <= high else 0)
+
+        return moving, heading, stops, tuple(
+            corrected(count, have - want) if have != want else count
+            for count, have, want in zip(counts, held, wanted)
+        )
+
+    def _estimate_arrival(
+        self,
+        target: int,
+        direction: Optional[Direction],
+        top: int,
+        bottom: int,
+        plan: tuple[Direction, Direction, int, tuple[Callable[[int, int], int], ...]],
+    ) -> int:
+        """
+        Work out the travel distance and intermediate stops to reach ``target``.
+
+        Going out, the car stops for car calls and calls its way; coming back, only
+        for calls the other way and car calls it has not yet passed. A turn costs a
+        stop for each direction with a call on the turning floor. ``plan`` comes from
+        :py:meth:`_plan_sweep`.
+        """
+        here = self._current_floor
+        moving, heading, stops, (up_stops, down_stops, up_calls, down_calls) = plan
+        if target == here and direction in (None, moving):
+            return 0
+        if target == here and moving == Direction.STOPPED:
+            # An up call on the same floor is answered first; a down call waits for
+            # the doors to close and reopen, or for the car to come back from above.
+            if direction == Direction.UP or not self._up_buttons[here]:
+                return 0
+            if top <= here:
+                return DOOR_CYCLE_TIME
+
+        def turn_at_top(turn: int) -> int:
+            return up_stops(turn, turn) + down_calls(turn, turn)
+
+        def turn_at_bottom(turn: int) -> int:
+            return down_stops(turn, turn) + up_calls(turn, turn)
+
+        distance = 0
+        match heading:
+            case Direction.UP:
+                if target >= here and direction != Direction.DOWN:
+                    distance = target - here
+                    stops += up_stops(here + 1, target - 1)
+                elif direction != Direction.UP:
+                    turn = max(top, target, here)
+                    distance = 2 * turn - here - target
+                    stops += up_stops(here + 1, turn - 1)
+                    if target != turn:
+                        stops += (
+                            turn_at_top(turn)
+                            + down_calls(max(target, here) + 1, turn - 1)
+                            + down_stops(target + 1, min(here, turn - 1))
+                        )
+                    elif direction == Direction.DOWN:
+                        stops += up_stops(turn, turn)
+                else:
+                    turn = max(top, here)
+                    low = min(bottom or target, target)
+                    distance = 2 * turn - here - 2 * low + target
+                    stops += (
+                        up_stops(here + 1, turn - 1)
+                        + turn_at_top(turn)
+                        + down_calls(here + 1, turn - 1)
+                        + down_stops(low + 1, min(here, turn - 1))
+                    )
+                    if low != target:
+                        stops += turn_at_bottom(low) + up_calls(low + 1, target - 1)
+                    else:
+                        stops += down_stops(low, low)
+            case Direction.DOWN:
+                if target <= here and direction != Direction.UP:
+                    distance = here - target
+                    stops += down_stops(target + 1, here - 1)
+                elif direction != Direction.DOWN:
+                    turn = min(bottom or target, target, here)
+                    distance = here + target - 2 * turn
+                    stops += down_stops(turn + 1, here - 1)
+                    if target != turn:
+                        stops += (
+                            turn_at_bottom(turn)
+                            + up_calls(turn + 1, min(target, here) - 1)
+                            + up_stops(max(here, turn + 1), target - 1)
+                        )
+                    elif direction == Direction.UP:
+                        stops += down_stops(turn, turn)
+                else:
+                    turn = min(bottom or here, here)
+                    high = max(top, target)
+                    distance = here - 2 * turn + 2 * high - target
+                    stops += (
+                        down_stops(turn + 1, here - 1)
+                        + turn_at_bottom(turn)
+                        + up_calls(turn + 1, here - 1)
+                        + up_stops(max(here, turn + 1), high - 1)
+                    )
+                    if high != target:
+                        stops += turn_at_top(high) + down_calls(target + 1, high - 1)
+                    else:
+                        stops += up_stops(high, high)
+            case _:
+                distance = abs(target - here)
+        return distance * self._floor_travel_time + stops * DOOR_CYCLE_TIME
+
+    def add_passenger(self, passenger: Passenger) -> None:
+        """
+        Register a passenger waiting at their origin floor, and press the hall button
+        for their direction of travel.
+
+        Args:
+            passenger (Passenger) - the passenger to register.
+
+        Raises:
+            ValueError - raised if the origin or destination floor is invalid.
+        """
+        for floor_num in (passenger.origin, passenger.destination):
+            if not (1 <= floor_num <= self.number_of_floors):
+                raise ValueError("invalid floor number", floor_num)
+
+        floor_num = self._boarding_floor(passenger)
+        if passenger.direction == Direction.UP:
+            self._waiting_up[floor_num].append(passenger)
+            self.press_up(floor_num)
+        else:
+            self._waiting_down[floor_num].append(passenger)
+            self.press_down(floor_num)
+
+    def _boarding_floor(self, passenger: Passenger) -> int:
+        """
+        Get the floor a passenger waits on for the car.
+        """
+        return passenger.origin
+
+    def _alight_floor(self, passenger: Passenger, floor_num: int) -> int:
+        """
+        Get the floor a passenger who boarded on ``floor_num`` will leave the car.
+        """
+        return passenger.destination
+
+    def _room_at(self, floor_num: int) -> Optional[int]:
+        """
+        Get the number of passengers who can board on a floor, or None if unlimited.
+        """
+        if self._capacity is None:
+            return None
+        return max(0, self._capacity - self._load)
+
+    def _stop_floors(self, floor_num: int) -> tuple[int, ...]:
+        """
+        Get the floors served when the car stops at ``floor_num``.
+        """
+        return (floor_num,)
 
     def stop_needed_on_floor(self, floor_num: int) -> bool:
         """
@@ -274,7 +863,8 @@ class Elevator:
         regardless of elevtor direction. If the Elevator is stopped and either floor
         button for the specified floor is pressed, we need to stop there. Otherwise,
         we need to stop there if the floor button matching the current direction of
-        travel is pressed.
+        travel is pressed. A full car with ``full_car_bypass`` enabled only stops for
+        in-car buttons, leaving the hall calls pending for a later pass.
 
         Args:
             floor_num (int) - the floor number to check.
@@ -288,88 +878,165 @@ class Elevator:
         if not (1 <= floor_num <= self.number_of_floors):
             raise ValueError("invalid floor number", floor_num)
 
+        if self._bypassing_hall_calls():
+            return self.car_buttons[floor_num]
+
         match self.direction:
             case Direction.STOPPED:
-                return any(
-                    [
-                        self.up_buttons[floor_num],
-                        self.down_buttons[floor_num],
-                        self.car_buttons[floor_num],
-                    ],
+                return (
+                    self._up_buttons[floor_num]
+                    or self._down_buttons[floor_num]
+                    or self._car_buttons[floor_num]
                 )
             case Direction.UP:
-                return any([self.up_buttons[floor_num], self.car_buttons[floor_num]])
+                return self._up_buttons[floor_num] or self._car_buttons[floor_num]
             case Direction.DOWN:
-                return any([self.down_buttons[floor_num], self.car_buttons[floor_num]])
+                return self._down_buttons[floor_num] or self._car_buttons[floor_num]
             case _:
                 return False
 
+    def call_pending_on_floor(self, floor_num: int) -> bool:
+        """
+        Determine whether any call the Elevator will currently answer is pending on a floor.
+
+        Unlike :py:meth:`stop_needed_on_floor`, this ignores the direction of travel, so
+        it tells us whether the car still has to travel to the floor at all.
+
+        Args:
+            floor_num (int) - the floor number to check.
+
+        Returns:
+            bool - True if the floor has a pending call, False otherwise.
+        """
+        if self.car_buttons[floor_num]:
+            return True
+        if self._bypassing_hall_calls():
+            return False
+        return self.up_buttons[floor_num] or self.down_buttons[floor_num]
+
     def stops_needed_above_current_floor(self) -> list[int]:
         """
         Check the Elevator buttons and get a list of stops needed above the current floor.
 
         Returns:
-            list[int] - THe list of floors on which a stop is needed above the current floor.
+            list[int] - THe list of floors above the current floor with a pending call.
                 If no stops are needed, an empty list is returned.
         """
         if self.on_top_floor():
             return []
 
-        needed_stops = [
+        return [
             floor
-            for floor in range(self.floor, self.number_of_floors + 1)
-            if self.stop_needed_on_floor(floor)
+            for floor in range(self.floor + 1, self.number_of_floors + 1)
+            if self.call_pending_on_floor(floor)
         ]
-        return list(set(needed_stops))
 
     def stops_needed_below_current_floor(self) -> list[int]:
         """
         Check the Elevator buttons and get a list of stops needed below the current floor.
 
         Returns:
-            list[int] - The list of floors on which a stop is needed below the current floor.
+            list[int] - The list of floors below the current floor with a pending call.
                 If no stops are needed, an empty list is returned.
         """
         if self.on_first_floor():
             return []
 
-        needed_stops = [
-            floor
-            for floor in range(1, self.number_of_floors)
-            if self.stop_needed_on_floor(floor)
+        return [
+            floor for floor in range(1, self.floor) if self.call_pending_on_floor(floor)
         ]
-        return list(set(needed_stops))
+
+    def has_stops_above_current_floor(self) -> bool:
+        """
+        Check whether any stop is needed above the current floor.
+
+        Equivalent to ``bool(self.stops_needed_above_current_floor())``, but answered
+        from the stop index in O(log n) without building a list, so the scheduler can
+        call it on every step without allocating.
+
+        Returns:
+            bool - True if a floor above the current floor has a pending call.
+        """
+        if not self._bypassing_hall_calls():
+            return self._stop_index.count(self._current_floor + 1, self._number_of_floors) > 0
+        car_buttons = self._car_buttons
+        floor_num = self._current_floor + 1
+        while floor_num <= self._number_of_floors:
+            if car_buttons[floor_num]:
+                return True
+            floor_num += 1
+        return False
+
+    def has_stops_below_current_floor(self) -> bool:
+        """
+        Check whether any stop is needed below the current floor, without allocating.
+        See :py:meth:`has_stops_above_current_floor`.
+
+        Returns:
+            bool - True if a floor below the current floor has a pending call.
+        """
+        if not self._bypassing_hall_calls():
+            return self._stop_index.count(1, self._current_floor - 1) > 0
+        car_buttons = self._car_buttons
+        floor_num = self._current_floor - 1
+        while floor_num >= 1:
+            if car_buttons[floor_num]:
+                return True
+            floor_num -= 1
+        return False
+
+    def _no_room_at(self, floor_num: int) -> bool:
+        """
+        Check whether nobody waiting on a floor could board, because the car is full.
+        """
+        return self.is_full
+
+    def _bypassing_hall_calls(self) -> bool:
+        """
+        Check whether the Elevator is currently ignoring hall calls because it is full.
+        """
+        return self._full_car_bypass and self.is_full
 
     def reverse_direction_if_needed(self) -> None:
         """
         Reverse the direction of the Elevator if needed.
+
+        With a ``wait_target``, a moving car also turns round early for an urgent call
+        behind it; see :py:meth:`_urgent_heading`.
         """
+        if self._wait_target is not None and self.direction != Direction.STOPPED:
+            heading = self._urgent_heading()
+            if heading is not None and heading != self.direction:
+                logger.info("Turning round early for an aged call - setting direction to %s", heading)
+                self.direction = heading
+                return
+
         if self.direction == Direction.UP and (
-            self.on_top_floor() or len(self.stops_needed_above_current_floor()) == 0
+            self.on_top_floor() or not self.has_stops_above_current_floor()
         ):
-            logging.info("Reversing direction UP => DOWN")
-            if len(self.stops_needed_below_current_floor()):
-                logging.info(
+            logger.info("Reversing direction UP => DOWN")
+            if self.has_stops_below_current_floor():
+                logger.info(
                     "Stops are needed below the current floor - setting direction to DOWN",
                 )
                 self.direction = Direction.DOWN
             else:
-                logging.info(
+                logger.info(
                     "No stops needed below the current floor - setting direction to STOPPED",
                 )
                 self.direction = Direction.STOPPED
         elif self.direction == Direction.DOWN and (
-            self.on_first_floor() or len(self.stops_needed_below_current_floor()) == 0
+            self.on_first_floor() or not self.has_stops_below_current_floor()
         ):
-            logging.info("Reversing direction DOWN => UP")
-            if len(self.stops_needed_above_current_floor()):
-                logging.info(
+            logger.info("Reversing direction DOWN => UP")
+            if self.has_stops_above_current_floor():
+                logger.info(
                     "Stops are needed above the current floor - setting direction to UP",
                 )
                 self.direction = Direction.UP
             else:
-                logging, info(
-                    "No stops needed below the current floor - setting direction to STOPPED",
+                logger.info(
+                    "No stops needed above the current floor - setting direction to STOPPED",
                 )
                 self.direction = Direction.STOPPED
 
@@ -415,49 +1082,176 @@ class Elevator:
             enable_sleep (bool, keyword only) - whether to enable calls to :py:func:`time.sleep` in the
                 simulation run.
         """
-        logging.info("*** STOPPING on floor: %d", self.floor)
-        self.clear_car(floor_num)
+        logger.info("*** STOPPING on floor: %d", self.floor)
+        self.stops_made += 1
+        if self._listeners:
+            self._emit(Stopped(self._elapsed_time, floor_num, moving_direction))
+        self._last_stop = (floor_num, moving_direction)
+        served = self._stop_floors(floor_num)
+        self.clear_car(*served)
         match moving_direction:
             case Direction.UP:
-                self.clear_up(floor_num)
+                self.clear_up(*served)
             case Direction.DOWN:
-                self.clear_down(floor_num)
+                self.clear_down(*served)
 
-        logging.info("    Doors are opening...")
+        logger.info("    Doors are opening...")
+        if self._listeners:
+            self._emit(Doors(self._elapsed_time, floor_num, True))
         if enable_sleep:
             sleep(1)
 
-        passenger_movement_time = randint(1, max_wait_time_on_floor)
-        logging.info(
-            "    Waiting %d seconds for for passenger movement",
-            passenger_movement_time,
-        )
+        # Every floor served by this stop loads at the same time, so the doors stay
+        # open for the busiest one.
+        transfers = 0
+        busiest = 0
+        for served_floor in served:
+            moved = self._alight_passengers(served_floor)
+            moved += self._board_passengers(served_floor, moving_direction)
+            transfers += moved
+            busiest = max(busiest, moved)
+        if transfers == 0:
+            self.wasted_stops += 1
+        self._elapsed_time += DOOR_CYCLE_TIME + PASSENGER_TRANSFER_TIME * busiest
+
         if enable_sleep:
+            from random import randint
+
+            passenger_movement_time = randint(1, max_wait_time_on_floor)
+            logger.info(
+                "    Waiting %d seconds for for passenger movement",
+                passenger_movement_time,
+            )
             sleep(passenger_movement_time)
 
-        logging.info("    Doors are closing...")
+        logger.info("    Doors are closing...")
+        if self._listeners:
+            self._emit(Doors(self._elapsed_time, floor_num, False))
         if enable_sleep:
             sleep(1)
 
-        logging.info("current Elevator state: %s", str(self))
+        logger.info("current Elevator state: %s", self)
+
+    def _alight_passengers(self, floor_num: int) -> int:
+        """
+        Let every rider destined for this floor out of the car.
+
+        Returns:
+            int - the number of passengers who alighted.
+        """
+        riders = self._riders[floor_num]
+        if not riders:
+            return 0
+
+        alighted = len(riders)
+        for passenger in riders:
+            passenger.alight_time = self._elapsed_time
+        riders.clear()
+        self._load -= alighted
+        self.passengers_delivered += alighted
+        logger.info("    %d passenger(s) alighted, load is now %d", alighted, self._load)
+        return alighted
+
+    def _board_passengers(self, floor_num: int, moving_direction: Direction) -> int:
+        """
+        Board waiting passengers travelling in ``moving_direction`` until the car is full.
+
+        Each boarded passenger presses the car button for their destination. Anyone left
+        behind re-registers the hall call so a later pass picks them up.
+
+        Returns:
+            int - the number of passengers who boarded.
+        """
+        match moving_direction:
+            case Direction.UP:
+                queue = self._waiting_up[floor_num]
+            case Direction.DOWN:
+                queue = self._waiting_down[floor_num]
+            case _:
+                return 0
+
+        room = self._room_at(floor_num)
+        boarded = 0
+        while queue and (room is None or boarded < room):
+            passenger = queue.popleft()
+            passenger.board_time = self._elapsed_time
+            alight_floor = self._alight_floor(passenger, floor_num)
+            self._riders[alight_floor].append(passenger)
+            self._load += 1
+            boarded += 1
+            self.press_car(alight_floor)
+
+        if queue:
+            logger.info(
+                "    car is full, %d passenger(s) left waiting on floor %d",
+                len(queue),
+                floor_num,
+            )
+            call_type = CallType.UP if moving_direction == Direction.UP else CallType.DOWN
+            self._register_call(call_type, floor_num, queue[0].arrival_time)
+        if boarded:
+            logger.info("    %d passenger(s) boarded, load is now %d", boarded, self._load)
+        return boarded
 
     def move_up_one_floor(self) -> None:
         """
         Move up one floor if needed.
         """
-        if not self.on_top_floor() and self.stops_needed_above_current_floor():
-            self.floor = self.floor + 1
+        if not self.on_top_floor() and self.has_stops_above_current_floor():
+            self._elapsed_time += self._floor_travel_time * self._floor_step
+            self.floor = self.floor + self._floor_step
             if self.stop_needed_on_floor(self.floor):
-                self.stop_on_floor(self.floor, Direction.UP)
+                self.stop_on_floor(
+                    self.floor,
+                    Direction.UP,
+                    enable_sleep=self._enable_sleep,
+                )
 
     def move_down_one_floor(self) -> None:
         """
         Move down one floor if needed.
         """
-        if not self.on_first_floor() and self.stops_needed_below_current_floor():
-            self.floor = self.floor - 1
+        if not self.on_first_floor() and self.has_stops_below_current_floor():
+            self._elapsed_time += self._floor_travel_time * self._floor_step
+            self.floor = self.floor - self._floor_step
             if self.stop_needed_on_floor(self.floor):
-                self.stop_on_floor(self.floor, Direction.DOWN)
+                self.stop_on_floor(
+                    self.floor,
+                    Direction.DOWN,
+                    enable_sleep=self._enable_sleep,
+                )
+
+    def serve_current_floor_if_needed(self) -> bool:
+        """
+        Open the doors on the current floor if a call there matches the direction of
+        travel and has not just been served on this sweep.
+
+        When the Elevator is stopped, an UP call is preferred over a DOWN call, and the
+        direction is set to match the call being answered.
+
+        Returns:
+            bool - True if the Elevator stopped on the current floor, False otherwise.
+        """
+        if not self.stop_needed_on_floor(self.floor):
+            return False
+
+        moving_direction = self.direction
+        if moving_direction == Direction.STOPPED:
+            served = self._stop_floors(self.floor)
+            if any(self.up_buttons[floor_num] for floor_num in served):
+                moving_direction = Direction.UP
+            elif any(self.down_buttons[floor_num] for floor_num in served):
+                moving_direction = Direction.DOWN
+        elif self._last_stop == (self.floor, moving_direction):
+            return False
+
+        self.direction = moving_direction
+        self.stop_on_floor(
+            self.floor,
+            moving_direction,
+            enable_sleep=self._enable_sleep,
+        )
+        return True
 
     def increment_idle_counter(self) -> None:
         """
@@ -465,35 +1259,134 @@ class Elevator:
         :py:const:`IDLE_COUNTER_MAX_ITERATIONS` iterations.
         """
         self.idle_counter += 1
-        logging.info("Elevator idling; idle count is now %d", self._idle_count)
+        logger.info("Elevator idling; idle count is now %d", self._idle_count)
+        if self._listeners:
+            self._emit(Idle(self._elapsed_time, self._idle_count))
+
+    def urgent_call(self) -> Optional[PendingCall]:
+        """
+        Get the call that must be served next to meet ``wait_target``, if any.
+
+        The oldest pending call is urgent once its age plus :py:meth:`eta`, which
+        counts the stops the sweep makes on the way, exceeds ``wait_target``. A hall
+        call the car has no room for is never urgent, whether or not it bypasses hall
+        calls: it has to deliver riders before it can pick anyone up, and chasing a
+        hall call it cannot serve would only leave the call registered and urgent
+        forever.
+
+        Returns:
+            Optional[PendingCall] - the oldest pending call if it is urgent, else None.
+        """
+        if self._wait_target is None:
+            return None
+
+        oldest = self.oldest_pending_call()
+        if oldest is None:
+            return None
+        if oldest.call_type != CallType.CAR and self._no_room_at(oldest.floor):
+            return None
+        match oldest.call_type:
+            case CallType.UP:
+                eta = self.eta(oldest.floor, Direction.UP)
+            case CallType.DOWN:
+                eta = self.eta(oldest.floor, Direction.DOWN)
+            case _:
+                eta = self.eta(oldest.floor)
+        if self._elapsed_time - oldest.registered_at + eta <= self._wait_target:
+            return None
+        return oldest
+
+    def _urgent_heading(self) -> Optional[Direction]:
+        """
+        Get the direction that takes the car to an urgent call, if there is one.
+
+        Turning round abandons the calls ahead of the car, so the car only turns for
+        an urgent call it can still reach in time, and only if that shortens the
+        longest projected wait instead of handing it to somebody else. Otherwise the
+        sweep carries on as usual.
+
+        Returns:
+            Optional[Direction] - the direction to serve the urgent call in, or None if
+            nothing is urgent, the urgent call can be served here in either direction,
+            or turning round for it would not help.
+        """
+        urgent = self.urgent_call()
+        if urgent is None:
+            return None
+        if urgent.floor not in self._stop_floors(self.floor):
+            heading = Direction.UP if urgent.floor > self.floor else Direction.DOWN
+        elif urgent.call_type == CallType.UP:
+            heading = Direction.UP
+        elif urgent.call_type == CallType.DOWN:
+            heading = Direction.DOWN
+        else:
+            return None
+        if heading == self.direction:
+            return heading
+
+        age = self._elapsed_time - urgent.registered_at
+        if age + self._eta_heading(urgent.floor, None, heading) > self._wait_target:
+            return None
+        if self._projected_max_wait(heading) >= self._projected_max_wait(self.direction):
+            return None
+        return heading
+
+    def _projected_max_wait(self, heading: Direction) -> int:
+        """
+        Get the longest wait any pending call would see if the car swept in ``heading``
+        from here, using the same estimate as :py:meth:`eta`.
+        """
+        top = self._stop_index.highest()
+        bottom = self._stop_index.lowest()
+        plan = self._plan_sweep(top, bottom, self._sweep_counts, heading)
+        now = self._elapsed_time
+        worst = 0
+        for calls, direction in (
+            (self._up_calls, Direction.UP),
+            (self._down_calls, Direction.DOWN),
+            (self._car_calls, None),
+        ):
+            for call in calls:
+                if call is not None:
+                    eta = self._estimate_arrival(call.floor, direction, top, bottom, plan)
+                    worst = max(worst, now - call.registered_at + eta)
+        return worst
 
     def simulation_move_one_step(self) -> None:
         """
         Run one iteration of the simulation.
         """
+        if self._wait_target is not None:
+            # An urgent call may have appeared behind the car since it last moved.
+            self.reverse_direction_if_needed()
+
         match self.direction:
             case Direction.UP:
-                if len(self.stops_needed_above_current_floor()):
+                if self.serve_current_floor_if_needed():
+                    pass
+                elif self.has_stops_above_current_floor():
                     self.move_up_one_floor()
                 self.reverse_direction_if_needed()
 
             case Direction.DOWN:
-                if len(self.stops_needed_below_current_floor()):
+                if self.serve_current_floor_if_needed():
+                    pass
+                elif self.has_stops_below_current_floor():
                     self.move_down_one_floor()
                 self.reverse_direction_if_needed()
 
             case Direction.STOPPED:
-                if self.simulation_can_move():
-                    if (
-                        len(self.stops_needed_above_current_floor())
-                        and not self.on_top_floor()
-                    ):
-                        self.direction = Direction.UP
-                        self.move_up_one_floor()
+                if not self.simulation_can_move():
+                    return
+                if self.serve_current_floor_if_needed():
+                    self.reverse_direction_if_needed()
                 elif (
-                    len(self.stops_needed_below_current_floor())
-                    and not self.on_first_floor()
+                    self.has_stops_above_current_floor()
+                    and self._urgent_heading() != Direction.DOWN
                 ):
+                    self.direction = Direction.UP
+                    self.move_up_one_floor()
+                elif self.has_stops_below_current_floor():
                     self.direction = Direction.DOWN
                     self.move_down_one_floor()
 
@@ -501,7 +1394,7 @@ class Elevator:
         """
         Determine if the simulation can move at all.
         """
-        return any(self.up_buttons) or any(self.down_buttons) or any(self.car_buttons)
+        return self._pending_call_count > 0
 
     def go(self, max_idle_iterations: int) -> None:
         """
@@ -512,7 +1405,7 @@ class Elevator:
                                 before the simulation will stop.
         """
         self.idle_counter = 0
-        logging.info("initial Elevator state is as follows: \n%s", str(self))
+        logger.info("initial Elevator state is as follows: \n%s", str(self))
 
         while self.idle_counter <= max_idle_iterations:
             if self.simulation_can_move():
@@ -521,7 +1414,97 @@ class Elevator:
             else:
                 self.increment_idle_counter()
 
-        logging.info("Maximum idle count reached - simulation done.")
+        logger.info("Maximum idle count reached - simulation done.")
+
+    def run(self, max_idle_iterations: int) -> Iterator[Event]:
+        """
+        Run the simulation like :py:meth:`go`, streaming events as they happen.
+
+        The simulation only advances when the consumer asks for the next event, so
+        at most one iteration's worth of events is ever buffered. Stopping iteration
+        (or closing the generator) stops the simulation.
+
+        Args:
+            max_idle_iterations (int) - The maximum number of successive idle iterations
+                before the simulation will stop.
+
+        Yields:
+            Event - the events emitted by each iteration, in order.
+        """
+        pending: deque[Event] = deque()
+        listener = pending.append
+        self.add_listener(listener)
+        try:
+            self.idle_counter = 0
+            while self.idle_counter <= max_idle_iterations:
+                if self.simulation_can_move():
+                    self.idle_counter = 0
+                    self.simulation_move_one_step()
+                else:
+                    self.increment_idle_counter()
+                while pending:
+                    yield pending.popleft()
+        finally:
+            self.remove_listener(listener)
+
+    async def run_async(self, max_idle_iterations: int) -> AsyncIterator[Event]:
+        """
+        An asynchronous variant of :py:meth:`run`, which yields control to the event
+        loop after every iteration.
+
+        Args:
+            max_idle_iterations (int) - The maximum number of successive idle iterations
+                before the simulation will stop.
+
+        Yields:
+            Event - the events emitted by each iteration, in order.
+        """
+        import asyncio
+
+        pending: deque[Event] = deque()
+        listener = pending.append
+        self.add_listener(listener)
+        try:
+            self.idle_counter = 0
+            while self.idle_counter <= max_idle_iterations:
+                if self.simulation_can_move():
+                    self.idle_counter = 0
+                    self.simulation_move_one_step()
+                else:
+                    self.increment_idle_counter()
+                while pending:
+                    yield pending.popleft()
+                await asyncio.sleep(0)
+        finally:
+            self.remove_listener(listener)
+
+    def add_listener(self, listener: Callable[[Event], None]) -> None:
+        """
+        Register a callable to receive every event the Elevator emits.
+
+        Args:
+            listener (Callable[[Event], None]) - the callable to register.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Event], None]) -> None:
+        """
+        Unregister a callable added with :py:meth:`add_listener`.
+
+        Args:
+            listener (Callable[[Event], None]) - the callable to unregister.
+
+        Raises:
+            ValueError - raised if the listener was never registered.
+        """
+        self._listeners.remove(listener)
+
+    def _emit(self, event: Event) -> None:
+        """
+        Deliver an event to every listener.
+        """
+        for listener in self._listeners:
+            listener(event)
 
     def __str__(self) -> str:
         result: list[str] = list()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Elevator Exercise in Python
+Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
+
+Lightweight event records streamed by :py:meth:`Elevator.run`. Every event is a
+:py:class:`typing.NamedTuple`, so it carries no per-instance ``__dict__`` and is
+cheap to create by the million. The first field of every event is the simulated
+time it happened.
+"""
+from typing import NamedTuple
+from typing import Union
+
+from .call import CallType
+from .direction import Direction
+
+
+class Moved(NamedTuple):
+    """
+    The car moved from one floor to an adjacent one.
+    """
+
+    time: int
+    from_floor: int
+    to_floor: int
+
+
+class Stopped(NamedTuple):
+    """
+    The car stopped on a floor while travelling in ``direction``.
+    """
+
+    time: int
+    floor: int
+    direction: Direction
+
+
+class Doors(NamedTuple):
+    """
+    The doors opened (``is_open`` is True) or closed on a floor.
+    """
+
+    time: int
+    floor: int
+    is_open: bool
+
+
+class DirectionChanged(NamedTuple):
+    """
+    The car changed its direction of travel.
+    """
+
+    time: int
+    old_direction: Direction
+    new_direction: Direction
+
+
+class Idle(NamedTuple):
+    """
+    The car had nothing to do for one iteration.
+    """
+
+    time: int
+    idle_count: int
+
+
+class CallRegistered(NamedTuple):
+    """
+    A button was pressed that was not already lit.
+    """
+
+    time: int
+    call_type: CallType
+    floor: int
+
+
+class CallServed(NamedTuple):
+    """
+    A lit button was cleared. ``registered_at`` is when it was pressed.
+    """
+
+    time: int
+    call_type: CallType
+    floor: int
+    registered_at: int
+
+
+# +: Any event the Elevator can emit.
+Event = Union[Moved, Stopped, Doors, DirectionChanged, Idle, CallRegistered, CallServed]
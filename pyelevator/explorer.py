@@ -0,0 +1,480 @@
+# -*- coding: utf-8 -*-
+"""
+Elevator Exercise in Python
+Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
+
+An exhaustive explorer of the Elevator controller's state space, for guaranteed
+rather than sampled worst-case numbers on small buildings.
+
+A state is the car's floor and direction, the floor and direction of the stop it
+just made (which the controller uses to avoid reopening its doors), and the lit up,
+down and car buttons. States are packed into a single integer. Between any two
+steps of :py:meth:`Elevator.simulation_move_one_step`, an adversarial environment
+may press one more button (or none), optionally up to a limit on how many buttons
+can be lit at once. The explorer enumerates every reachable state breadth first,
+computing each state's successor by running the real controller code on a scratch
+Elevator, and then analyses the resulting graph for:
+
+- the most steps any call can stay pending, for every button;
+- starvation: a cycle in which the environment keeps some call pending forever;
+- livelock: a cycle the car repeats forever with calls pending and no new input.
+"""
+import multiprocessing
+from dataclasses import dataclass
+from dataclasses import field
+from typing import NamedTuple
+from typing import Optional
+
+from .call import CallType
+from .direction import Direction
+from .elevator import Elevator
+
+# +: Frontiers smaller than this are stepped in-process even when workers are enabled.
+PARALLEL_FRONTIER_MIN: int = 4096
+
+_CALL_TYPES = (CallType.UP, CallType.DOWN, CallType.CAR)
+
+
+class ExplorerState(NamedTuple):
+    """
+    A decoded controller state, as it appears in a counterexample trace.
+    """
+
+    floor: int
+    direction: Direction
+    last_stop: Optional[tuple[int, Direction]]
+    up_calls: tuple[int, ...]
+    down_calls: tuple[int, ...]
+    car_calls: tuple[int, ...]
+
+
+class Counterexample(NamedTuple):
+    """
+    A trace from the initial state into a cycle that repeats forever.
+
+    Each state in ``prefix`` and ``cycle`` is the state just before a step, after the
+    environment has pressed any new button. The last state of ``cycle`` steps back
+    to its first. ``call`` is the starved call, or None for a livelock.
+    """
+
+    call: Optional[tuple[CallType, int]]
+    prefix: list[ExplorerState]
+    cycle: list[ExplorerState]
+
+
+@dataclass
+class ExplorationReport:
+    """
+    The results of exploring a controller's state space.
+
+    ``worst_wait`` maps each (call type, floor) button to the most steps a call on it
+    can stay pending, counting the step that serves it, or None if it can starve.
+    ``worst_trace`` is a trace from the initial state that attains the longest wait.
+    ``door_holding`` records whether the environment could hold the idle car's doors;
+    if it could not, the bounds and the absence of starvation only hold for users
+    who never do.
+    """
+
+    number_of_floors: int
+    max_pending: Optional[int]
+    door_holding: bool
+    states: int
+    transitions: int
+    worst_wait: dict[tuple[CallType, int], Optional[int]]
+    worst_trace: list[ExplorerState] = field(default_factory=list)
+    livelock: Optional[Counterexample] = None
+    starvation: Optional[Counterexample] = None
+
+    @property
+    def max_wait(self) -> Optional[int]:
+        """
+        Get the most steps any call can wait, or None if some call can starve.
+        """
+        if any(wait is None for wait in self.worst_wait.values()):
+            return None
+        return max(self.worst_wait.values(), default=0)
+
+
+class _Model:
+    """
+    The integer state encoding, and a scratch Elevator for computing successors.
+
+    The lowest bits hold the floor, direction and last stop in mixed radix; above them
+    are the up, down and car buttons, one bit per floor each.
+    """
+
+    def __init__(self, number_of_floors: int):
+        self.number_of_floors = number_of_floors
+        n = number_of_floors
+        self.position_count = n * 3 * (3 * n + 1)
+        self.shift = self.position_count.bit_length()
+        self.position_mask = (1 << self.shift) - 1
+
+        # Bits for the buttons that physically exist: no UP at the top floor, and no
+        # DOWN at the bottom floor.
+        allowed = 0
+        for floor_num in range(1, n + 1):
+            if floor_num < n:
+                allowed |= self.button_bit(CallType.UP, floor_num)
+            if floor_num > 1:
+                allowed |= self.button_bit(CallType.DOWN, floor_num)
+            allowed |= self.button_bit(CallType.CAR, floor_num)
+        self.allowed = allowed
+        self.press_bits = [bit for bit in _bits(allowed)]
+        self.floor_buttons = [0] + [
+            allowed & sum(self.button_bit(call_type, floor_num) for call_type in _CALL_TYPES)
+            for floor_num in range(1, n + 1)
+        ]
+
+        self._elevator = Elevator(n, enable_sleep=False)
+
+    def button_bit(self, call_type: CallType, floor_num: int) -> int:
+        offset = (call_type - CallType.UP) * self.number_of_floors + floor_num - 1
+        return 1 << (self.shift + offset)
+
+    def position_of(self, state: int) -> tuple[int, Direction]:
+        position = (state & self.position_mask) // (3 * self.number_of_floors + 1)
+        return position // 3 + 1, Direction(position % 3 + Direction.STOPPED)
+
+    def button_for_bit(self, bit: int) -> tuple[CallType, int]:
+        offset = bit.bit_length() - 1 - self.shift
+        return _CALL_TYPES[offset // self.number_of_floors], offset % self.number_of_floors + 1
+
+    def encode(
+        self,
+        floor_num: int,
+        direction: Direction,
+        last_stop: Optional[tuple[int, Direction]],
+        buttons: int,
+    ) -> int:
+        stop_code = 0
+        if last_stop is not None:
+            stop_code = 1 + (last_stop[0] - 1) * 3 + last_stop[1] - Direction.STOPPED
+        position = ((floor_num - 1) * 3 + direction - Direction.STOPPED) * (
+            3 * self.number_of_floors + 1
+        ) + stop_code
+        return buttons | position
+
+    def decode(self, state: int) -> ExplorerState:
+        position, stop_code = divmod(state & self.position_mask, 3 * self.number_of_floors + 1)
+        floor_index, direction_index = divmod(position, 3)
+        last_stop = None
+        if stop_code:
+            stop_floor, stop_direction = divmod(stop_code - 1, 3)
+            last_stop = (stop_floor + 1, Direction(stop_direction + Direction.STOPPED))
+        calls: list[list[int]] = [[], [], []]
+        for bit in _bits(state & ~self.position_mask):
+            call_type, floor_num = self.button_for_bit(bit)
+            calls[call_type - CallType.UP].append(floor_num)
+        return ExplorerState(
+            floor_index + 1,
+            Direction(direction_index + Direction.STOPPED),
+            last_stop,
+            *(tuple(floors) for floors in calls),
+        )
+
+    def step(self, state: int) -> int:
+        """
+        Run one controller step from ``state`` and return the state it leads to.
+        """
+        decoded = self.decode(state)
+        elevator = self._elevator
+        for call_type, floors in zip(_CALL_TYPES, decoded[3:]):
+            buttons, _ = elevator._call_bank(call_type)
+            wanted = set(floors)
+            for floor_num in range(1, self.number_of_floors + 1):
+                if buttons[floor_num] and floor_num not in wanted:
+                    elevator._cancel_call(call_type, floor_num)
+                elif floor_num in wanted and not buttons[floor_num]:
+                    elevator._register_call(call_type, floor_num)
+        elevator._current_floor = decoded.floor
+        elevator._current_direction = decoded.direction
+        elevator._last_stop = decoded.last_stop
+        elevator._idle_count = 0
+
+        elevator.simulation_move_one_step()
+
+        buttons = 0
+        for call_type in _CALL_TYPES:
+            lit, _ = elevator._call_bank(call_type)
+            for floor_num in range(1, self.number_of_floors + 1):
+                if lit[floor_num]:
+                    buttons |= self.button_bit(call_type, floor_num)
+        return self.encode(
+            elevator._current_floor,
+            elevator._current_direction,
+            elevator._last_stop,
+            buttons,
+        )
+
+
+def _bits(mask: int) -> list[int]:
+    bits = list()
+    while mask:
+        low = mask & -mask
+        bits.append(low)
+        mask ^= low
+    return bits
+
+
+_worker_models: dict[int, _Model] = dict()
+
+
+def _step_partition(job: tuple[int, list[int]]) -> list[int]:
+    """
+    Step every state in one partition of the frontier, in a worker process.
+    """
+    number_of_floors, states = job
+    model = _worker_models.get(number_of_floors)
+    if model is None:
+        model = _worker_models[number_of_floors] = _Model(number_of_floors)
+    return [model.step(state) for state in states]
+
+
+def explore(
+    number_of_floors: int,
+    *,
+    start_floor: int = 1,
+    max_pending: Optional[int] = None,
+    door_holding: bool = True,
+    workers: Optional[int] = None,
+    state_limit: Optional[int] = 5_000_000,
+) -> ExplorationReport:
+    """
+    Enumerate every reachable controller state and analyse worst-case behaviour.
+
+    Args:
+        number_of_floors (int) - the number of floors. Every up, down and car button
+            adds a bit of state, so exhaustive runs are practical up to about 6 floors,
+            or about 12 with ``max_pending``.
+        start_floor (int, keyword only) - the idle car's starting floor.
+        max_pending (int, keyword only) - the most buttons the environment may have
+            lit at once. Defaults to None, for no limit.
+        door_holding (bool, keyword only) - whether the environment may press a button
+            on the floor where the car is standing idle. The idle car reopens its doors
+            for any such press, so someone pressing one every step holds the car there
+            indefinitely, starving every other call. Defaults to True; pass False to
+            bound waits assuming nobody does that.
+        workers (int, keyword only) - worker processes to step large frontiers with.
+            Each frontier is partitioned between the workers by state hash. Defaults
+            to None, which explores in-process.
+        state_limit (int, keyword only) - give up after this many states.
+
+    Returns:
+        ExplorationReport - the reachable state count and worst-case analysis.
+
+    Raises:
+        ValueError - raised if the start floor or pending limit is invalid.
+        RuntimeError - raised if the state space is larger than ``state_limit``.
+    """
+    if not 1 <= start_floor <= number_of_floors:
+        raise ValueError("invalid start floor", start_floor)
+    if max_pending is not None and max_pending < 1:
+        raise ValueError("invalid pending call limit", max_pending)
+
+    model = _Model(number_of_floors)
+    explorer = _Explorer(model, max_pending, door_holding)
+    initial = model.encode(start_floor, Direction.STOPPED, None, 0)
+
+    pool = None
+    if workers is not None and workers > 1:
+        pool = multiprocessing.Pool(workers)
+    try:
+        explorer.search(initial, pool, workers or 1, state_limit)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    report = ExplorationReport(
+        number_of_floors,
+        max_pending,
+        door_holding,
+        len(explorer.parent),
+        explorer.transitions,
+        dict(),
+    )
+    report.livelock = explorer.find_livelock()
+
+    worst: Optional[tuple[int, int, int]] = None
+    for bit in model.press_bits:
+        button = model.button_for_bit(bit)
+        wait, witness, cycle = explorer.longest_wait(bit)
+        report.worst_wait[button] = wait
+        if cycle is not None and report.starvation is None:
+            report.starvation = Counterexample(
+                button,
+                [model.decode(state) for state in explorer.path_to(cycle[0])[:-1]],
+                [model.decode(state) for state in cycle],
+            )
+        if wait is not None and (worst is None or wait > worst[0]):
+            worst = (wait, bit, witness)
+    if worst is not None:
+        report.worst_trace = [model.decode(state) for state in explorer.worst_path(*worst[1:])]
+    return report
+
+
+class _Explorer:
+    """
+    The reachable state graph and the analyses run over it.
+    """
+
+    def __init__(self, model: _Model, max_pending: Optional[int], door_holding: bool):
+        self.model = model
+        self.max_pending = max_pending
+        self.door_holding = door_holding
+        self.parent: dict[int, Optional[int]] = dict()
+        self.after_step: dict[int, int] = dict()
+        self._successors: dict[int, list[int]] = dict()
+        self.transitions = 0
+
+    def successors(self, stepped: int) -> list[int]:
+        """
+        Get the states the environment can leave before the next step: the stepped
+        state itself, or it with one more button pressed. Memoised, since the wait
+        analysis asks again for every button.
+        """
+        following = self._successors.get(stepped)
+        if following is not None:
+            return following
+        following = self._successors[stepped] = [stepped]
+        lit = stepped & ~self.model.position_mask
+        if self.max_pending is None or lit.bit_count() < self.max_pending:
+            pressable = self.model.allowed & ~lit
+            floor_num, direction = self.model.position_of(stepped)
+            if not self.door_holding and direction == Direction.STOPPED:
+                pressable &= ~self.model.floor_buttons[floor_num]
+            following.extend(stepped | bit for bit in _bits(pressable))
+        return following
+
+    def search(self, initial: int, pool, workers: int, state_limit: Optional[int]) -> None:
+        parent = self.parent
+        parent[initial] = None
+        frontier = [initial]
+        while frontier:
+            if pool is not None and len(frontier) >= PARALLEL_FRONTIER_MIN:
+                partitions: list[list[int]] = [[] for _ in range(workers)]
+                for state in frontier:
+                    partitions[hash(state) % workers].append(state)
+                stepped_partitions = pool.map(
+                    _step_partition,
+                    [(self.model.number_of_floors, partition) for partition in partitions],
+                )
+                frontier = [state for partition in partitions for state in partition]
+                stepped = [state for partition in stepped_partitions for state in partition]
+            else:
+                stepped = [self.model.step(state) for state in frontier]
+
+            following = list()
+            for state, after in zip(frontier, stepped):
+                self.after_step[state] = after
+                for successor in self.successors(after):
+                    self.transitions += 1
+                    if successor not in parent:
+                        parent[successor] = state
+                        following.append(successor)
+            if state_limit is not None and len(parent) > state_limit:
+                raise RuntimeError("state space exceeds the state limit", state_limit)
+            frontier = following
+
+    def path_to(self, state: int) -> list[int]:
+        """
+        Get the shortest trace from the initial state to ``state``, inclusive.
+        """
+        path = list()
+        current: Optional[int] = state
+        while current is not None:
+            path.append(current)
+            current = self.parent[current]
+        path.reverse()
+        return path
+
+    def find_livelock(self) -> Optional[Counterexample]:
+        """
+        Find a cycle the car repeats forever, with calls pending, if nothing new is
+        pressed. Without presses every state has a single successor, so each walk
+        either settles in an idle state or enters such a cycle.
+        """
+        model = self.model
+        finished: set[int] = set()
+        for start in self.after_step:
+            walk: dict[int, int] = dict()
+            state = start
+            while state not in finished and state not in walk:
+                walk[state] = len(walk)
+                state = self.after_step[state]
+            if state in walk:
+                cycle = list(walk)[walk[state] :]
+                if any(s & ~model.position_mask for s in cycle):
+                    return Counterexample(
+                        None,
+                        [model.decode(s) for s in self.path_to(cycle[0])[:-1]],
+                        [model.decode(s) for s in cycle],
+                    )
+            finished.update(walk)
+        return None
+
+    def _waiting_children(self, state: int, bit: int) -> list[int]:
+        after = self.after_step[state]
+        return self.successors(after) if after & bit else []
+
+    def longest_wait(self, bit: int) -> tuple[Optional[int], Optional[int], Optional[list[int]]]:
+        """
+        Find the most steps the call on ``bit`` can stay pending.
+
+        Returns:
+            tuple - the longest wait (None if unbounded), a state the longest wait
+                starts from, and a cycle that keeps the call pending forever, if any.
+        """
+        waits = self._waits(bit)
+        if isinstance(waits, list):
+            return None, None, waits
+        if not waits:
+            return 0, None, None
+        witness = max(waits, key=waits.get)
+        return waits[witness], witness, None
+
+    def _waits(self, bit: int):
+        """
+        Compute, for every state with the call on ``bit`` pending, the most steps until
+        it is served, with an iterative depth-first search. Returns a cycle instead if
+        the environment can keep the call pending forever.
+        """
+        waits: dict[int, Optional[int]] = dict()
+        for root in self.after_step:
+            if not root & bit or root in waits:
+                continue
+            waits[root] = None
+            stack = [[root, iter(self._waiting_children(root, bit)), 0]]
+            while stack:
+                frame = stack[-1]
+                for child in frame[1]:
+                    known = waits.get(child, -1)
+                    if known == -1:
+                        waits[child] = None
+                        stack.append([child, iter(self._waiting_children(child, bit)), 0])
+                        break
+                    if known is None:
+                        on_stack = [entry[0] for entry in stack]
+                        return on_stack[on_stack.index(child) :]
+                    frame[2] = max(frame[2], known)
+                else:
+                    stack.pop()
+                    waits[frame[0]] = 1 + frame[2]
+                    if stack:
+                        stack[-1][2] = max(stack[-1][2], waits[frame[0]])
+        return waits
+
+    def worst_path(self, bit: int, witness: int) -> list[int]:
+        """
+        Get a trace from the initial state through the longest wait for ``bit``.
+        """
+        waits = self._waits(bit)
+        path = self.path_to(witness)
+        state = witness
+        while True:
+            children = self._waiting_children(state, bit)
+            if not children:
+                return path
+            state = max(children, key=waits.get)
+            path.append(state)
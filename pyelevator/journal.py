@@ -0,0 +1,503 @@
+# -*- coding: utf-8 -*-
+"""
+Elevator Exercise in Python
+Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
+
+An append-only journal of an Elevator's pending calls and position, so a restarted
+controller can pick up where it left off instead of asking passengers to press their
+buttons again.
+
+:py:class:`StateJournal` keeps two files. The snapshot, at ``path + ".snapshot"``,
+holds the complete state as of its generation::
+
+    offset  size  field
+    0       4     magic (b"PYES")
+    4       2     format version
+    6       2     number of floors
+    8       4     generation
+    12      8     elapsed simulated time
+    20      2     current floor
+    22      1     direction
+    23      1     padding
+    24      4     number of pending calls, c
+    28      12c   pending calls: call type (1), padding (1), floor (2), registered at (8)
+    28+12c  4     CRC-32 of everything before it
+
+The journal, at ``path``, starts with a 12 byte header (magic b"PYEJ", format
+version, number of floors, generation) followed by fixed-size 24 byte records::
+
+    offset  size  field
+    0       1     record kind (REGISTERED, SERVED or POSITION)
+    1       1     call type, or direction for POSITION
+    2       2     floor
+    4       8     simulated time
+    12      8     registration time (REGISTERED only)
+    20      4     CRC-32 of the 20 bytes before it
+
+Replay stops at the first record that is torn short or fails its CRC, so whatever a
+crash left at the end of the journal is ignored. Every multi-byte field is
+little-endian.
+"""
+import os
+import struct
+import threading
+import zlib
+from typing import BinaryIO
+from typing import NamedTuple
+from typing import Optional
+
+from .call import CallType
+from .call import PendingCall
+from .direction import Direction
+from .elevator import Elevator
+
+# +: Magic bytes identifying a journal file.
+JOURNAL_MAGIC: bytes = b"PYEJ"
+
+# +: Magic bytes identifying a snapshot file.
+SNAPSHOT_MAGIC: bytes = b"PYES"
+
+# +: Version of the journal and snapshot formats.
+FORMAT_VERSION: int = 2
+
+# +: Wall-clock seconds between checkpoints, each written and fsynced as one batch.
+SYNC_INTERVAL: float = 0.05
+
+# +: Records journaled before the state is compacted into a fresh snapshot.
+COMPACT_EVERY: int = 16_384
+
+# +: Suffix of the snapshot file, appended to the journal path.
+SNAPSHOT_SUFFIX: str = ".snapshot"
+
+# +: Record kinds.
+REGISTERED: int = 1
+SERVED: int = 2
+POSITION: int = 3
+
+_JOURNAL_HEADER = struct.Struct("<4sHHI")
+_RECORD = struct.Struct("<BBHqq")
+_SNAPSHOT_HEADER = struct.Struct("<4sHHIqHBxI")
+_SNAPSHOT_CALL = struct.Struct("<BxHq")
+_CRC = struct.Struct("<I")
+_RECORD_SIZE = _RECORD.size + _CRC.size
+
+
+class JournalState(NamedTuple):
+    """
+    Controller state recovered from a snapshot and the journal tail. ``calls`` maps
+    each pending ``(call type, floor)`` to the time it was registered.
+    """
+
+    generation: int
+    elapsed_time: int
+    floor: int
+    direction: Direction
+    calls: dict[tuple[CallType, int], int]
+    replayed: int
+
+
+def _pack_record(
+    kind: int,
+    code: int,
+    floor_num: int,
+    time: int,
+    registered_at: int,
+) -> bytes:
+    record = _RECORD.pack(kind, code, floor_num, time, registered_at)
+    return record + _CRC.pack(zlib.crc32(record))
+
+
+def _fsync_directory(path: str) -> None:
+    try:
+        descriptor = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def read_state(path: str, number_of_floors: int) -> Optional[JournalState]:
+    """
+    Read the latest snapshot and replay the journal tail written after it.
+
+    Args:
+        path (str) - the journal path given to :py:class:`StateJournal`.
+        number_of_floors (int) - the number of floors the state must be for.
+
+    Returns:
+        Optional[JournalState] - the recovered state, or None if no snapshot exists.
+
+    Raises:
+        ValueError - raised if the snapshot is corrupt, or either file was written for
+            a different number of floors or in an unknown format.
+    """
+    path = os.fspath(path)
+    try:
+        with open(path + SNAPSHOT_SUFFIX, "rb") as snapshot_file:
+            snapshot = snapshot_file.read()
+    except FileNotFoundError:
+        return None
+
+    if len(snapshot) < _SNAPSHOT_HEADER.size + _CRC.size:
+        raise ValueError("truncated snapshot", path + SNAPSHOT_SUFFIX)
+    (crc,) = _CRC.unpack_from(snapshot, len(snapshot) - _CRC.size)
+    if zlib.crc32(snapshot[: -_CRC.size]) != crc:
+        raise ValueError("corrupt snapshot", path + SNAPSHOT_SUFFIX)
+    magic, version, floors, generation, elapsed_time, floor_num, direction, count = (
+        _SNAPSHOT_HEADER.unpack_from(snapshot)
+    )
+    if magic != SNAPSHOT_MAGIC or version != FORMAT_VERSION:
+        raise ValueError("unknown snapshot format", magic, version)
+    if floors != number_of_floors:
+        raise ValueError("snapshot is for a different number of floors", floors)
+
+    calls = dict()
+    offset = _SNAPSHOT_HEADER.size
+    for _ in range(count):
+        call_type, call_floor, registered_at = _SNAPSHOT_CALL.unpack_from(snapshot, offset)
+        calls[(CallType(call_type), call_floor)] = registered_at
+        offset += _SNAPSHOT_CALL.size
+
+    replayed = 0
+    try:
+        with open(path, "rb") as journal_file:
+            journal = journal_file.read()
+    except FileNotFoundError:
+        journal = b""
+    if len(journal) >= _JOURNAL_HEADER.size:
+        magic, version, floors, journal_generation = _JOURNAL_HEADER.unpack_from(journal)
+        if magic != JOURNAL_MAGIC or version != FORMAT_VERSION:
+            raise ValueError("unknown journal format", magic, version)
+        if floors != number_of_floors:
+            raise ValueError("journal is for a different number of floors", floors)
+
+        # A journal from an older generation was already folded into the snapshot
+        # when a compaction was interrupted before the journal was reset.
+        if journal_generation == generation:
+            view = memoryview(journal)
+            for offset in range(
+                _JOURNAL_HEADER.size,
+                len(journal) - _RECORD_SIZE + 1,
+                _RECORD_SIZE,
+            ):
+                record = view[offset : offset + _RECORD.size]
+                if zlib.crc32(record) != _CRC.unpack_from(view, offset + _RECORD.size)[0]:
+                    break
+                kind, code, record_floor, time, registered_at = _RECORD.unpack(record)
+                if kind == REGISTERED:
+                    calls[(CallType(code), record_floor)] = registered_at
+                elif kind == SERVED:
+                    calls.pop((CallType(code), record_floor), None)
+                elif kind == POSITION:
+                    floor_num, direction = record_floor, code
+                if time > elapsed_time:
+                    elapsed_time = time
+                replayed += 1
+
+    return JournalState(generation, elapsed_time, floor_num, Direction(direction), calls, replayed)
+
+
+def restore(elevator: Elevator, path: str) -> Optional[JournalState]:
+    """
+    Restore a newly created Elevator from a journal, relighting every button that was
+    pending and putting the car back on its floor, heading and clock.
+
+    Each call keeps its original registration time, so call aging carries on across
+    the restart. Passengers are not journaled.
+
+    Args:
+        elevator (Elevator) - the Elevator to restore. It should have no pending calls.
+        path (str) - the journal path given to :py:class:`StateJournal`.
+
+    Returns:
+        Optional[JournalState] - the state restored, or None if there was none.
+
+    Raises:
+        ValueError - raised for any reason :py:func:`read_state` would.
+    """
+    state = read_state(path, elevator.number_of_floors)
+    if state is None:
+        return None
+    elevator.elapsed_time = max(elevator.elapsed_time, state.elapsed_time)
+    elevator.floor = state.floor
+    elevator.direction = state.direction
+    for (call_type, floor_num), registered_at in sorted(
+        state.calls.items(),
+        key=lambda item: item[1],
+    ):
+        elevator._register_call(call_type, floor_num, registered_at)
+    return state
+
+
+class StateJournal:
+    """
+    Journals the button presses and clears, and the car's floor and direction, of one
+    Elevator.
+
+    Nothing is added to the controller's hot path: rather than listening to events,
+    which would have to be built for every move and button, the journal takes a
+    checkpoint every ``sync_interval`` seconds on a background thread. A checkpoint
+    compares the Elevator's pending call tables with the state already journaled,
+    appends a record for every call registered or served since, and a position record
+    if the car has moved or turned, then writes and fsyncs the batch. A crash
+    therefore loses at most one interval of changes, and a call pressed and served
+    within a single interval is never journaled at all, since there is nothing to
+    restore for it. Every ``compact_every`` records the full state is written to a
+    new snapshot and the journal is reset.
+
+    With ``sync_interval=None`` no thread is started and the owner calls
+    :py:meth:`sync` itself, e.g. once per simulation step.
+
+    On startup, restore and then resume journaling with::
+
+        restore(elevator, path)
+        journal = StateJournal(elevator, path)
+    """
+
+    elevator: Elevator
+    path: str
+    _file: Optional[BinaryIO]
+    _generation: int
+    _since_snapshot: int
+    _journaled: list[list[Optional[PendingCall]]]
+    _position: tuple[int, Direction]
+    _lock: threading.Lock
+    _stopping: threading.Event
+    _thread: Optional[threading.Thread]
+
+    checkpoints: int
+
+    def __init__(
+        self,
+        elevator: Elevator,
+        path: str,
+        *,
+        sync_interval: Optional[float] = SYNC_INTERVAL,
+        compact_every: int = COMPACT_EVERY,
+        fsync: bool = True,
+    ):
+        """
+        Write a snapshot of the Elevator's current state and start journaling.
+
+        Args:
+            elevator (Elevator) - the Elevator to journal.
+            path (str) - the journal file. The snapshot is kept alongside it.
+            sync_interval (float, keyword only) - wall-clock seconds between
+                checkpoints, or None to only checkpoint when :py:meth:`sync` is called.
+            compact_every (int, keyword only) - records between snapshots.
+            fsync (bool, keyword only) - whether to fsync at all. Only turn this off
+                for tests and benchmarks.
+
+        Raises:
+            ValueError - raised if ``sync_interval`` or ``compact_every`` is not
+                positive.
+        """
+        if sync_interval is not None and sync_interval <= 0:
+            raise ValueError("invalid sync interval", sync_interval)
+        if compact_every < 1:
+            raise ValueError("invalid compaction interval", compact_every)
+
+        self.elevator = elevator
+        self.path = os.fspath(path)
+        self._compact_every = compact_every
+        self._fsync = fsync
+        self._file = None
+        self._since_snapshot = 0
+        self._generation = self._latest_generation()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self.checkpoints = 0
+
+        self.compact()
+        if sync_interval is not None:
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(sync_interval,),
+                name="pyelevator-journal",
+                daemon=True,
+            )
+            self._thread.start()
+
+    @property
+    def generation(self) -> int:
+        """
+        Get the generation of the current snapshot.
+        """
+        return self._generation
+
+    def _latest_generation(self) -> int:
+        try:
+            with open(self.path + SNAPSHOT_SUFFIX, "rb") as snapshot_file:
+                header = snapshot_file.read(_SNAPSHOT_HEADER.size)
+        except FileNotFoundError:
+            return 0
+        if len(header) < _SNAPSHOT_HEADER.size:
+            return 0
+        return _SNAPSHOT_HEADER.unpack(header)[3]
+
+    def _call_tables(self) -> list[list[Optional[PendingCall]]]:
+        """
+        Copy the Elevator's pending call tables. Each copy is a single C-level list
+        copy, so it is consistent even while the controller thread is running.
+        """
+        elevator = self.elevator
+        return [
+            list(elevator._up_calls),
+            list(elevator._down_calls),
+            list(elevator._car_calls),
+        ]
+
+    def _run(self, sync_interval: float) -> None:
+        while not self._stopping.wait(sync_interval):
+            self.sync()
+
+    def sync(self) -> int:
+        """
+        Journal every change since the last checkpoint, and write and fsync it,
+        compacting instead if enough records have accumulated since the last
+        snapshot.
+
+        Returns:
+            int - the number of records journaled.
+        """
+        with self._lock:
+            if self._file is None:
+                return 0
+            elevator = self.elevator
+            now = elevator.elapsed_time
+            records = bytearray()
+            count = 0
+
+            tables = self._call_tables()
+            for call_type, table, journaled in zip(CallType, tables, self._journaled):
+                if table == journaled:
+                    continue
+                for floor_num, call in enumerate(table):
+                    if call is journaled[floor_num]:
+                        continue
+                    if call is None:
+                        records += _pack_record(SERVED, call_type, floor_num, now, 0)
+                    else:
+                        records += _pack_record(
+                            REGISTERED,
+                            call_type,
+                            floor_num,
+                            now,
+                            call.registered_at,
+                        )
+                    count += 1
+
+            position = (elevator.floor, elevator.direction)
+            if position != self._position:
+                records += _pack_record(POSITION, position[1], position[0], now, 0)
+                count += 1
+            if not count:
+                return 0
+
+            self.checkpoints += 1
+            self._since_snapshot += count
+            if self._since_snapshot >= self._compact_every:
+                self._compact()
+                return count
+            self._file.write(records)
+            if self._fsync:
+                os.fsync(self._file.fileno())
+            self._journaled = tables
+            self._position = position
+            return count
+
+    def compact(self) -> None:
+        """
+        Write the complete current state to a new snapshot and reset the journal.
+
+        The snapshot is written to a temporary file and renamed into place, and only
+        then is the journal reset, so a crash at any point leaves either the old
+        snapshot with its journal or the new snapshot to restore from.
+        """
+        with self._lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        elevator = self.elevator
+        tables = self._call_tables()
+        position = (elevator.floor, elevator.direction)
+        calls = [
+            _SNAPSHOT_CALL.pack(call.call_type, call.floor, call.registered_at)
+            for table in tables
+            for call in table
+            if call is not None
+        ]
+
+        generation = self._generation + 1
+        snapshot = bytearray(
+            _SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC,
+                FORMAT_VERSION,
+                elevator.number_of_floors,
+                generation,
+                elevator.elapsed_time,
+                position[0],
+                position[1],
+                len(calls),
+            ),
+        )
+        for call in calls:
+            snapshot += call
+        snapshot += _CRC.pack(zlib.crc32(snapshot))
+
+        snapshot_path = self.path + SNAPSHOT_SUFFIX
+        with open(snapshot_path + ".tmp", "wb") as snapshot_file:
+            snapshot_file.write(snapshot)
+            if self._fsync:
+                os.fsync(snapshot_file.fileno())
+        os.replace(snapshot_path + ".tmp", snapshot_path)
+        # The rename must be durable before the old journal is truncated, or a crash
+        # could leave the old snapshot with an empty journal.
+        if self._fsync:
+            _fsync_directory(snapshot_path)
+
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.path, "wb", buffering=0)
+        self._file.write(
+            _JOURNAL_HEADER.pack(
+                JOURNAL_MAGIC,
+                FORMAT_VERSION,
+                elevator.number_of_floors,
+                generation,
+            ),
+        )
+        if self._fsync:
+            os.fsync(self._file.fileno())
+            _fsync_directory(self.path)
+
+        self._generation = generation
+        self._since_snapshot = 0
+        self._journaled = tables
+        self._position = position
+
+    def close(self) -> None:
+        """
+        Stop the background thread, take a final checkpoint and close the journal.
+        """
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+        if self._file is None:
+            return
+        self.sync()
+        with self._lock:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "StateJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
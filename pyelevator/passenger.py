@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Elevator Exercise in Python
+Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
+"""
+from typing import Optional
+
+from .direction import Direction
+
+
+class Passenger:
+    """
+    A single passenger journey from an origin floor to a destination floor.
+
+    The simulation fills in ``board_time`` and ``alight_time`` (in simulated
+    seconds) as the passenger is carried. This is a plain class with ``__slots__``
+    rather than a dataclass so that importing the core model does not pull in
+    :py:mod:`dataclasses` and :py:mod:`inspect`.
+    """
+
+    __slots__ = ("origin", "destination", "arrival_time", "board_time", "alight_time")
+
+    origin: int
+    destination: int
+    arrival_time: int
+    board_time: Optional[int]
+    alight_time: Optional[int]
+
+    def __init__(
+        self,
+        origin: int,
+        destination: int,
+        arrival_time: int = 0,
+        board_time: Optional[int] = None,
+        alight_time: Optional[int] = None,
+    ):
+        """
+        Create a new Passenger.
+
+        Args:
+            origin (int) - the floor the passenger is waiting on.
+            destination (int) - the floor the passenger wants to go to.
+            arrival_time (int) - the simulated time the passenger arrived.
+            board_time (int) - the simulated time the passenger boarded, if any.
+            alight_time (int) - the simulated time the passenger alighted, if any.
+
+        Raises:
+            ValueError - raised if the origin and destination are the same floor.
+        """
+        if origin == destination:
+            raise ValueError("origin and destination must differ", origin)
+        self.origin = origin
+        self.destination = destination
+        self.arrival_time = arrival_time
+        self.board_time = board_time
+        self.alight_time = alight_time
+
+    def _fields(self) -> tuple:
+        return (
+            self.origin,
+            self.destination,
+            self.arrival_time,
+            self.board_time,
+            self.alight_time,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"Passenger(origin={self.origin!r}, destination={self.destination!r}, "
+            f"arrival_time={self.arrival_time!r}, board_time={self.board_time!r}, "
+            f"alight_time={self.alight_time!r})"
+        )
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None
+
+    @property
+    def direction(self) -> Direction:
+        """
+        Get the direction the passenger wants to travel.
+
+        Returns:
+            Direction - UP if the destination is above the origin, DOWN otherwise.
+        """
+        return Direction.UP if self.destination > self.origin else Direction.DOWN
+
+    @property
+    def wait_time(self) -> Optional[int]:
+        """
+        Get the time the passenger waited at the origin floor.
+
+        Returns:
+            Optional[int] - the wait in simulated seconds, or None if the passenger
+                has not boarded yet.
+        """
+        if self.board_time is None:
+            return None
+        return self.board_time - self.arrival_time
+
+    @property
+    def journey_time(self) -> Optional[int]:
+        """
+        Get the time from arriving at the origin until alighting at the destination.
+
+        Returns:
+            Optional[int] - the journey time in simulated seconds, or None if the
+                passenger has not been delivered yet.
+        """
+        if self.alight_time is None:
+            return None
+        return self.alight_time - self.arrival_time
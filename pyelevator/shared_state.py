@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+Elevator Exercise in Python
+Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
+
+Publish live Elevator state into a :py:mod:`multiprocessing.shared_memory` block so
+monitors in other processes can read it without any IPC round trips.
+
+The block has a fixed little-endian layout::
+
+    offset  size  field
+    0       4     magic (b"PYEL")
+    4       2     layout version
+    6       2     number of floors
+    8       8     sequence counter (odd while an update is in progress)
+    16      4     current floor
+    20      1     direction
+    21      3     padding
+    24      4     idle counter
+    28      4     load
+    32      8     elapsed simulated time
+    40      n     up buttons, one bit per floor (floor 0 unused)
+    40+n    n     down buttons
+    40+2n   n     car buttons
+
+where ``n`` is ``(number_of_floors + 1 + 7) // 8``. Writers bump the sequence
+counter before and after every update; readers retry until they see the same even
+value on both sides of their read (a seqlock), giving up after a bounded number of
+attempts so a writer that dies mid-update cannot hang them.
+"""
+import mmap
+import os
+import struct
+from multiprocessing import shared_memory
+from typing import NamedTuple
+from typing import Optional
+
+from .call import CallType
+from .direction import Direction
+from .elevator import Elevator
+from .events import CallRegistered
+from .events import CallServed
+from .events import Event
+
+# +: Magic bytes identifying a pyelevator shared state block.
+MAGIC: bytes = b"PYEL"
+
+# +: Version of the shared memory layout.
+LAYOUT_VERSION: int = 1
+
+# +: Attempts a reader makes at a consistent snapshot before deciding the writer died.
+READ_ATTEMPTS: int = 100_000
+
+_HEADER = struct.Struct("<4sHH")
+_SEQUENCE = struct.Struct("<Q")
+_STATE = struct.Struct("<IB3xIIQ")
+
+_SEQUENCE_OFFSET = 8
+_STATE_OFFSET = 16
+_BUTTONS_OFFSET = 40
+
+
+def _bank_size(number_of_floors: int) -> int:
+    return (number_of_floors + 1 + 7) // 8
+
+
+def _pack_buttons(buttons: list[bool]) -> bytes:
+    packed = bytearray(_bank_size(len(buttons) - 1))
+    for floor_num, pressed in enumerate(buttons):
+        if pressed:
+            packed[floor_num >> 3] |= 1 << (floor_num & 7)
+    return bytes(packed)
+
+
+def _unpack_buttons(packed: bytes, number_of_floors: int) -> frozenset[int]:
+    return frozenset(
+        floor_num
+        for floor_num in range(1, number_of_floors + 1)
+        if packed[floor_num >> 3] & (1 << (floor_num & 7))
+    )
+
+
+class SharedStateSnapshot(NamedTuple):
+    """
+    A consistent copy of the published Elevator state.
+    """
+
+    sequence: int
+    floor: int
+    direction: Direction
+    idle_counter: int
+    load: int
+    elapsed_time: int
+    up_buttons: frozenset[int]
+    down_buttons: frozenset[int]
+    car_buttons: frozenset[int]
+
+
+class SharedStatePublisher:
+    """
+    Mirrors an Elevator's state into a shared memory block.
+
+    The publisher listens to the Elevator's events and patches only the fields each
+    event changes, so the controller's hot path is a handful of memory stores with no
+    system calls.
+    """
+
+    elevator: Elevator
+    _shm: shared_memory.SharedMemory
+    _buf: memoryview
+    _sequence: int
+    _bank_size: int
+
+    def __init__(self, elevator: Elevator, name: Optional[str] = None):
+        """
+        Create the shared memory block and start publishing.
+
+        Args:
+            elevator (Elevator) - the Elevator to publish.
+            name (str) - the name of the shared memory block. A unique name is chosen
+                if not specified.
+        """
+        self.elevator = elevator
+        self._bank_size = _bank_size(elevator.number_of_floors)
+        self._shm = shared_memory.SharedMemory(
+            name=name,
+            create=True,
+            size=_BUTTONS_OFFSET + 3 * self._bank_size,
+        )
+        self._buf = self._shm.buf
+        self._sequence = 0
+        _HEADER.pack_into(
+            self._buf,
+            0,
+            MAGIC,
+            LAYOUT_VERSION,
+            elevator.number_of_floors,
+        )
+        self.publish()
+        elevator.add_listener(self._on_event)
+
+    @property
+    def name(self) -> str:
+        """
+        Get the name readers use to attach to the block.
+        """
+        return self._shm.name
+
+    def publish(self) -> None:
+        """
+        Write the complete Elevator state into the block.
+        """
+        elevator = self.elevator
+        self._begin()
+        self._write_state()
+        offset = _BUTTONS_OFFSET
+        for buttons in (elevator.up_buttons, elevator.down_buttons, elevator.car_buttons):
+            self._buf[offset : offset + self._bank_size] = _pack_buttons(buttons)
+            offset += self._bank_size
+        self._end()
+
+    def _on_event(self, event: Event) -> None:
+        """
+        Patch the fields of the block that an event changed.
+        """
+        self._begin()
+        if type(event) is CallRegistered:
+            self._set_button(event.call_type, event.floor, True)
+        elif type(event) is CallServed:
+            self._set_button(event.call_type, event.floor, False)
+        self._write_state()
+        self._end()
+
+    def _write_state(self) -> None:
+        elevator = self.elevator
+        _STATE.pack_into(
+            self._buf,
+            _STATE_OFFSET,
+            elevator.floor,
+            elevator.direction,
+            elevator.idle_counter,
+            elevator.load,
+            elevator.elapsed_time,
+        )
+
+    def _set_button(self, call_type: CallType, floor_num: int, pressed: bool) -> None:
+        offset = _BUTTONS_OFFSET + (call_type - CallType.UP) * self._bank_size
+        offset += floor_num >> 3
+        if pressed:
+            self._buf[offset] |= 1 << (floor_num & 7)
+        else:
+            self._buf[offset] &= ~(1 << (floor_num & 7)) & 0xFF
+
+    def _begin(self) -> None:
+        self._sequence += 1
+        _SEQUENCE.pack_into(self._buf, _SEQUENCE_OFFSET, self._sequence)
+
+    def _end(self) -> None:
+        self._sequence += 1
+        _SEQUENCE.pack_into(self._buf, _SEQUENCE_OFFSET, self._sequence)
+
+    def close(self, unlink: bool = True) -> None:
+        """
+        Stop publishing and release the block.
+
+        Args:
+            unlink (bool) - whether to also destroy the block. Defaults to True.
+        """
+        self.elevator.remove_listener(self._on_event)
+        self._buf = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedStatePublisher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class SharedStateReader:
+    """
+    Maps a published shared memory block read-only and takes consistent snapshots.
+    """
+
+    number_of_floors: int
+    _buf: memoryview
+    _mmap: Optional[mmap.mmap]
+    _shm: Optional[shared_memory.SharedMemory]
+    _bank_size: int
+
+    def __init__(self, name: str):
+        """
+        Attach to a block created by :py:class:`SharedStatePublisher`.
+
+        On Linux the block is mapped straight from ``/dev/shm`` with read-only access;
+        elsewhere it is attached through :py:mod:`multiprocessing.shared_memory` and
+        exposed through a read-only view.
+
+        Args:
+            name (str) - the name of the block.
+
+        Raises:
+            ValueError - raised if the block is not a pyelevator state block.
+        """
+        self._mmap = None
+        self._shm = None
+        path = os.path.join("/dev/shm", name.lstrip("/"))
+        if os.path.exists(path):
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                self._mmap = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            finally:
+                os.close(fd)
+            self._buf = memoryview(self._mmap)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._buf = self._shm.buf.toreadonly()
+
+        magic, version, number_of_floors = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION:
+            self.close()
+            raise ValueError("not a pyelevator shared state block", name)
+        self.number_of_floors = number_of_floors
+        self._bank_size = _bank_size(number_of_floors)
+
+    @property
+    def sequence(self) -> int:
+        """
+        Get the current sequence counter, to cheaply check for updates.
+        """
+        return _SEQUENCE.unpack_from(self._buf, _SEQUENCE_OFFSET)[0]
+
+    def read(self, attempts: int = READ_ATTEMPTS) -> SharedStateSnapshot:
+        """
+        Take a consistent snapshot, retrying while the writer is mid-update.
+
+        Args:
+            attempts (int) - how many times to try before giving up. Defaults to
+                :py:const:`READ_ATTEMPTS`.
+
+        Returns:
+            SharedStateSnapshot - the published state.
+
+        Raises:
+            TimeoutError - raised if no attempt saw a finished update, for example
+            because the writer died with the sequence counter odd.
+        """
+        buf = self._buf
+        size = self._bank_size
+        for _ in range(attempts):
+            before = _SEQUENCE.unpack_from(buf, _SEQUENCE_OFFSET)[0]
+            if before & 1:
+                continue
+            floor_num, direction, idle_counter, load, elapsed = _STATE.unpack_from(
+                buf,
+                _STATE_OFFSET,
+            )
+            banks = bytes(buf[_BUTTONS_OFFSET : _BUTTONS_OFFSET + 3 * size])
+            if _SEQUENCE.unpack_from(buf, _SEQUENCE_OFFSET)[0] == before:
+                break
+        else:
+            raise TimeoutError("shared state update never finished", self.sequence)
+
+        return SharedStateSnapshot(
+            before,
+            floor_num,
+            Direction(direction),
+            idle_counter,
+            load,
+            elapsed,
+            _unpack_buttons(banks[:size], self.number_of_floors),
+            _unpack_buttons(banks[size : 2 * size], self.number_of_floors),
+            _unpack_buttons(banks[2 * size :], self.number_of_floors),
+        )
+
+    def close(self) -> None:
+        """
+        Unmap the block. The publisher owns it, so it is never destroyed here.
+        """
+        self._buf.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        if self._shm is not None:
+            self._shm.close()
+
+    def __enter__(self) -> "SharedStateReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
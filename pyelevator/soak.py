@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Elevator Exercise in Python
+Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
+
+Long-running soak tests. :py:func:`soak` keeps an Elevator busy with an endless
+seeded stream of passengers for as many steps as requested, sampling
+:py:mod:`tracemalloc` and the process's resident set size as it goes, so slow leaks
+and hot-path allocation regressions show up long before they would in production.
+"""
+import math
+import os
+import sys
+import time
+import tracemalloc
+from array import array
+from dataclasses import dataclass
+from random import Random
+from typing import Callable
+from typing import NamedTuple
+from typing import Optional
+
+from .elevator import Elevator
+from .events import Event
+from .passenger import Passenger
+
+# +: Fraction of samples treated as warm-up and excluded from growth checks.
+WARMUP_FRACTION: float = 0.2
+
+# +: Steady-state growth of traced memory tolerated before a soak fails, in bytes.
+GROWTH_TOLERANCE: int = 64 * 1024
+
+# +: Steady-state growth in allocated memory blocks tolerated before a soak fails.
+BLOCK_TOLERANCE: int = 1024
+
+# +: Steady-state RSS growth tolerated before a soak fails, in bytes; RSS moves in pages.
+RSS_TOLERANCE: int = 16 * 1024 * 1024
+
+# +: Steps timed individually per sample to measure hot-path allocations.
+PROBE_STEPS: int = 64
+
+
+def resident_set_size() -> int:
+    """
+    Get the current resident set size of this process, in bytes.
+
+    Returns:
+        int - the RSS, read from ``/proc/self/statm`` where available. Elsewhere the
+            peak RSS from :py:func:`resource.getrusage` is used, or 0 if neither is.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class SoakSample(NamedTuple):
+    """
+    One measurement taken during a soak.
+
+    ``step_bytes`` is the mean of the peak memory allocated within a single step,
+    measured over :py:const:`PROBE_STEPS` steps; it is 0 for a step that allocates
+    nothing beyond what it frees.
+    """
+
+    steps: int
+    wall_time: float
+    traced_bytes: int
+    blocks: int
+    rss_bytes: int
+    step_bytes: float
+
+
+@dataclass
+class SoakReport:
+    """
+    The samples from a soak, and whether steady-state memory grew. ``events`` counts
+    the events streamed when the soak ran with ``stream=True``.
+    """
+
+    samples: list[SoakSample]
+    delivered: int
+    events: int
+
+    def _steady(self) -> list[SoakSample]:
+        return self.samples[int(len(self.samples) * WARMUP_FRACTION) :]
+
+    @property
+    def steps(self) -> int:
+        """
+        Get the number of steps run.
+        """
+        return self.samples[-1].steps if self.samples else 0
+
+    @property
+    def traced_growth(self) -> int:
+        """
+        Get how much traced memory grew over the steady state, in bytes.
+
+        The steady-state samples are split into thirds, and the growth is the least
+        memory in use during the last third minus the most in use during the first.
+        Memory that merely fluctuates with the load therefore reports no growth,
+        while a leak shows up once it outgrows that fluctuation.
+        """
+        steady = self._steady()
+        third = len(steady) // 3
+        if third == 0:
+            return 0
+        first = max(sample.traced_bytes for sample in steady[:third])
+        last = min(sample.traced_bytes for sample in steady[-third:])
+        return max(0, last - first)
+
+    @property
+    def rss_growth(self) -> int:
+        """
+        Get how much the resident set size grew over the steady state, in bytes.
+        """
+        steady = self._steady()
+        if len(steady) < 2:
+            return 0
+        return steady[-1].rss_bytes - steady[0].rss_bytes
+
+    @property
+    def blocks_per_step(self) -> float:
+        """
+        Get the net number of memory blocks retained per step over the steady state.
+        """
+        steady = self._steady()
+        if len(steady) < 2 or steady[-1].steps == steady[0].steps:
+            return 0.0
+        return (steady[-1].blocks - steady[0].blocks) / (steady[-1].steps - steady[0].steps)
+
+    @property
+    def step_bytes(self) -> float:
+        """
+        Get the mean bytes allocated within a single steady-state step.
+        """
+        steady = self._steady()
+        return sum(s.step_bytes for s in steady) / len(steady) if steady else 0.0
+
+    def is_growing(self, tolerance: int = GROWTH_TOLERANCE) -> bool:
+        """
+        Check whether steady-state memory grew.
+
+        A soak is growing if traced memory grew by more than ``tolerance`` bytes, if
+        the blocks retained over the steady state exceed :py:const:`BLOCK_TOLERANCE`,
+        or if the RSS grew by more than :py:const:`RSS_TOLERANCE`. The last two are
+        sampled with or without :py:mod:`tracemalloc`, so an untraced soak still
+        catches leaks.
+        """
+        steady = self._steady()
+        span = steady[-1].steps - steady[0].steps if steady else 0
+        return (
+            self.traced_growth > tolerance
+            or self.blocks_per_step * span > BLOCK_TOLERANCE
+            or self.rss_growth > RSS_TOLERANCE
+        )
+
+
+def soak(
+    elevator: Elevator,
+    steps: int,
+    *,
+    sample_every: int = 10_000,
+    arrivals_per_hour: int = 300,
+    seed: Optional[int] = None,
+    stream: bool = False,
+    trace: bool = True,
+    on_sample: Optional[Callable[[SoakSample], None]] = None,
+) -> SoakReport:
+    """
+    Run an Elevator for ``steps`` iterations of the simulation with a never-ending
+    stream of passengers, sampling memory use every ``sample_every`` steps.
+
+    Each iteration is what :py:meth:`Elevator.go` does, except that new passengers keep
+    arriving so the car never goes idle for long. Delivered passengers are dropped, so
+    a controller that retains nothing per step holds steady memory for any number of
+    steps.
+
+    Args:
+        elevator (Elevator) - the Elevator to drive. It should be created with
+            ``enable_sleep=False``.
+        steps (int) - the number of iterations to run.
+        sample_every (int, keyword only) - iterations between samples.
+        arrivals_per_hour (int, keyword only) - mean passenger arrival rate.
+        seed (int, keyword only) - seed for the arrivals, for repeatable runs.
+        stream (bool, keyword only) - also attach an event listener, as
+            :py:meth:`Elevator.run` does, so event creation is soaked too.
+        trace (bool, keyword only) - run under :py:mod:`tracemalloc`. Without it only
+            the RSS and block counts are sampled, which is much faster.
+        on_sample (Callable, keyword only) - called with each sample as it is taken.
+
+    Returns:
+        SoakReport - the samples taken.
+
+    Raises:
+        ValueError - raised if ``steps`` or ``sample_every`` is not positive.
+    """
+    if steps < 1:
+        raise ValueError("invalid number of steps", steps)
+    if sample_every < 1:
+        raise ValueError("invalid sample interval", sample_every)
+
+    rng = Random(seed)
+    floors = elevator.number_of_floors
+    mean_gap = 3600 / arrivals_per_hour
+    next_arrival = 0.0
+    events = 0
+
+    def count_event(event: Event) -> None:
+        nonlocal events
+        events += 1
+
+    def step() -> None:
+        nonlocal next_arrival
+        while next_arrival <= elevator.elapsed_time:
+            origin = rng.randint(1, floors)
+            destination = rng.randint(1, floors - 1)
+            if destination >= origin:
+                destination += 1
+            elevator.add_passenger(Passenger(origin, destination, int(next_arrival)))
+            next_arrival += rng.expovariate(1 / mean_gap)
+        if elevator.simulation_can_move():
+            elevator.idle_counter = 0
+            elevator.simulation_move_one_step()
+        else:
+            elevator.elapsed_time = max(elevator.elapsed_time, math.ceil(next_arrival))
+
+    # Samples go into columns allocated up front, so that recording them does not
+    # itself look like steady growth.
+    sample_count = -(-steps // sample_every)
+    columns = {
+        "steps": array("q", bytes(8 * sample_count)),
+        "wall_time": array("d", bytes(8 * sample_count)),
+        "traced_bytes": array("q", bytes(8 * sample_count)),
+        "blocks": array("q", bytes(8 * sample_count)),
+        "rss_bytes": array("q", bytes(8 * sample_count)),
+        "step_bytes": array("d", bytes(8 * sample_count)),
+    }
+    started_tracing = trace and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if stream:
+        elevator.add_listener(count_event)
+    delivered_before = elevator.passengers_delivered
+    started = time.perf_counter()
+    try:
+        done = 0
+        for index in range(sample_count):
+            batch = min(sample_every, steps - done)
+            probes = min(PROBE_STEPS, batch) if trace else 0
+            for _ in range(batch - probes):
+                step()
+
+            step_bytes = 0
+            for _ in range(probes):
+                baseline = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                step()
+                step_bytes += tracemalloc.get_traced_memory()[1] - baseline
+            done += batch
+
+            columns["steps"][index] = done
+            columns["wall_time"][index] = time.perf_counter() - started
+            columns["traced_bytes"][index] = tracemalloc.get_traced_memory()[0] if trace else 0
+            columns["blocks"][index] = sys.getallocatedblocks()
+            columns["rss_bytes"][index] = resident_set_size()
+            columns["step_bytes"][index] = step_bytes / probes if probes else 0.0
+            if on_sample is not None:
+                on_sample(SoakSample(*(column[index] for column in columns.values())))
+    finally:
+        if stream:
+            elevator.remove_listener(count_event)
+        if started_tracing:
+            tracemalloc.stop()
+
+    samples = [SoakSample(*row) for row in zip(*columns.values())][:index + 1]
+    return SoakReport(samples, elevator.passengers_delivered - delivered_before, events)
@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+"""
+Elevator Exercise in Python
+Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
+
+An offline solver that, given a complete recorded trace of passengers, searches for
+the best single-car schedule with branch-and-bound. Its results use the same time
+model as :py:class:`Elevator` (floor travel, door cycle and per-passenger transfer
+times), so they can be compared with the schedule the online controller produced
+for the same trace.
+"""
+import time
+from bisect import bisect_right
+from enum import auto
+from enum import IntEnum
+from typing import Iterable
+from typing import NamedTuple
+from typing import Optional
+
+from .elevator import DOOR_CYCLE_TIME
+from .elevator import FLOOR_TRAVEL_TIME
+from .elevator import PASSENGER_TRANSFER_TIME
+from .passenger import Passenger
+
+# +: How many not-yet-arrived passengers the solver considers driving towards.
+LOOKAHEAD_ARRIVALS: int = 2
+
+# +: Largest trace searched exhaustively, branching on who boards at every stop.
+EXHAUSTIVE_PASSENGERS: int = 10
+
+
+class Objective(IntEnum):
+    """
+    Defines what the solver minimises.
+    """
+
+    TOTAL_WAIT = auto()
+    MAKESPAN = auto()
+
+
+class OfflineSolution(NamedTuple):
+    """
+    The result of an offline search.
+
+    ``cost`` is the best schedule found, which is an upper bound on the optimum;
+    ``lower_bound`` is a lower bound on the cost of every schedule the car could run,
+    online or offline. They are equal when ``optimal`` is True. It is None when the
+    search could not prove a bound worth reporting, which is the case for the total
+    wait of a trace too long to search exhaustively.
+    """
+
+    objective: Objective
+    cost: int
+    lower_bound: Optional[int]
+    optimal: bool
+    nodes: int
+    stops: list[tuple[int, int]]
+
+
+def _bits(mask: int) -> Iterable[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _submasks(mask: int, limit: Optional[int]) -> Iterable[int]:
+    """
+    Every subset of ``mask`` with at most ``limit`` members, including the empty one.
+    """
+    subset = mask
+    while True:
+        if limit is None or subset.bit_count() <= limit:
+            yield subset
+        if subset == 0:
+            return
+        subset = (subset - 1) & mask
+
+
+class _Trace:
+    """
+    The trace, sorted by arrival time and indexed by floor as bitmasks.
+    """
+
+    def __init__(self, passengers: Iterable[Passenger], floor_travel_time: int):
+        ordered = sorted(passengers, key=lambda p: p.arrival_time)
+        self.origins = [p.origin for p in ordered]
+        self.destinations = [p.destination for p in ordered]
+        self.arrivals = [p.arrival_time for p in ordered]
+        self.count = len(ordered)
+        self.everyone = (1 << self.count) - 1
+
+        self.waiting_at: dict[int, int] = dict()
+        self.bound_for: dict[int, int] = dict()
+        for index, passenger in enumerate(ordered):
+            bit = 1 << index
+            self.waiting_at[passenger.origin] = self.waiting_at.get(passenger.origin, 0) | bit
+            self.bound_for[passenger.destination] = (
+                self.bound_for.get(passenger.destination, 0) | bit
+            )
+
+        # finish_after[i] is the earliest time every passenger from i onwards could
+        # possibly be delivered, ignoring where the car is.
+        self.finish_after = [0] * (self.count + 1)
+        for index in range(self.count - 1, -1, -1):
+            ride = abs(self.origins[index] - self.destinations[index]) * floor_travel_time
+            self.finish_after[index] = max(
+                self.finish_after[index + 1],
+                self.arrivals[index] + ride,
+            )
+
+    def released_count(self, now: int) -> int:
+        """
+        Get the number of passengers who have arrived by ``now``.
+        """
+        return bisect_right(self.arrivals, now)
+
+    def relaxed_bound(
+        self,
+        objective: "Objective",
+        start_floor: int,
+        floor_travel_time: int,
+    ) -> int:
+        """
+        A lower bound on the cost of any schedule at all, whoever boards when: each
+        passenger is served as if the car drove straight to them from its starting
+        floor and had nobody else to carry.
+        """
+        if objective == Objective.TOTAL_WAIT:
+            return sum(
+                max(0, abs(start_floor - origin) * floor_travel_time - arrival)
+                for origin, arrival in zip(self.origins, self.arrivals)
+            )
+        return max(
+            (
+                max(arrival, abs(start_floor - origin) * floor_travel_time)
+                + DOOR_CYCLE_TIME
+                + PASSENGER_TRANSFER_TIME
+                + abs(origin - destination) * floor_travel_time
+                for origin, destination, arrival in zip(
+                    self.origins,
+                    self.destinations,
+                    self.arrivals,
+                )
+            ),
+            default=0,
+        )
+
+
+def solve(
+    passengers: Iterable[Passenger],
+    *,
+    objective: Objective = Objective.TOTAL_WAIT,
+    start_floor: int = 1,
+    capacity: Optional[int] = None,
+    floor_travel_time: int = FLOOR_TRAVEL_TIME,
+    node_limit: Optional[int] = 1_000_000,
+    time_limit: Optional[float] = None,
+) -> OfflineSolution:
+    """
+    Search for the schedule that minimises total wait or makespan for a trace.
+
+    The search is a depth-first branch-and-bound over "drive to floor X and stop"
+    decisions. At each stop, riders bound for the floor alight; states are memoised
+    on a compact key of the car's floor and the rider and delivered bitmasks,
+    relative to the first undelivered passenger, and a state is pruned when an
+    earlier visit reached it no later and no more expensively.
+
+    Traces of up to :py:const:`EXHAUSTIVE_PASSENGERS` are searched exhaustively: the
+    car may drive to any rider's destination, any waiting passenger's origin, or the
+    origin of any passenger yet to arrive and wait for them, and each stop branches
+    on which of the waiting passengers board, up to ``capacity``. Every schedule the
+    online controller can produce is in that space, so a finished search is optimal
+    and a cut-off one still proves a lower bound.
+
+    Longer traces are searched heuristically: everyone waiting boards in arrival
+    order until the car is full, and only the next :py:const:`LOOKAHEAD_ARRIVALS`
+    passengers are driven towards. That finds good schedules quickly but can miss
+    the optimum. For makespan the lower bound reported is then the relaxation in
+    which every passenger is served as if they were alone in the building. For total
+    wait that relaxation is close to zero on any busy trace, so no bound is reported
+    at all unless the best schedule meets it.
+
+    The first dive always takes the nearest stop ahead of the car, boarding as many
+    as fit, so a sweep-like schedule is found quickly even for traces of thousands
+    of passengers; the remaining budget is spent improving on it.
+
+    Args:
+        passengers (Iterable[Passenger]) - the recorded trace. It is not modified.
+        objective (Objective, keyword only) - what to minimise.
+        start_floor (int, keyword only) - the car's starting floor. Defaults to 1.
+        capacity (int, keyword only) - the car's capacity, or None for unlimited.
+        floor_travel_time (int, keyword only) - simulated seconds per floor.
+        node_limit (int, keyword only) - stop after expanding this many states. The
+            best schedule so far is still returned, with ``optimal`` set to False.
+        time_limit (float, keyword only) - stop after this many wall-clock seconds.
+
+    Returns:
+        OfflineSolution - the best schedule found and a proven lower bound.
+    """
+    trace = _Trace(passengers, floor_travel_time)
+    origins = trace.origins
+    destinations = trace.destinations
+    arrivals = trace.arrivals
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    exhaustive = trace.count <= EXHAUSTIVE_PASSENGERS
+
+    def bound(now: int, floor_num: int, cost: int, riding: int, done: int) -> int:
+        """
+        A lower bound on the final cost of any schedule extending this state. Only
+        passengers who have already arrived are examined, which keeps the bound
+        proportional to the pending calls rather than to the whole trace.
+        """
+        released = trace.released_count(now)
+        waiting = trace.everyone & ~done & ~riding & ((1 << released) - 1)
+        if objective == Objective.TOTAL_WAIT:
+            extra = 0
+            for index in _bits(waiting):
+                reach = now + abs(floor_num - origins[index]) * floor_travel_time
+                extra += reach - arrivals[index]
+            return cost + extra
+
+        finish = max(cost, trace.finish_after[released])
+        for index in _bits(riding):
+            reach = now + abs(floor_num - destinations[index]) * floor_travel_time
+            finish = max(finish, reach)
+        for index in _bits(waiting):
+            origin = origins[index]
+            reach = now + (
+                abs(floor_num - origin) + abs(origin - destinations[index])
+            ) * floor_travel_time
+            finish = max(finish, reach)
+        return finish
+
+    def boardings(now: int, floor_num: int, riding: int, done: int) -> Iterable[int]:
+        """
+        The sets of passengers that may board at a stop, best guess first: as many as
+        fit in arrival order, then, for an exhaustive search, every other subset.
+        """
+        waiting = (
+            trace.waiting_at.get(floor_num, 0)
+            & ((1 << trace.released_count(now)) - 1)
+            & ~riding
+            & ~done
+        )
+        room = None if capacity is None else capacity - riding.bit_count()
+        first = 0
+        for index in _bits(waiting):
+            if room is not None and first.bit_count() >= room:
+                break
+            first |= 1 << index
+        yield first
+        if exhaustive:
+            for subset in _submasks(waiting, room):
+                if subset != first:
+                    yield subset
+
+    def stop(
+        now: int,
+        floor_num: int,
+        cost: int,
+        riding: int,
+        done: int,
+        alighting: int,
+        boarding: int,
+    ):
+        """
+        Serve a floor at ``now``; returns the state after the doors close.
+        """
+        riding = (riding & ~alighting) | boarding
+        done |= alighting
+        if objective == Objective.MAKESPAN and alighting:
+            cost = max(cost, now)
+        elif objective == Objective.TOTAL_WAIT:
+            for index in _bits(boarding):
+                cost += now - arrivals[index]
+
+        moved = alighting.bit_count() + boarding.bit_count()
+        now += DOOR_CYCLE_TIME + PASSENGER_TRANSFER_TIME * moved
+        return now, cost, riding, done
+
+    best_cost: Optional[int] = None
+    best_stops: list[tuple[int, int]] = list()
+    relaxed = trace.relaxed_bound(objective, start_floor, floor_travel_time)
+    cut_bound: Optional[int] = None
+    seen: dict[tuple[int, int, int, int], tuple[int, int]] = dict()
+    nodes = 0
+
+    # Each stack entry is (now, floor, cost, riding, done, heading, path). The
+    # heading (+1, -1 or 0) only orders the search; the path is a linked list of
+    # (stop, parent) pairs so it is cheap to extend.
+    stack = [(0, start_floor, 0, 0, 0, 0, None)]
+    while stack:
+        if (node_limit is not None and nodes >= node_limit) or (
+            deadline is not None and time.monotonic() >= deadline
+        ):
+            cut_bound = min(bound(*entry[:5]) for entry in stack)
+            break
+
+        now, floor_num, cost, riding, done, heading, path = stack.pop()
+        nodes += 1
+
+        if done == trace.everyone:
+            if best_cost is None or cost < best_cost:
+                best_cost = cost
+                best_stops = list()
+                while path is not None:
+                    best_stops.append(path[0])
+                    path = path[1]
+                best_stops.reverse()
+            continue
+
+        if best_cost is not None and bound(now, floor_num, cost, riding, done) >= best_cost:
+            continue
+
+        base = (~done & (done + 1)).bit_length() - 1
+        key = (floor_num, base, done >> base, riding >> base)
+        previous = seen.get(key)
+        if previous is not None and previous[0] <= now and previous[1] <= cost:
+            continue
+        seen[key] = (now, cost)
+
+        released = trace.released_count(now)
+        waiting = trace.everyone & ~done & ~riding & ((1 << released) - 1)
+        targets: set[tuple[int, int]] = set()
+        for index in _bits(riding):
+            targets.add((destinations[index], now))
+        for index in _bits(waiting):
+            targets.add((origins[index], now))
+        upcoming = trace.count if exhaustive else min(released + LOOKAHEAD_ARRIVALS, trace.count)
+        for index in range(released, upcoming):
+            targets.add((origins[index], arrivals[index]))
+
+        children = list()
+        for target, ready_at in targets:
+            arrive = max(now + abs(target - floor_num) * floor_travel_time, ready_at)
+            alighting = riding & trace.bound_for.get(target, 0)
+            step = (target > floor_num) - (target < floor_num) or heading
+            for boarding in boardings(arrive, target, riding & ~alighting, done | alighting):
+                if not alighting and not boarding:
+                    # A stop where nobody gets on or off is never worth making.
+                    continue
+                after, child_cost, child_riding, child_done = stop(
+                    arrive,
+                    target,
+                    cost,
+                    riding,
+                    done,
+                    alighting,
+                    boarding,
+                )
+                children.append(
+                    (
+                        (heading != 0 and step != heading, arrive, -boarding.bit_count()),
+                        (
+                            after,
+                            target,
+                            child_cost,
+                            child_riding,
+                            child_done,
+                            step,
+                            ((arrive, target), path),
+                        ),
+                    ),
+                )
+
+        # Push the preferred stop last so it is explored first: the nearest stop
+        # that keeps the car heading the same way, as a sweep would, boarding as
+        # many as fit.
+        children.sort(key=lambda child: child[0], reverse=True)
+        stack.extend(child for _, child in children)
+
+    if best_cost is None:
+        raise RuntimeError("search budget exhausted before any schedule was found")
+    if exhaustive:
+        optimal = cut_bound is None
+        lower_bound = best_cost if optimal else max(relaxed, min(cut_bound, best_cost))
+    elif best_cost <= relaxed:
+        optimal, lower_bound = True, best_cost
+    else:
+        optimal = False
+        lower_bound = relaxed if objective == Objective.MAKESPAN else None
+    return OfflineSolution(objective, best_cost, lower_bound, optimal, nodes, best_stops)
+
+
+def schedule_cost(passengers: Iterable[Passenger], objective: Objective) -> int:
+    """
+    Score a schedule that has already been simulated, e.g. by
+    :py:func:`pyelevator.traffic.run_traffic`, with the solver's objective.
+
+    Args:
+        passengers (Iterable[Passenger]) - the simulated passengers.
+        objective (Objective) - the objective to score.
+
+    Returns:
+        int - the total wait or makespan of the schedule.
+
+    Raises:
+        ValueError - raised if some passenger was never delivered.
+    """
+    passengers = list(passengers)
+    if any(p.alight_time is None for p in passengers):
+        raise ValueError("every passenger must be delivered to score a schedule")
+    if objective == Objective.TOTAL_WAIT:
+        return sum(p.wait_time for p in passengers)
+    return max(p.alight_time for p in passengers)
+
+
+def optimality_gap(online_cost: int, solution: OfflineSolution) -> Optional[float]:
+    """
+    Get how far an online schedule is above the solver's lower bound, as a fraction
+    of the online cost.
+
+    Args:
+        online_cost (int) - the online schedule's cost, from :py:func:`schedule_cost`.
+        solution (OfflineSolution) - the solver's result for the same trace.
+
+    Returns:
+        Optional[float] - the gap, from 0 (provably optimal) towards 1, or None if the
+            solver reported no lower bound.
+    """
+    if solution.lower_bound is None:
+        return None
+    if online_cost == 0:
+        return 0.0
+    return max(0.0, (online_cost - solution.lower_bound) / online_cost)
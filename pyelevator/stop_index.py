@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Elevator Exercise in Python
+Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
+"""
+
+
+class StopIndex:
+    """
+    An index of the floors with at least one lit button, kept in a Fenwick (binary
+    indexed) tree so that range counts and the highest/lowest pending floor can be
+    found in O(log n).
+    """
+
+    __slots__ = ("_size", "_tree", "_lit", "_total", "_top_bit")
+
+    def __init__(self, number_of_floors: int):
+        """
+        Create an empty StopIndex.
+
+        Args:
+            number_of_floors (int) - the number of floors to index.
+        """
+        self._size = number_of_floors
+        self._tree = [0] * (number_of_floors + 1)
+        self._lit = [0] * (number_of_floors + 1)
+        self._total = 0
+        self._top_bit = 1 << (number_of_floors.bit_length() - 1)
+
+    @property
+    def total(self) -> int:
+        """
+        Get the number of floors with a pending stop.
+        """
+        return self._total
+
+    def add(self, floor_num: int) -> None:
+        """
+        Record a newly lit button on a floor.
+        """
+        self._lit[floor_num] += 1
+        if self._lit[floor_num] == 1:
+            self._update(floor_num, 1)
+
+    def remove(self, floor_num: int) -> None:
+        """
+        Record a button on a floor going dark.
+        """
+        self._lit[floor_num] -= 1
+        if self._lit[floor_num] == 0:
+            self._update(floor_num, -1)
+
+    def _update(self, floor_num: int, delta: int) -> None:
+        self._total += delta
+        tree = self._tree
+        size = self._size
+        while floor_num <= size:
+            tree[floor_num] += delta
+            floor_num += floor_num & -floor_num
+
+    def _prefix(self, floor_num: int) -> int:
+        tree = self._tree
+        total = 0
+        while floor_num > 0:
+            total += tree[floor_num]
+            floor_num &= floor_num - 1
+        return total
+
+    def count(self, low: int, high: int) -> int:
+        """
+        Count the floors with a pending stop between ``low`` and ``high`` inclusive.
+        """
+        if low < 1:
+            low = 1
+        if high > self._size:
+            high = self._size
+        if high < low:
+            return 0
+        return self._prefix(high) - self._prefix(low - 1)
+
+    def nth(self, rank: int) -> int:
+        """
+        Find the floor holding the ``rank``-th pending stop, counting from the bottom.
+        """
+        tree = self._tree
+        position = 0
+        bit = self._top_bit
+        while bit:
+            step = position + bit
+            if step <= self._size and tree[step] < rank:
+                position = step
+                rank -= tree[step]
+            bit >>= 1
+        return position + 1
+
+    def lowest(self) -> int:
+        """
+        Get the lowest floor with a pending stop, or 0 if there are none.
+        """
+        return self.nth(1) if self._total else 0
+
+    def highest(self) -> int:
+        """
+        Get the highest floor with a pending stop, or 0 if there are none.
+        """
+        return self.nth(self._total) if self._total else 0
+
+    def prefix_counts(self) -> list[int]:
+        """
+        Get the running count of pending floors for every floor, in O(n).
+
+        Returns:
+            list[int] - ``counts[i]`` is the number of pending floors from 1 to ``i``.
+        """
+        counts = [0] * (self._size + 1)
+        running = 0
+        lit = self._lit
+        for floor_num in range(1, self._size + 1):
+            if lit[floor_num]:
+                running += 1
+            counts[floor_num] = running
+        return counts
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+Elevator Exercise in Python
+Tammy Cravit - tammy@tammymakesthings.com - 2023-06-28
+"""
+import math
+from dataclasses import dataclass
+from random import Random
+from typing import Iterable
+from typing import Optional
+
+from .elevator import Elevator
+from .events import Doors
+from .events import Event
+from .events import Stopped
+from .passenger import Passenger
+
+# +: Number of seconds in an hour, used for throughput figures.
+SECONDS_PER_HOUR: int = 3600
+
+
+def up_peak_traffic(
+    number_of_floors: int,
+    passenger_count: int,
+    *,
+    duration: int,
+    seed: Optional[int] = None,
+    lobby: int = 1,
+    interfloor: float = 0.0,
+) -> list[Passenger]:
+    """
+    Generate a morning up-peak workload: passengers arrive at the lobby and travel to a
+    uniformly chosen upper floor, mixed with a fraction of interfloor trips between
+    two random floors.
+
+    Args:
+        number_of_floors (int) - the number of floors in the building.
+        passenger_count (int) - the number of passengers to generate.
+        duration (int, keyword only) - the arrival window, in simulated seconds.
+        seed (int, keyword only) - seed for the random generator, for repeatable runs.
+        lobby (int, keyword only) - the lobby floor. Defaults to 1.
+        interfloor (float, keyword only) - the fraction of passengers making interfloor
+            trips instead of leaving the lobby. Defaults to 0.
+
+    Returns:
+        list[Passenger] - the passengers, ordered by arrival time.
+    """
+    rng = Random(seed)
+    floors = range(1, number_of_floors + 1)
+    upper_floors = [floor for floor in floors if floor != lobby]
+    arrivals = sorted(rng.randrange(duration) for _ in range(passenger_count))
+
+    passengers = list()
+    for arrival in arrivals:
+        if rng.random() < interfloor:
+            origin, destination = rng.sample(upper_floors, 2)
+        else:
+            origin, destination = lobby, rng.choice(upper_floors)
+        passengers.append(Passenger(origin, destination, arrival_time=arrival))
+    return passengers
+
+
+def skewed_traffic(
+    number_of_floors: int,
+    passenger_count: int,
+    *,
+    duration: int,
+    seed: Optional[int] = None,
+    hot_floors: int = 4,
+    hot_fraction: float = 0.9,
+) -> list[Passenger]:
+    """
+    Generate an adversarial workload that keeps the car busy among a few low "hot"
+    floors, while the remaining passengers travel from far floors down to the lobby.
+
+    Args:
+        number_of_floors (int) - the number of floors in the building.
+        passenger_count (int) - the number of passengers to generate.
+        duration (int, keyword only) - the arrival window, in simulated seconds.
+        seed (int, keyword only) - seed for the random generator, for repeatable runs.
+        hot_floors (int, keyword only) - the number of hot floors at the bottom of the
+            building. Defaults to 4.
+        hot_fraction (float, keyword only) - the fraction of passengers travelling
+            between hot floors. Defaults to 0.9.
+
+    Returns:
+        list[Passenger] - the passengers, ordered by arrival time.
+    """
+    rng = Random(seed)
+    hot = range(1, hot_floors + 1)
+    cold = range(hot_floors + 1, number_of_floors + 1)
+    arrivals = sorted(rng.randrange(duration) for _ in range(passenger_count))
+
+    passengers = list()
+    for arrival in arrivals:
+        if rng.random() < hot_fraction:
+            origin, destination = rng.sample(hot, 2)
+        else:
+            origin, destination = rng.choice(cold), 1
+        passengers.append(Passenger(origin, destination, arrival_time=arrival))
+    return passengers
+
+
+@dataclass
+class TrafficReport:
+    """
+    Summary statistics for a simulated workload.
+    """
+
+    passengers: list[Passenger]
+    elapsed_time: int
+    stops_made: int
+    wasted_stops: int
+
+    @property
+    def delivered(self) -> int:
+        """
+        Get the number of passengers who reached their destination.
+        """
+        return sum(1 for p in self.passengers if p.alight_time is not None)
+
+    @property
+    def throughput_per_hour(self) -> float:
+        """
+        Get the number of passengers delivered per simulated hour.
+        """
+        if self.elapsed_time == 0:
+            return 0.0
+        return self.delivered * SECONDS_PER_HOUR / self.elapsed_time
+
+    @property
+    def wait_times(self) -> list[int]:
+        """
+        Get the sorted wait times of every passenger who boarded.
+        """
+        return sorted(p.wait_time for p in self.passengers if p.wait_time is not None)
+
+    @property
+    def mean_wait(self) -> float:
+        """
+        Get the mean wait time, in simulated seconds.
+        """
+        waits = self.wait_times
+        return sum(waits) / len(waits) if waits else 0.0
+
+    @property
+    def max_wait(self) -> int:
+        """
+        Get the longest wait time, in simulated seconds.
+        """
+        waits = self.wait_times
+        return waits[-1] if waits else 0
+
+    def wait_percentile(self, percentile: float) -> int:
+        """
+        Get a nearest-rank percentile of the wait times.
+
+        Args:
+            percentile (float) - the percentile to compute, from 0 to 100.
+
+        Returns:
+            int - the wait time at that percentile, in simulated seconds.
+        """
+        waits = self.wait_times
+        if not waits:
+            return 0
+        rank = max(1, math.ceil(percentile / 100 * len(waits)))
+        return waits[rank - 1]
+
+
+class TripRecorder:
+    """
+    An event listener that splits an Elevator's work into trips. A trip starts at
+    the stop where an empty car takes on passengers and ends at the stop where it is
+    empty again; the round-trip time is the time from one trip's start to the next.
+
+    Attach it before running the traffic::
+
+        recorder = TripRecorder(elevator)
+        run_traffic(elevator, passengers)
+        print(recorder.mean_stops_per_trip, recorder.mean_round_trip_time)
+    """
+
+    trips: list[tuple[int, int, int]]
+
+    def __init__(self, elevator: Elevator):
+        """
+        Create a TripRecorder and start listening to an Elevator.
+
+        Args:
+            elevator (Elevator) - the Elevator to record.
+        """
+        self.trips = list()
+        self._elevator = elevator
+        self._stop_time = 0
+        self._trip_start: Optional[int] = None
+        self._trip_stops = 0
+        elevator.add_listener(self._on_event)
+
+    def _on_event(self, event: Event) -> None:
+        if type(event) is Stopped:
+            self._stop_time = event.time
+            if self._trip_start is not None:
+                self._trip_stops += 1
+        elif type(event) is Doors and not event.is_open:
+            load = self._elevator.load
+            if self._trip_start is None:
+                if load:
+                    self._trip_start = self._stop_time
+                    self._trip_stops = 1
+            elif load == 0:
+                self.trips.append((self._trip_start, event.time, self._trip_stops))
+                self._trip_start = None
+
+    @property
+    def stops_per_trip(self) -> list[int]:
+        """
+        Get the number of stops made on each completed trip, including the first.
+        """
+        return [stops for _, _, stops in self.trips]
+
+    @property
+    def round_trip_times(self) -> list[int]:
+        """
+        Get the time from the start of each completed trip to the start of the next.
+        """
+        return [
+            following[0] - trip[0] for trip, following in zip(self.trips, self.trips[1:])
+        ]
+
+    @property
+    def mean_stops_per_trip(self) -> float:
+        """
+        Get the mean number of stops per completed trip.
+        """
+        stops = self.stops_per_trip
+        return sum(stops) / len(stops) if stops else 0.0
+
+    @property
+    def mean_round_trip_time(self) -> float:
+        """
+        Get the mean round-trip time, in simulated seconds.
+        """
+        times = self.round_trip_times
+        return sum(times) / len(times) if times else 0.0
+
+
+def run_traffic(
+    elevator: Elevator,
+    passengers: Iterable[Passenger],
+    *,
+    time_limit: Optional[int] = None,
+) -> TrafficReport:
+    """
+    Drive an Elevator through a workload, releasing each passenger at their arrival
+    time and running until everyone is delivered.
+
+    Args:
+        elevator (Elevator) - the Elevator to drive. It should be created with
+            ``enable_sleep=False``.
+        passengers (Iterable[Passenger]) - the workload to run.
+        time_limit (int, keyword only) - stop after this much simulated time, even if
+            some passengers are still waiting.
+
+    Returns:
+        TrafficReport - the statistics for the run.
+    """
+    arrivals = sorted(passengers, key=lambda p: p.arrival_time)
+    next_arrival = 0
+
+    while time_limit is None or elevator.elapsed_time < time_limit:
+        while (
+            next_arrival < len(arrivals)
+            and arrivals[next_arrival].arrival_time <= elevator.elapsed_time
+        ):
+            elevator.add_passenger(arrivals[next_arrival])
+            next_arrival += 1
+
+        if elevator.simulation_can_move():
+            elevator.simulation_move_one_step()
+        elif next_arrival < len(arrivals):
+            elevator.elapsed_time = arrivals[next_arrival].arrival_time
+        else:
+            break
+
+    return TrafficReport(
+        passengers=arrivals,
+        elapsed_time=elevator.elapsed_time,
+        stops_made=elevator.stops_made,
+        wasted_stops=elevator.wasted_stops,
+    )
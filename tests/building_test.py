@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for `pyelevator` package."""
+import pytest
+
+from pyelevator.building import Bank
+from pyelevator.building import Building
+from pyelevator.building import Zone
+from pyelevator.passenger import Passenger
+
+
+class TestBuilding:
+    @pytest.fixture()
+    def building(self):
+        return Building.zoned(300, zone_size=50, cars_per_zone=2, capacity=10)
+
+    def test_supports_more_than_one_hundred_floors(self, building):
+        assert building.number_of_floors == 300
+        assert len(building.zones) == 6
+        assert building.zone_for_floor(151).lobby == 151
+        assert building.zone_for_floor(300).lobby == 251
+
+    def test_rejects_invalid_zone_sizes(self):
+        for zone_size in (1, 101):
+            with pytest.raises(ValueError):
+                Building.zoned(300, zone_size=zone_size)
+
+    def test_one_floor_remainder_joins_the_zone_below(self):
+        building = Building.zoned(21, zone_size=10)
+        assert [(zone.low, zone.high) for zone in building.zones] == [(1, 10), (11, 21)]
+
+    def test_one_floor_remainder_borrows_from_a_full_zone(self):
+        building = Building.zoned(201, zone_size=100)
+        assert [(zone.low, zone.high) for zone in building.zones] == [
+            (1, 100),
+            (101, 199),
+            (200, 201),
+        ]
+        assert building.number_of_floors == 201
+
+    def test_rejects_floors_outside_the_building(self, building):
+        with pytest.raises(ValueError):
+            building.zone_for_floor(301)
+
+    def test_routes_within_a_zone_use_the_local_bank(self, building):
+        legs = building.route(120, 140)
+        assert [(origin, destination) for _, origin, destination in legs] == [
+            (120, 140),
+        ]
+
+    def test_routes_between_sky_zones_transfer_at_lobbies(self, building):
+        legs = building.route(120, 280)
+        assert [(origin, destination) for _, origin, destination in legs] == [
+            (120, 101),
+            (101, 1),
+            (1, 251),
+            (251, 280),
+        ]
+
+    def test_sky_zones_need_a_shuttle(self):
+        ground = Zone(Bank("low", range(1, 11)))
+        sky = Zone(Bank("high", range(11, 21)))
+        with pytest.raises(ValueError):
+            Building([ground, sky])
+
+    def test_run_delivers_every_journey(self, building):
+        journeys = [
+            Passenger(1, 275, arrival_time=0),
+            Passenger(180, 20, arrival_time=5),
+            Passenger(260, 270, arrival_time=10),
+        ]
+        report = building.run(journeys)
+        assert all(j.alight_time is not None for j in journeys)
+        assert journeys[0].journey_time >= journeys[0].wait_time
+        assert sum(legs for _, legs, *_ in report.zone_summary()) == 2 + 3 + 1
+
+    def test_idle_cars_are_never_stepped(self, building):
+        report = building.run([Passenger(2, 3)])
+        assert report.car_steps < 10
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for `pyelevator` package."""
+import pytest
+
+from pyelevator.call import CallType
+from pyelevator.direction import Direction
+from pyelevator.elevator import Elevator
+from pyelevator.passenger import Passenger
+from pyelevator.traffic import run_traffic
+from pyelevator.traffic import skewed_traffic
+from pyelevator.traffic import up_peak_traffic
+
+
+class TestCallTimestamps:
+    @pytest.fixture()
+    def elevator(self):
+        return Elevator(10, enable_sleep=False)
+
+    def test_press_records_registration_time(self, elevator):
+        elevator.elapsed_time = 30
+        elevator.press_up(4)
+        assert elevator.call_registered_at(CallType.UP, 4) == 30
+        assert elevator.call_registered_at(CallType.DOWN, 4) is None
+
+    def test_repeated_press_keeps_original_time(self, elevator):
+        elevator.press_car(6)
+        elevator.elapsed_time = 50
+        elevator.press_car(6)
+        assert elevator.call_registered_at(CallType.CAR, 6) == 0
+
+    def test_oldest_pending_call_skips_cleared_calls(self, elevator):
+        elevator.press_down(9)
+        elevator.elapsed_time = 10
+        elevator.press_up(3)
+        elevator.clear_down(9)
+        oldest = elevator.oldest_pending_call()
+        assert (oldest.registered_at, oldest.call_type, oldest.floor) == (
+            10,
+            CallType.UP,
+            3,
+        )
+
+        elevator.clear_up(3)
+        assert elevator.oldest_pending_call() is None
+
+    def test_heap_stays_bounded_under_press_clear_churn(self, elevator):
+        for _ in range(1000):
+            elevator.press_up(5)
+            elevator.clear_up(5)
+        assert len(elevator._call_heap) < 50
+
+
+class TestAgeAwareScheduling:
+    def test_rejects_negative_wait_target(self):
+        with pytest.raises(ValueError):
+            Elevator(10, wait_target=-1)
+
+    def test_young_calls_follow_the_sweep(self):
+        elevator = Elevator(10, current_floor=5, enable_sleep=False, wait_target=500)
+        elevator.press_down(2)
+        assert elevator.urgent_call() is None
+
+    def test_aged_call_turns_the_car_around(self):
+        elevator = Elevator(
+            10,
+            current_floor=5,
+            direction=Direction.UP,
+            enable_sleep=False,
+            wait_target=30,
+        )
+        elevator.press_down(2)
+        elevator.elapsed_time = 10
+        elevator.press_car(9)
+        assert elevator.urgent_call().floor == 2
+
+        elevator.simulation_move_one_step()
+        assert elevator.floor == 4
+        assert elevator.direction == Direction.DOWN
+
+    def test_late_call_does_not_turn_the_car_around(self):
+        elevator = Elevator(
+            10,
+            current_floor=5,
+            direction=Direction.UP,
+            enable_sleep=False,
+            wait_target=30,
+        )
+        elevator.press_down(2)
+        elevator.elapsed_time = 40
+        elevator.press_car(9)
+        assert elevator.urgent_call().floor == 2
+
+        elevator.simulation_move_one_step()
+        assert elevator.floor == 6
+        assert elevator.direction == Direction.UP
+
+    @pytest.mark.parametrize("seed", range(1, 9))
+    def test_max_wait_meets_target_below_saturation(self, seed):
+        # An uncapped car keeps up with this traffic, and the plain sweep already
+        # serves every call within one round trip; chasing aged calls must not undo
+        # that.
+        trace = skewed_traffic(30, 500, duration=3600, seed=seed)
+        elevator = Elevator(30, enable_sleep=False, wait_target=250)
+        report = run_traffic(elevator, trace)
+        assert report.delivered == 500
+        assert report.max_wait <= 250
+
+    @pytest.mark.parametrize("full_car_bypass", [True, False])
+    def test_full_car_has_no_urgent_call(self, full_car_bypass):
+        elevator = Elevator(
+            10,
+            capacity=1,
+            full_car_bypass=full_car_bypass,
+            enable_sleep=False,
+            wait_target=0,
+        )
+        elevator.add_passenger(Passenger(1, 9))
+        elevator.add_passenger(Passenger(1, 5))
+        elevator.simulation_move_one_step()
+        assert elevator.is_full
+        assert elevator.urgent_call() is None
+
+    def test_full_car_without_bypass_delivers_everyone(self):
+        trace = up_peak_traffic(20, 300, duration=3600, seed=1)
+        elevator = Elevator(
+            20,
+            capacity=4,
+            full_car_bypass=False,
+            enable_sleep=False,
+            wait_target=120,
+        )
+        assert run_traffic(elevator, trace).delivered == 300
+
+        trace = up_peak_traffic(10, 30, duration=300, seed=1)
+        elevator = Elevator(
+            10,
+            capacity=1,
+            full_car_bypass=False,
+            enable_sleep=False,
+            wait_target=0,
+        )
+        assert run_traffic(elevator, trace).delivered == 30
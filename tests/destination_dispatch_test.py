@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for `pyelevator` package."""
+import copy
+
+import pytest
+
+from pyelevator.destination_dispatch import DestinationDispatchElevator
+from pyelevator.elevator import Elevator
+from pyelevator.passenger import Passenger
+from pyelevator.traffic import run_traffic
+from pyelevator.traffic import TripRecorder
+from pyelevator.traffic import up_peak_traffic
+
+
+class TestDestinationDispatchElevator:
+    def test_rejects_negative_spread(self):
+        with pytest.raises(ValueError):
+            DestinationDispatchElevator(10, group_spread=-1)
+
+    def test_kiosk_entry_does_not_press_a_hall_button(self):
+        elevator = DestinationDispatchElevator(10, enable_sleep=False)
+        elevator.add_passenger(Passenger(3, 8))
+        assert not any(elevator.up_buttons)
+        assert elevator.waiting_at_kiosk == 1
+        assert elevator.simulation_can_move()
+
+    def test_rejects_invalid_floors(self):
+        elevator = DestinationDispatchElevator(10, enable_sleep=False)
+        with pytest.raises(ValueError):
+            elevator.add_passenger(Passenger(1, 11))
+
+    def test_groups_same_and_nearby_destinations(self):
+        elevator = DestinationDispatchElevator(20, group_spread=1, enable_sleep=False)
+        for destination in (10, 11, 9, 15, 10):
+            elevator.add_passenger(Passenger(1, destination))
+        assert elevator._group_sequence == 2
+
+    def test_full_group_closes(self):
+        elevator = DestinationDispatchElevator(20, capacity=2, enable_sleep=False)
+        for _ in range(5):
+            elevator.add_passenger(Passenger(1, 10))
+        assert elevator._group_sequence == 3
+
+    def test_trip_carries_the_nearest_groups_that_fit(self):
+        elevator = DestinationDispatchElevator(20, capacity=4, enable_sleep=False)
+        passengers = [Passenger(1, floor_num) for floor_num in (10, 2, 11, 18, 9, 10)]
+        for passenger in passengers:
+            elevator.add_passenger(passenger)
+        run_traffic(elevator, [])
+        first_trip = sorted(p.destination for p in passengers if p.board_time == 0)
+        assert first_trip == [9, 10, 10, 11]
+        assert all(p.alight_time is not None for p in passengers)
+        assert elevator.trips_dispatched == 2
+
+    def test_oldest_group_is_dispatched_first(self):
+        elevator = DestinationDispatchElevator(10, capacity=1, enable_sleep=False)
+        late = Passenger(1, 4, arrival_time=5)
+        early = Passenger(1, 9, arrival_time=0)
+        elevator.add_passenger(late)
+        elevator.add_passenger(early)
+        run_traffic(elevator, [])
+        assert early.board_time < late.board_time
+
+    def test_fewer_stops_per_trip_than_hall_buttons(self):
+        trace = up_peak_traffic(16, 600, duration=3600, seed=7)
+        results = list()
+        for car_class in (Elevator, DestinationDispatchElevator):
+            elevator = car_class(16, capacity=12, enable_sleep=False)
+            recorder = TripRecorder(elevator)
+            report = run_traffic(elevator, copy.deepcopy(trace))
+            assert report.delivered == len(trace)
+            results.append(recorder)
+        conventional, destination = results
+        assert destination.mean_stops_per_trip < conventional.mean_stops_per_trip
+        assert destination.mean_round_trip_time < conventional.mean_round_trip_time
+
+
+class TestTripRecorder:
+    def test_records_a_trip(self):
+        elevator = Elevator(10, enable_sleep=False)
+        recorder = TripRecorder(elevator)
+        run_traffic(elevator, [Passenger(1, 5), Passenger(1, 8), Passenger(4, 2, 40)])
+        assert recorder.stops_per_trip == [3, 2]
+        assert len(recorder.round_trip_times) == 1
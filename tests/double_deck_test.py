@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for `pyelevator` package."""
+import copy
+import random
+
+import pytest
+
+from pyelevator.double_deck import DoubleDeckElevator
+from pyelevator.double_deck import LOWER_DECK
+from pyelevator.double_deck import UPPER_DECK
+from pyelevator.elevator import Elevator
+from pyelevator.passenger import Passenger
+from pyelevator.traffic import run_traffic
+from pyelevator.traffic import up_peak_traffic
+
+
+def run_until_idle(elevator, max_steps=1000):
+    for _ in range(max_steps):
+        if not elevator.simulation_can_move():
+            return
+        elevator.simulation_move_one_step()
+    raise AssertionError("simulation did not settle")
+
+
+def run_trace(elevator, trace, max_steps=20_000):
+    trace = sorted(trace, key=lambda passenger: passenger.arrival_time)
+    for _ in range(max_steps):
+        while trace and trace[0].arrival_time <= elevator.elapsed_time:
+            elevator.add_passenger(trace.pop(0))
+        if elevator.simulation_can_move():
+            elevator.simulation_move_one_step()
+        elif trace:
+            elevator.elapsed_time = trace[0].arrival_time
+        else:
+            return
+    raise AssertionError("simulation did not settle")
+
+
+class TestDoubleDeckElevator:
+    def test_rejects_floors_without_a_pair(self):
+        with pytest.raises(ValueError):
+            DoubleDeckElevator(11)
+        with pytest.raises(ValueError):
+            DoubleDeckElevator(12, current_floor=2)
+
+    def test_one_stop_serves_both_floors_of_a_pair(self):
+        elevator = DoubleDeckElevator(12, enable_sleep=False)
+        elevator.press_car(5, 6)
+        assert elevator.stops_needed_above_current_floor() == [5]
+        run_until_idle(elevator)
+        assert elevator.floor == 5
+        assert elevator.stops_made == 1
+        assert not any(elevator.car_buttons)
+
+    def test_each_deck_has_its_own_car_buttons(self):
+        elevator = DoubleDeckElevator(12, enable_sleep=False)
+        elevator.press_car(3, 8, 10)
+        assert elevator.deck_car_buttons(LOWER_DECK) == [3]
+        assert elevator.deck_car_buttons(UPPER_DECK) == [8, 10]
+
+    def test_lobby_loading_is_split_between_decks(self):
+        elevator = DoubleDeckElevator(12, capacity=4, enable_sleep=False)
+        odd, even = Passenger(1, 7), Passenger(1, 10)
+        elevator.add_passenger(odd)
+        elevator.add_passenger(even)
+        assert elevator.up_buttons[1] and elevator.up_buttons[2]
+        elevator.simulation_move_one_step()
+        assert elevator.deck_load(LOWER_DECK) == 1
+        assert elevator.deck_load(UPPER_DECK) == 1
+        run_until_idle(elevator)
+        assert odd.alight_time is not None and even.alight_time is not None
+        assert elevator.stops_made == 3
+
+    def test_other_parity_destination_alights_at_the_same_stop(self):
+        elevator = DoubleDeckElevator(12, current_floor=5, enable_sleep=False)
+        passenger = Passenger(5, 10)
+        elevator.add_passenger(passenger)
+        run_until_idle(elevator)
+        assert elevator.floor == 9
+        assert passenger.alight_time is not None
+
+    def test_full_deck_bypasses_only_its_own_hall_calls(self):
+        elevator = DoubleDeckElevator(12, capacity=1, enable_sleep=False)
+        elevator.add_passenger(Passenger(1, 11))
+        elevator.simulation_move_one_step()
+        assert elevator.deck_load(LOWER_DECK) == 1
+        assert not elevator.is_full
+        elevator.add_passenger(Passenger(5, 9))
+        elevator.add_passenger(Passenger(6, 10))
+        assert not elevator.call_pending_on_floor(5)
+        assert elevator.call_pending_on_floor(6)
+
+    def test_full_deck_hall_call_is_never_urgent(self):
+        elevator = DoubleDeckElevator(
+            8,
+            current_floor=5,
+            capacity=1,
+            enable_sleep=False,
+            wait_target=0,
+        )
+        elevator.press_down(7)
+        elevator.elapsed_time = 1
+        elevator.add_passenger(Passenger(5, 1))
+        elevator.serve_current_floor_if_needed()
+        assert elevator.deck_load(LOWER_DECK) == 1
+        assert not elevator.is_full
+        assert elevator.urgent_call() is None
+
+    def test_wait_target_delivers_everyone(self):
+        rng = random.Random(3)
+        for _ in range(100):
+            trace = list()
+            for _ in range(rng.randint(1, 25)):
+                origin = rng.randint(1, 8)
+                destination = rng.choice([f for f in range(1, 9) if f != origin])
+                trace.append(Passenger(origin, destination, rng.randint(0, 200)))
+            elevator = DoubleDeckElevator(
+                8,
+                current_floor=rng.randrange(1, 8, 2),
+                capacity=rng.choice([1, 2]),
+                full_car_bypass=rng.random() < 0.5,
+                enable_sleep=False,
+                wait_target=rng.choice([0, 30, 60]),
+            )
+            run_trace(elevator, trace)
+            assert all(passenger.alight_time is not None for passenger in trace)
+
+    def test_same_stop_trips_walk(self):
+        elevator = DoubleDeckElevator(12, enable_sleep=False)
+        passenger = Passenger(1, 2, arrival_time=7)
+        elevator.add_passenger(passenger)
+        assert not elevator.simulation_can_move()
+        assert passenger.journey_time == 0
+
+    def test_handles_more_traffic_than_a_single_deck(self):
+        trace = up_peak_traffic(20, 600, duration=1200, seed=7)
+        single = run_traffic(
+            Elevator(20, capacity=12, enable_sleep=False),
+            copy.deepcopy(trace),
+        )
+        double = run_traffic(
+            DoubleDeckElevator(20, capacity=12, enable_sleep=False),
+            copy.deepcopy(trace),
+        )
+        assert double.delivered == single.delivered == 600
+        assert double.elapsed_time < single.elapsed_time
+        assert double.stops_made < single.stops_made
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for `pyelevator` package."""
+import pytest
+
+from pyelevator.direction import Direction
+from pyelevator.elevator import Elevator
+from pyelevator.passenger import Passenger
+from pyelevator.traffic import run_traffic
+from pyelevator.traffic import up_peak_traffic
+
+
+def run_until_idle(elevator, max_steps=1000):
+    for _ in range(max_steps):
+        if not elevator.simulation_can_move():
+            return
+        elevator.simulation_move_one_step()
+    raise AssertionError("simulation did not settle")
+
+
+class TestElevatorScheduling:
+    def test_serves_call_below_the_car(self):
+        elevator = Elevator(10, current_floor=5, enable_sleep=False)
+        elevator.press_up(3)
+        run_until_idle(elevator)
+        assert elevator.floor == 3
+        assert not elevator.up_buttons[3]
+
+    def test_serves_call_on_the_current_floor(self):
+        elevator = Elevator(10, current_floor=4, enable_sleep=False)
+        elevator.press_down(4)
+        run_until_idle(elevator)
+        assert elevator.floor == 4
+        assert elevator.stops_made == 1
+
+    def test_turns_around_for_down_call_at_end_of_sweep(self):
+        elevator = Elevator(10, enable_sleep=False)
+        elevator.press_down(7)
+        run_until_idle(elevator)
+        assert elevator.floor == 7
+        assert not elevator.down_buttons[7]
+
+    def test_stop_scans_exclude_current_floor(self):
+        elevator = Elevator(10, current_floor=5, enable_sleep=False)
+        elevator.press_car(2, 5, 8)
+        assert elevator.stops_needed_above_current_floor() == [8]
+        assert elevator.stops_needed_below_current_floor() == [2]
+
+
+class TestElevatorCapacity:
+    def test_rejects_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            Elevator(10, capacity=0)
+
+    def test_boarding_and_alighting_change_load(self):
+        elevator = Elevator(10, capacity=4, enable_sleep=False)
+        elevator.add_passenger(Passenger(1, 5))
+        elevator.add_passenger(Passenger(1, 8))
+        elevator.simulation_move_one_step()
+        assert elevator.load == 2
+        assert elevator.car_buttons[5] and elevator.car_buttons[8]
+
+        run_until_idle(elevator)
+        assert elevator.load == 0
+        assert elevator.passengers_delivered == 2
+
+    def test_full_car_bypasses_hall_calls(self):
+        elevator = Elevator(10, capacity=1, enable_sleep=False)
+        elevator.add_passenger(Passenger(1, 8))
+        elevator.simulation_move_one_step()
+        assert elevator.is_full
+
+        waiting = Passenger(4, 9)
+        elevator.add_passenger(waiting)
+        assert not elevator.stop_needed_on_floor(4)
+        assert elevator.stops_needed_above_current_floor() == [8]
+
+        while elevator.floor < 8:
+            elevator.simulation_move_one_step()
+        assert waiting.board_time is None
+        assert elevator.up_buttons[4]
+
+        run_until_idle(elevator)
+        assert waiting.alight_time is not None
+        assert elevator.wasted_stops == 0
+
+    def test_left_behind_passengers_keep_hall_call_pending(self):
+        elevator = Elevator(10, capacity=1, enable_sleep=False)
+        elevator.add_passenger(Passenger(1, 3))
+        elevator.add_passenger(Passenger(1, 6))
+        elevator.simulation_move_one_step()
+        assert elevator.load == 1
+        assert elevator.up_buttons[1]
+
+        run_until_idle(elevator)
+        assert elevator.passengers_delivered == 2
+
+    def test_full_car_without_bypass_makes_wasted_stop(self):
+        elevator = Elevator(
+            10,
+            capacity=1,
+            full_car_bypass=False,
+            enable_sleep=False,
+        )
+        elevator.add_passenger(Passenger(1, 8))
+        elevator.simulation_move_one_step()
+        elevator.add_passenger(Passenger(4, 9))
+        run_until_idle(elevator)
+        assert elevator.wasted_stops == 1
+        assert elevator.passengers_delivered == 2
+
+
+class TestTrafficReport:
+    def test_up_peak_traffic_is_repeatable(self):
+        first = up_peak_traffic(12, 50, duration=600, seed=7)
+        second = up_peak_traffic(12, 50, duration=600, seed=7)
+        assert first == second
+        assert all(p.origin == 1 for p in first)
+
+    def test_run_traffic_delivers_everyone(self):
+        passengers = up_peak_traffic(12, 50, duration=600, seed=7, interfloor=0.2)
+        elevator = Elevator(12, capacity=8, enable_sleep=False)
+        report = run_traffic(elevator, passengers)
+        assert report.delivered == 50
+        assert report.throughput_per_hour > 0
+        assert report.wait_percentile(100) == report.max_wait
+        assert elevator.direction == Direction.STOPPED
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for `pyelevator` package."""
+from random import Random
+
+import pytest
+
+from pyelevator.call import CallType
+from pyelevator.direction import Direction
+from pyelevator.elevator import Elevator
+from pyelevator.events import CallServed, Moved, Stopped
+from pyelevator.stop_index import StopIndex
+
+
+class TestStopIndex:
+    def test_matches_brute_force(self):
+        rng = Random(5)
+        index = StopIndex(37)
+        lit = [0] * 38
+        for _ in range(500):
+            floor_num = rng.randint(1, 37)
+            if lit[floor_num] and rng.random() < 0.5:
+                index.remove(floor_num)
+                lit[floor_num] -= 1
+            else:
+                index.add(floor_num)
+                lit[floor_num] += 1
+
+            pending = [f for f in range(1, 38) if lit[f]]
+            low, high = sorted(rng.sample(range(0, 39), 2))
+            assert index.count(low, high) == sum(1 for f in pending if low <= f <= high)
+            assert index.lowest() == (pending[0] if pending else 0)
+            assert index.highest() == (pending[-1] if pending else 0)
+
+
+class TestElevatorETA:
+    @pytest.fixture()
+    def elevator(self):
+        return Elevator(12, current_floor=6, enable_sleep=False)
+
+    def test_rejects_invalid_floor(self, elevator):
+        with pytest.raises(ValueError):
+            elevator.eta(13)
+
+    def test_idle_car_travels_directly(self, elevator):
+        assert elevator.eta(10) == 4 * 2
+        assert elevator.eta(6) == 0
+
+    def test_counts_intermediate_stops(self, elevator):
+        elevator.press_car(8, 11)
+        elevator.simulation_move_one_step()
+        assert elevator.direction == Direction.UP
+        assert elevator.eta(12) == 5 * 2 + 2 * 4
+
+    def test_down_call_above_waits_for_the_turn(self, elevator):
+        elevator.press_car(9)
+        elevator.simulation_move_one_step()
+        assert elevator.eta(8, Direction.DOWN) == (2 + 1) * 2 + 1 * 4
+        assert elevator.eta(8, Direction.UP) == 1 * 2
+
+    def test_up_call_below_needs_a_full_cycle(self, elevator):
+        elevator.press_car(9)
+        elevator.press_down(2)
+        elevator.simulation_move_one_step()
+        assert elevator.eta(4, Direction.UP) == (2 + 7 + 2) * 2 + 2 * 4
+
+    def test_eta_matches_simulated_arrival(self, elevator):
+        elevator.press_car(9, 3)
+        elevator.press_down(11)
+        elevator.simulation_move_one_step()
+        expected = elevator.eta(4, Direction.DOWN)
+        start = elevator.elapsed_time
+        for event in elevator.run(0):
+            if isinstance(event, Moved) and event.to_floor == 4:
+                assert event.time - start == expected
+                break
+
+    def test_skips_opposite_direction_hall_calls(self):
+        elevator = Elevator(12, current_floor=1, enable_sleep=False)
+        elevator.press_car(10)
+        elevator.simulation_move_one_step()
+        elevator.press_down(5)
+        assert elevator.floor == 2 and elevator.direction == Direction.UP
+        assert elevator.eta(10) == 8 * 2
+        assert elevator.eta(5, Direction.DOWN) == (8 + 5) * 2 + 1 * 4
+
+    def test_stopped_car_goes_up_first(self):
+        elevator = Elevator(12, current_floor=2, enable_sleep=False)
+        elevator.press_car(1, 5, 12)
+        assert elevator.direction == Direction.STOPPED
+        assert elevator.eta(1) == (10 + 11) * 2 + 2 * 4
+
+    def test_eta_matches_simulated_arrival_for_random_car_calls(self):
+        rng = Random(11)
+        for _ in range(200):
+            elevator = Elevator(12, current_floor=rng.randint(1, 12), enable_sleep=False)
+            elevator.press_car(*rng.sample(range(1, 13), rng.randint(1, 5)))
+            for _ in range(rng.randint(0, 4)):
+                elevator.simulation_move_one_step()
+            pending = [f for f in range(1, 13) if elevator.car_buttons[f]]
+            if not pending:
+                continue
+
+            target = rng.choice(pending)
+            expected = elevator.eta(target)
+            start = elevator.elapsed_time
+            arrived = start if target == elevator.floor else None
+            for event in elevator.run(0):
+                if arrived is None and isinstance(event, Moved) and event.to_floor == target:
+                    arrived = event.time
+            assert arrived - start == expected
+
+    def test_eta_matches_simulated_arrival_with_hall_calls(self):
+        rng = Random(13)
+        for _ in range(300):
+            elevator = Elevator(12, current_floor=rng.randint(1, 12), enable_sleep=False)
+            elevator.press_car(*rng.sample(range(1, 13), rng.randint(0, 4)))
+            elevator.press_up(*rng.sample(range(1, 12), rng.randint(0, 3)))
+            elevator.press_down(*rng.sample(range(2, 13), rng.randint(0, 3)))
+            for _ in range(rng.randint(0, 4)):
+                elevator.simulation_move_one_step()
+            lit = {
+                Direction.UP: [f for f in range(1, 13) if elevator.up_buttons[f]],
+                Direction.DOWN: [f for f in range(1, 13) if elevator.down_buttons[f]],
+            }
+            direction = rng.choice([d for d in lit if lit[d]] or [None])
+            if direction is None:
+                continue
+
+            # A hall call is answered when the doors open for it, so measure to the
+            # stop that serves it rather than to the first pass over the floor.
+            target = rng.choice(lit[direction])
+            call_type = CallType.UP if direction == Direction.UP else CallType.DOWN
+            expected = elevator.eta(target, direction)
+            assert elevator.eta_all(direction)[target] == expected
+            start = elevator.elapsed_time
+            stopped_at = answered = None
+            for event in elevator.run(0):
+                if isinstance(event, Stopped):
+                    stopped_at = event.time
+                elif (
+                    answered is None
+                    and isinstance(event, CallServed)
+                    and (event.call_type, event.floor) == (call_type, target)
+                ):
+                    answered = stopped_at
+            assert answered - start == expected
+
+    def test_batch_matches_single_queries(self, elevator):
+        elevator.press_car(9, 2)
+        elevator.press_up(4)
+        elevator.press_down(11)
+        elevator.simulation_move_one_step()
+        for direction in (None, Direction.UP, Direction.DOWN):
+            batch = elevator.eta_all(direction)
+            assert batch[1:] == [elevator.eta(f, direction) for f in range(1, 13)]
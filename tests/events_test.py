@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for `pyelevator` package."""
+import asyncio
+
+import pytest
+
+from pyelevator.call import CallType
+from pyelevator.direction import Direction
+from pyelevator.elevator import Elevator
+from pyelevator.events import CallRegistered
+from pyelevator.events import CallServed
+from pyelevator.events import DirectionChanged
+from pyelevator.events import Doors
+from pyelevator.events import Idle
+from pyelevator.events import Moved
+from pyelevator.events import Stopped
+
+
+class TestElevatorEvents:
+    @pytest.fixture()
+    def elevator(self):
+        elevator = Elevator(6, enable_sleep=False)
+        elevator.press_car(3)
+        return elevator
+
+    def test_run_streams_a_full_trip(self, elevator):
+        events = list(elevator.run(2))
+        kinds = [type(event) for event in events]
+        assert kinds == [
+            DirectionChanged,
+            Moved,
+            Moved,
+            Stopped,
+            CallServed,
+            Doors,
+            Doors,
+            DirectionChanged,
+            Idle,
+            Idle,
+            Idle,
+        ]
+        assert events[2] == Moved(4, 2, 3)
+        assert events[4].call_type == CallType.CAR
+        assert events[-4].new_direction == Direction.STOPPED
+
+    def test_run_is_lazy(self, elevator):
+        stream = elevator.run(100)
+        assert next(stream) == DirectionChanged(0, Direction.STOPPED, Direction.UP)
+        assert elevator.floor == 2
+        assert next(stream) == Moved(2, 1, 2)
+        assert elevator.floor == 2
+        stream.close()
+        assert elevator._listeners == []
+
+    def test_consumer_can_stop_the_simulation(self, elevator):
+        for event in elevator.run(100):
+            if isinstance(event, Moved):
+                break
+        assert elevator.floor == 2
+        assert elevator.car_buttons[3]
+
+    def test_call_registered_events_reach_listeners(self, elevator):
+        seen = list()
+        elevator.add_listener(seen.append)
+        elevator.press_up(5)
+        elevator.press_up(5)
+        elevator.remove_listener(seen.append)
+        elevator.press_down(6)
+        assert seen == [CallRegistered(0, CallType.UP, 5)]
+
+    def test_events_have_no_instance_dict(self):
+        assert not hasattr(Moved(0, 1, 2), "__dict__")
+
+    def test_run_async_matches_run(self, elevator):
+        async def collect():
+            return [event async for event in elevator.run_async(2)]
+
+        other = Elevator(6, enable_sleep=False)
+        other.press_car(3)
+        assert asyncio.run(collect()) == list(other.run(2))
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for `pyelevator` package."""
+import pytest
+
+from pyelevator import explorer
+from pyelevator.call import CallType
+from pyelevator.direction import Direction
+from pyelevator.explorer import explore
+
+
+class TestStateSpaceExplorer:
+    def test_two_floor_building(self):
+        report = explore(2, door_holding=False)
+        assert not report.door_holding
+        assert report.states == 119
+        assert report.livelock is None and report.starvation is None
+        assert set(report.worst_wait) == {
+            (CallType.UP, 1),
+            (CallType.DOWN, 2),
+            (CallType.CAR, 1),
+            (CallType.CAR, 2),
+        }
+        assert report.max_wait == 4
+
+    def test_worst_trace_starts_idle_and_attains_the_worst_wait(self):
+        report = explore(4, door_holding=False)
+        assert report.max_wait == 12
+        first = report.worst_trace[0]
+        assert (first.floor, first.direction) == (1, Direction.STOPPED)
+        assert not first.up_calls and not first.down_calls and not first.car_calls
+
+    def test_pending_limit_shrinks_the_state_space(self):
+        unlimited = explore(4, door_holding=False)
+        limited = explore(4, max_pending=2, door_holding=False)
+        assert limited.states < unlimited.states
+        assert limited.max_wait <= unlimited.max_wait
+
+    def test_door_holding_starves_other_calls(self):
+        report = explore(3)
+        assert report.door_holding
+        assert report.max_wait is None
+        starved_type, starved_floor = report.starvation.call
+        held = report.starvation.cycle
+        assert len({state.floor for state in held}) == 1
+        for state in held:
+            assert state.direction == Direction.STOPPED
+            calls = {
+                CallType.UP: state.up_calls,
+                CallType.DOWN: state.down_calls,
+                CallType.CAR: state.car_calls,
+            }
+            assert starved_floor in calls[starved_type]
+
+    def test_partitioned_frontier_matches_in_process_search(self, monkeypatch):
+        monkeypatch.setattr(explorer, "PARALLEL_FRONTIER_MIN", 1)
+        parallel = explore(3, workers=2)
+        serial = explore(3)
+        assert parallel.states == serial.states
+        assert parallel.transitions == serial.transitions
+        assert parallel.worst_wait == serial.worst_wait
+
+    def test_state_limit(self):
+        with pytest.raises(RuntimeError):
+            explore(4, state_limit=100)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for `pyelevator` package."""
+import json
+import subprocess
+import sys
+
+
+def _import_in_fresh_interpreter(statement):
+    probe = (
+        f"{statement}\n"
+        "import json, logging, sys\n"
+        "print(json.dumps([sorted(sys.modules), len(logging.getLogger().handlers)]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    modules, root_handlers = json.loads(result.stdout)
+    return set(modules), root_handlers
+
+
+class TestCoreImport:
+    def test_core_import_skips_optional_modules(self):
+        modules, _ = _import_in_fresh_interpreter("from pyelevator import Elevator")
+        for name in (
+            "asyncio",
+            "click",
+            "dataclasses",
+            "multiprocessing",
+            "pyelevator.cli",
+            "pyelevator.shared_state",
+            "pyelevator.solver",
+        ):
+            assert name not in modules
+
+    def test_core_import_leaves_logging_unconfigured(self):
+        _, root_handlers = _import_in_fresh_interpreter("import pyelevator")
+        assert root_handlers == 0
+
+    def test_cli_imports_click(self):
+        modules, _ = _import_in_fresh_interpreter("import pyelevator.cli")
+        assert "click" in modules
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for `pyelevator` package."""
+import shutil
+import time
+
+import pytest
+
+from pyelevator.call import CallType
+from pyelevator.elevator import Elevator
+from pyelevator.journal import _pack_record
+from pyelevator.journal import read_state
+from pyelevator.journal import REGISTERED
+from pyelevator.journal import restore
+from pyelevator.journal import SNAPSHOT_SUFFIX
+from pyelevator.journal import StateJournal
+from pyelevator.traffic import up_peak_traffic
+
+
+def pending_calls(elevator):
+    return {
+        (call_type, floor_num): elevator.call_registered_at(call_type, floor_num)
+        for call_type in CallType
+        for floor_num in range(1, elevator.number_of_floors + 1)
+        if elevator.call_registered_at(call_type, floor_num) is not None
+    }
+
+
+def crash(path, into):
+    """Copy the journal files as a crash would leave them on disk."""
+    for suffix in ("", SNAPSHOT_SUFFIX):
+        shutil.copyfile(str(path) + suffix, str(into) + suffix)
+
+
+class TestStateJournal:
+    @pytest.fixture()
+    def path(self, tmp_path):
+        return str(tmp_path / "elevator.journal")
+
+    def test_rejects_invalid_intervals(self, path):
+        with pytest.raises(ValueError):
+            StateJournal(Elevator(10), path, sync_interval=0)
+        with pytest.raises(ValueError):
+            StateJournal(Elevator(10), path, compact_every=0)
+
+    def test_no_journal_restores_nothing(self, path):
+        assert restore(Elevator(10), path) is None
+
+    def test_restores_buttons_floor_and_direction(self, path):
+        elevator = Elevator(10, enable_sleep=False)
+        with StateJournal(elevator, path, sync_interval=None, fsync=False) as journal:
+            elevator.press_car(3, 8)
+            elevator.elapsed_time = 7
+            elevator.press_down(6)
+            journal.sync()
+            elevator.simulation_move_one_step()
+            elevator.simulation_move_one_step()
+
+        restored = Elevator(10, enable_sleep=False)
+        state = restore(restored, path)
+        assert state.replayed > 0
+        assert pending_calls(restored) == pending_calls(elevator)
+        assert restored.floor == elevator.floor
+        assert restored.direction == elevator.direction
+        assert restored.call_registered_at(CallType.DOWN, 6) == 7
+
+    def test_crash_loses_only_unsynced_records(self, path, tmp_path):
+        elevator = Elevator(10, enable_sleep=False)
+        journal = StateJournal(elevator, path, sync_interval=None, fsync=False)
+        elevator.press_car(2, 3, 4, 5)
+        assert journal.sync() == 4
+        elevator.press_car(9)
+        crash(path, tmp_path / "crashed")
+
+        restored = Elevator(10, enable_sleep=False)
+        restore(restored, str(tmp_path / "crashed"))
+        assert [f for f in range(11) if restored.car_buttons[f]] == [2, 3, 4, 5]
+        journal.close()
+
+    def test_torn_record_is_ignored(self, path):
+        elevator = Elevator(10, enable_sleep=False)
+        with StateJournal(elevator, path, sync_interval=None, fsync=False):
+            elevator.press_up(4)
+        with open(path, "ab") as journal_file:
+            journal_file.write(b"\x01\x03\x09")
+
+        restored = Elevator(10, enable_sleep=False)
+        restore(restored, path)
+        assert pending_calls(restored) == {(CallType.UP, 4): 0}
+
+    def test_replay_stops_at_the_first_bad_record(self, path):
+        elevator = Elevator(10, enable_sleep=False)
+        with StateJournal(elevator, path, sync_interval=None, fsync=False) as journal:
+            elevator.press_up(4)
+            journal.sync()
+            elevator.press_down(7)
+            journal.sync()
+        with open(path, "r+b") as journal_file:
+            journal_file.seek(-24 + 1, 2)
+            journal_file.write(b"\x09")
+        with open(path, "ab") as journal_file:
+            journal_file.write(bytes(range(200, 248)))
+            journal_file.write(_pack_record(REGISTERED, CallType.CAR, 9, 1, 1))
+
+        state = read_state(path, 10)
+        assert state.replayed == 1
+        assert set(state.calls) == {(CallType.UP, 4)}
+
+    def test_compaction_resets_the_journal(self, path):
+        elevator = Elevator(10, enable_sleep=False)
+        with StateJournal(
+            elevator,
+            path,
+            sync_interval=None,
+            compact_every=8,
+            fsync=False,
+        ) as journal:
+            elevator.press_car(*range(2, 11))
+            journal.sync()
+            assert journal.generation == 2
+            elevator.clear_car(5)
+
+        state = read_state(path, 10)
+        assert state.generation == 2
+        assert state.replayed == 1
+        assert set(state.calls) == {(CallType.CAR, f) for f in range(2, 11) if f != 5}
+
+    def test_interrupted_compaction_keeps_the_new_snapshot(self, path, tmp_path):
+        elevator = Elevator(10, enable_sleep=False)
+        journal = StateJournal(elevator, path, sync_interval=None, fsync=False)
+        elevator.press_up(2, 3)
+        journal.sync()
+        stale = tmp_path / "stale.journal"
+        shutil.copyfile(path, stale)
+
+        elevator.clear_up(2)
+        journal.compact()
+        journal.close()
+        shutil.copyfile(stale, path)
+
+        restored = Elevator(10, enable_sleep=False)
+        restore(restored, path)
+        assert pending_calls(restored) == {(CallType.UP, 3): 0}
+
+    def test_rejects_other_buildings_and_corruption(self, path):
+        StateJournal(Elevator(10), path, sync_interval=None, fsync=False).close()
+        with pytest.raises(ValueError):
+            read_state(path, 12)
+        with open(path + SNAPSHOT_SUFFIX, "r+b") as snapshot_file:
+            snapshot_file.seek(14)
+            snapshot_file.write(b"\xff")
+        with pytest.raises(ValueError):
+            read_state(path, 10)
+
+    def test_crash_replay_under_traffic(self, path, tmp_path):
+        trace = up_peak_traffic(12, 200, duration=1200, seed=5, interfloor=0.3)
+        elevator = Elevator(12, capacity=8, enable_sleep=False)
+        journal = StateJournal(
+            elevator,
+            path,
+            sync_interval=None,
+            compact_every=64,
+            fsync=False,
+        )
+        steps = 0
+        while elevator.elapsed_time < 900:
+            while trace and trace[0].arrival_time <= elevator.elapsed_time:
+                elevator.add_passenger(trace.pop(0))
+            if elevator.simulation_can_move():
+                elevator.simulation_move_one_step()
+            else:
+                elevator.elapsed_time = trace[0].arrival_time
+            steps += 1
+            if steps % 10 == 0:
+                journal.sync()
+        journal.sync()
+        crash(path, tmp_path / "crashed")
+        journal.close()
+
+        restored = Elevator(12, capacity=8, enable_sleep=False)
+        restore(restored, str(tmp_path / "crashed"))
+        assert journal.generation > 1
+        assert pending_calls(restored) == pending_calls(elevator)
+        assert restored.floor == elevator.floor
+        assert restored.direction == elevator.direction
+
+    def test_background_checkpoints(self, path, tmp_path):
+        elevator = Elevator(10, enable_sleep=False)
+        with StateJournal(elevator, path, sync_interval=0.01, fsync=False):
+            elevator.press_up(3)
+            elevator.press_car(7)
+            deadline = time.monotonic() + 5
+            while read_state(path, 10).replayed < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            crash(path, tmp_path / "crashed")
+
+        restored = Elevator(10, enable_sleep=False)
+        restore(restored, str(tmp_path / "crashed"))
+        assert pending_calls(restored) == {(CallType.UP, 3): 0, (CallType.CAR, 7): 0}
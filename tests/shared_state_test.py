@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for `pyelevator` package."""
+import multiprocessing
+
+import pytest
+
+from pyelevator.direction import Direction
+from pyelevator.elevator import Elevator
+from pyelevator.shared_state import SharedStatePublisher
+from pyelevator.shared_state import SharedStateReader
+
+
+def read_floor_in_child(name, queue):
+    with SharedStateReader(name) as reader:
+        queue.put(reader.read().floor)
+
+
+class TestSharedState:
+    @pytest.fixture()
+    def elevator(self):
+        return Elevator(20, current_floor=3, enable_sleep=False)
+
+    @pytest.fixture()
+    def publisher(self, elevator):
+        elevator.press_car(9)
+        with SharedStatePublisher(elevator) as publisher:
+            yield publisher
+
+    def test_initial_state_is_published(self, publisher):
+        with SharedStateReader(publisher.name) as reader:
+            snapshot = reader.read()
+        assert reader.number_of_floors == 20
+        assert snapshot.floor == 3
+        assert snapshot.direction == Direction.STOPPED
+        assert snapshot.car_buttons == {9}
+        assert snapshot.sequence % 2 == 0
+
+    def test_presses_and_moves_are_mirrored(self, elevator, publisher):
+        with SharedStateReader(publisher.name) as reader:
+            before = reader.sequence
+            elevator.press_up(17)
+            elevator.press_down(8)
+            elevator.simulation_move_one_step()
+            snapshot = reader.read()
+        assert snapshot.sequence > before
+        assert snapshot.floor == 4
+        assert snapshot.direction == Direction.UP
+        assert snapshot.up_buttons == {17}
+        assert snapshot.down_buttons == {8}
+        assert snapshot.elapsed_time == elevator.elapsed_time
+
+    def test_served_calls_are_cleared(self, elevator, publisher):
+        with SharedStateReader(publisher.name) as reader:
+            while elevator.simulation_can_move():
+                elevator.simulation_move_one_step()
+            assert reader.read().car_buttons == frozenset()
+
+    def test_settled_car_is_published_as_stopped(self, elevator, publisher):
+        with SharedStateReader(publisher.name) as reader:
+            elevator.press_car(3)
+            while elevator.simulation_can_move():
+                elevator.simulation_move_one_step()
+            snapshot = reader.read()
+        assert elevator.direction == Direction.STOPPED
+        assert snapshot.direction == Direction.STOPPED
+        assert snapshot.floor == elevator.floor
+        assert snapshot.idle_counter == elevator.idle_counter
+
+    def test_reader_view_is_read_only(self, publisher):
+        with SharedStateReader(publisher.name) as reader:
+            with pytest.raises(TypeError):
+                reader._buf[0] = 0
+
+    def test_read_gives_up_on_an_abandoned_update(self, publisher):
+        with SharedStateReader(publisher.name) as reader:
+            publisher._begin()
+            with pytest.raises(TimeoutError):
+                reader.read(attempts=100)
+            with pytest.raises(TimeoutError):
+                reader.read()
+
+            publisher._end()
+            assert reader.read().floor == 3
+
+    def test_rejects_foreign_blocks(self):
+        from multiprocessing import shared_memory
+
+        block = shared_memory.SharedMemory(create=True, size=64)
+        try:
+            with pytest.raises(ValueError):
+                SharedStateReader(block.name)
+        finally:
+            block.close()
+            block.unlink()
+
+    def test_other_processes_can_read(self, publisher):
+        queue = multiprocessing.Queue()
+        child = multiprocessing.Process(
+            target=read_floor_in_child,
+            args=(publisher.name, queue),
+        )
+        child.start()
+        child.join(10)
+        assert queue.get(timeout=1) == 3
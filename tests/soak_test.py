@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for `pyelevator` package."""
+import random
+import tracemalloc
+
+import pytest
+
+from pyelevator.double_deck import DoubleDeckElevator
+from pyelevator.elevator import Elevator
+from pyelevator.passenger import Passenger
+from pyelevator.soak import soak
+
+
+def allocated_by(call):
+    call()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        call()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+class TestHotPath:
+    @pytest.mark.parametrize("elevator_class", [Elevator, DoubleDeckElevator])
+    def test_has_stops_matches_the_stop_lists(self, elevator_class):
+        rng = random.Random(5)
+        for _ in range(200):
+            elevator = elevator_class(
+                12,
+                current_floor=rng.randrange(1, 12, 2),
+                capacity=rng.choice([None, 1]),
+                enable_sleep=False,
+            )
+            if elevator.capacity:
+                elevator.add_passenger(Passenger(elevator.floor, 12))
+                elevator.serve_current_floor_if_needed()
+            for press in (elevator.press_up, elevator.press_down, elevator.press_car):
+                press(*rng.sample(range(1, 13), rng.randint(0, 3)))
+            assert elevator.has_stops_above_current_floor() == bool(
+                elevator.stops_needed_above_current_floor(),
+            )
+            assert elevator.has_stops_below_current_floor() == bool(
+                elevator.stops_needed_below_current_floor(),
+            )
+
+    def test_step_checks_do_not_allocate(self):
+        elevator = Elevator(20, current_floor=8, enable_sleep=False)
+        elevator.press_car(3, 15)
+        assert allocated_by(elevator.has_stops_above_current_floor) == 0
+        assert allocated_by(elevator.has_stops_below_current_floor) == 0
+        assert allocated_by(elevator.simulation_can_move) == 0
+
+
+class TestSoak:
+    def test_steady_state_memory_does_not_grow(self):
+        elevator = Elevator(20, capacity=12, enable_sleep=False)
+        report = soak(elevator, 12_000, sample_every=1_000, seed=1, stream=True)
+        assert report.steps == 12_000
+        assert len(report.samples) == 12
+        assert report.delivered > 0 and report.events > 0
+        assert not report.is_growing()
+        assert 0 < report.step_bytes < 1024
+
+    def test_detects_a_leaking_listener(self):
+        elevator = Elevator(20, capacity=12, enable_sleep=False)
+        retained = list()
+        elevator.add_listener(retained.append)
+        report = soak(elevator, 12_000, sample_every=1_000, seed=1)
+        assert report.is_growing()
+
+    def test_untraced_soak_still_detects_a_leak(self):
+        elevator = Elevator(20, capacity=12, enable_sleep=False)
+        steady = soak(elevator, 12_000, sample_every=1_000, seed=1, trace=False)
+        assert not steady.is_growing()
+
+        elevator = Elevator(20, capacity=12, enable_sleep=False)
+        retained = list()
+        elevator.add_listener(retained.append)
+        report = soak(elevator, 12_000, sample_every=1_000, seed=1, trace=False)
+        assert report.traced_growth == 0
+        assert report.is_growing()
+
+    def test_rejects_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            soak(Elevator(10, enable_sleep=False), 0)
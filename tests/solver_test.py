@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for `pyelevator` package."""
+import copy
+import random
+
+import pytest
+
+from pyelevator.elevator import Elevator
+from pyelevator.passenger import Passenger
+from pyelevator.solver import Objective
+from pyelevator.solver import optimality_gap
+from pyelevator.solver import schedule_cost
+from pyelevator.solver import solve
+from pyelevator.traffic import run_traffic
+from pyelevator.traffic import up_peak_traffic
+
+
+class TestOfflineSolver:
+    @pytest.fixture()
+    def trace(self):
+        return up_peak_traffic(10, 8, duration=160, seed=4, interfloor=0.3)
+
+    def test_single_passenger(self):
+        trace = [Passenger(5, 9)]
+        assert solve(trace).cost == 4 * 2
+        solution = solve(trace, objective=Objective.MAKESPAN)
+        assert solution.cost == 4 * 2 + 4 + 1 + 4 * 2
+        assert solution.stops == [(8, 5), (21, 9)]
+
+    def test_never_worse_than_the_online_schedule(self, trace):
+        online = copy.deepcopy(trace)
+        run_traffic(Elevator(10, capacity=8, enable_sleep=False), online)
+        for objective in Objective:
+            solution = solve(trace, objective=objective, capacity=8)
+            assert solution.optimal
+            assert solution.lower_bound == solution.cost
+            assert solution.cost <= schedule_cost(online, objective)
+            assert 0.0 <= optimality_gap(schedule_cost(online, objective), solution) < 1
+
+    def test_bound_holds_when_capacity_binds(self):
+        trace = [Passenger(5, 1, 0), Passenger(5, 6, 0)]
+        online = copy.deepcopy(trace)
+        run_traffic(Elevator(10, capacity=1, enable_sleep=False), online)
+        for objective in Objective:
+            solution = solve(trace, objective=objective, capacity=1)
+            assert solution.optimal
+            assert solution.lower_bound <= schedule_cost(online, objective)
+            assert solution.cost <= schedule_cost(online, objective)
+
+    def test_boards_passengers_waiting_on_the_start_floor(self):
+        solution = solve([Passenger(1, 3, 0)])
+        assert solution.optimal
+        assert solution.cost == 0
+        assert solution.stops == [(0, 1), (9, 3)]
+
+    def test_bound_holds_against_random_online_runs(self):
+        rng = random.Random(7)
+        for _ in range(60):
+            floors = rng.randint(3, 7)
+            start = rng.randint(1, floors)
+            capacity = rng.choice([1, 2, None])
+            trace = list()
+            for _ in range(rng.randint(1, 5)):
+                origin = start if rng.random() < 0.5 else rng.randint(1, floors)
+                destination = rng.choice([f for f in range(1, floors + 1) if f != origin])
+                arrival = 0 if origin == start else rng.randint(0, 30)
+                trace.append(Passenger(origin, destination, arrival))
+
+            online = copy.deepcopy(trace)
+            elevator = Elevator(
+                floors,
+                current_floor=start,
+                capacity=capacity,
+                enable_sleep=False,
+            )
+            run_traffic(elevator, online)
+            for objective in Objective:
+                solution = solve(
+                    trace,
+                    objective=objective,
+                    start_floor=start,
+                    capacity=capacity,
+                )
+                assert solution.lower_bound <= schedule_cost(online, objective)
+                assert solution.cost <= schedule_cost(online, objective)
+
+    def test_long_traces_report_no_total_wait_bound(self):
+        trace = up_peak_traffic(10, 40, duration=200, seed=4, interfloor=0.3)
+        online = copy.deepcopy(trace)
+        run_traffic(Elevator(10, capacity=2, enable_sleep=False), online)
+        solution = solve(trace, capacity=2, node_limit=2000)
+        assert solution.lower_bound is None
+        assert optimality_gap(schedule_cost(online, Objective.TOTAL_WAIT), solution) is None
+
+        solution = solve(trace, objective=Objective.MAKESPAN, capacity=2, node_limit=2000)
+        assert solution.lower_bound <= schedule_cost(online, Objective.MAKESPAN)
+        assert solution.lower_bound <= solution.cost
+
+    def test_budget_limited_search_reports_bounds(self, trace):
+        solution = solve(trace, objective=Objective.MAKESPAN, node_limit=20)
+        assert not solution.optimal
+        assert solution.lower_bound <= solution.cost
+
+    def test_does_not_modify_the_trace(self, trace):
+        solve(trace)
+        assert all(p.board_time is None for p in trace)
+
+    def test_scoring_needs_a_finished_schedule(self, trace):
+        with pytest.raises(ValueError):
+            schedule_cost(trace, Objective.TOTAL_WAIT)